@@ -1,8 +1,9 @@
 ﻿import json
+import random
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 
-from utils.math_utils import clamp
+import numpy as np
 
 
 CALIBRATION_POINTS = [
@@ -14,24 +15,94 @@ CALIBRATION_POINTS = [
 ]
 
 
+def grid_points(per_side: int, margin: float = 0.1) -> List[Tuple[float, float]]:
+    """Row-major per_side x per_side grid of targets between margin and 1 - margin."""
+    steps = np.linspace(margin, 1.0 - margin, per_side)
+    return [(float(x), float(y)) for y in steps for x in steps]
+
+
+CALIBRATION_GRIDS: Dict[int, List[Tuple[float, float]]] = {
+    5: CALIBRATION_POINTS,
+    9: grid_points(3),
+    16: grid_points(4),
+}
+
+# Number of coefficients per output axis of each mapping model.
+MODEL_TERMS = {"affine": 3, "poly2": 6}
+
+
+def _features(x, y, model: str):
+    """Design-matrix columns for gaze (x, y); works on floats and on arrays."""
+    if model == "poly2":
+        return [x * x, x * y, y * y, x, y, 1.0]
+    return [x, y, 1.0]
+
+
 class CalibrationProfile:
-    def __init__(self, scale_x: float = 1.0, scale_y: float = 1.0, offset_x: float = 0.0, offset_y: float = 0.0):
-        self.scale_x = scale_x
-        self.scale_y = scale_y
-        self.offset_x = offset_x
-        self.offset_y = offset_y
+    """Maps raw gaze to screen-normalized coordinates.
+
+    `coefficients` is a (terms, 2) matrix over the model's features (see
+    _features): affine [x, y, 1] or poly2 [x^2, xy, y^2, x, y, 1]. The
+    scale/offset constructor arguments build the legacy per-axis affine map.
+    """
+
+    def __init__(
+        self,
+        scale_x: float = 1.0,
+        scale_y: float = 1.0,
+        offset_x: float = 0.0,
+        offset_y: float = 0.0,
+        coefficients=None,
+        model: str = "affine",
+    ):
+        if coefficients is None:
+            model = "affine"
+            coefficients = [[scale_x, 0.0], [0.0, scale_y], [offset_x, offset_y]]
+        self.model = model
+        self.coefficients = np.asarray(coefficients, dtype=np.float64).reshape(MODEL_TERMS[model], 2)
+        # Per-axis coefficient rows as plain floats for the single-point path.
+        self._rows_x = self.coefficients[:, 0].tolist()
+        self._rows_y = self.coefficients[:, 1].tolist()
+
+    @property
+    def scale_x(self) -> float:
+        return float(self.coefficients[-3, 0])
+
+    @property
+    def scale_y(self) -> float:
+        return float(self.coefficients[-2, 1])
+
+    @property
+    def offset_x(self) -> float:
+        return float(self.coefficients[-1, 0])
+
+    @property
+    def offset_y(self) -> float:
+        return float(self.coefficients[-1, 1])
 
     def apply(self, gaze: Tuple[float, float]) -> Tuple[float, float]:
-        x = clamp(gaze[0] * self.scale_x + self.offset_x, 0.0, 1.0)
-        y = clamp(gaze[1] * self.scale_y + self.offset_y, 0.0, 1.0)
-        return x, y
+        terms = _features(gaze[0], gaze[1], self.model)
+        x = sum(t * c for t, c in zip(terms, self._rows_x))
+        y = sum(t * c for t, c in zip(terms, self._rows_y))
+        return min(max(x, 0.0), 1.0), min(max(y, 0.0), 1.0)
+
+    def apply_batch(self, gaze) -> np.ndarray:
+        """apply() over an (N, 2) array of gaze points (e.g. a replayed session)."""
+        gaze = np.asarray(gaze, dtype=np.float64).reshape(-1, 2)
+        x, y = gaze[:, 0], gaze[:, 1]
+        design = np.stack(np.broadcast_arrays(*_features(x, y, self.model)), axis=1)
+        return np.clip(design @ self.coefficients, 0.0, 1.0)
 
     def save(self, path: str = "calibration.json") -> None:
+        # scale/offset stay in the file so older builds can still load it
+        # (exact for a plain per-axis map, an approximation otherwise).
         payload = {
             "scale_x": self.scale_x,
             "scale_y": self.scale_y,
             "offset_x": self.offset_x,
             "offset_y": self.offset_y,
+            "model": self.model,
+            "coefficients": self.coefficients.tolist(),
         }
         Path(path).write_text(json.dumps(payload, indent=2), encoding="utf-8")
 
@@ -41,6 +112,8 @@ class CalibrationProfile:
         if not p.exists():
             return CalibrationProfile()
         payload = json.loads(p.read_text(encoding="utf-8"))
+        if "coefficients" in payload:
+            return CalibrationProfile(coefficients=payload["coefficients"], model=payload.get("model", "affine"))
         return CalibrationProfile(
             scale_x=float(payload.get("scale_x", 1.0)),
             scale_y=float(payload.get("scale_y", 1.0)),
@@ -49,29 +122,133 @@ class CalibrationProfile:
         )
 
 
+class PointAccumulator:
+    """Streaming gaze samples for one calibration target.
+
+    Keeps running moments (count, mean, variance per axis; Welford) and a
+    bounded uniform reservoir of samples, so memory does not grow with the
+    time spent looking at the target. estimate() is the mean of the
+    reservoir samples within `reject_mads` median absolute deviations of the
+    median, so blinks and tracking glitches do not drag the point.
+    """
+
+    def __init__(self, reservoir_size: int = 64, reject_mads: float = 3.0, rng: Optional[random.Random] = None):
+        self.reservoir_size = reservoir_size
+        self.reject_mads = reject_mads
+        self._rng = rng or random.Random()
+        self.count = 0
+        self.mean_x = 0.0
+        self.mean_y = 0.0
+        self._m2_x = 0.0
+        self._m2_y = 0.0
+        self._reservoir = np.empty((reservoir_size, 2), dtype=np.float64)
+
+    def add(self, x: float, y: float) -> None:
+        self.count += 1
+        dx = x - self.mean_x
+        dy = y - self.mean_y
+        self.mean_x += dx / self.count
+        self.mean_y += dy / self.count
+        self._m2_x += dx * (x - self.mean_x)
+        self._m2_y += dy * (y - self.mean_y)
+        if self.count <= self.reservoir_size:
+            slot = self.count - 1
+        else:
+            slot = self._rng.randrange(self.count)
+            if slot >= self.reservoir_size:
+                return
+        self._reservoir[slot, 0] = x
+        self._reservoir[slot, 1] = y
+
+    def variance(self) -> Tuple[float, float]:
+        if self.count < 2:
+            return 0.0, 0.0
+        return self._m2_x / (self.count - 1), self._m2_y / (self.count - 1)
+
+    def estimate(self) -> Optional[Tuple[float, float]]:
+        if self.count == 0:
+            return None
+        samples = self._reservoir[: min(self.count, self.reservoir_size)]
+        median = np.median(samples, axis=0)
+        deviation = np.abs(samples - median)
+        mad = np.median(deviation, axis=0)
+        keep = np.all(deviation <= self.reject_mads * np.maximum(mad, 1e-6), axis=1)
+        x, y = samples[keep].mean(axis=0) if keep.any() else median
+        return float(x), float(y)
+
+
+def fit_mapping(observed, expected, model: str = "affine", reject_factor: float = 3.0, min_residual: float = 0.02):
+    """Least-squares (terms, 2) coefficients mapping observed -> expected gaze.
+
+    Refits after dropping the worst calibration point while its residual is
+    more than `reject_factor` times the median residual (and above
+    `min_residual`), as long as at least one more point than there are terms
+    remains. Returns (coefficients, inlier mask), or (None, mask) when the
+    points do not determine the model (too few, or collinear).
+    """
+    observed = np.asarray(observed, dtype=np.float64).reshape(-1, 2)
+    expected = np.asarray(expected, dtype=np.float64).reshape(-1, 2)
+    terms = MODEL_TERMS[model]
+    design = np.stack(np.broadcast_arrays(*_features(observed[:, 0], observed[:, 1], model)), axis=1)
+    inliers = np.ones(len(observed), dtype=bool)
+    while True:
+        if inliers.sum() < terms:
+            return None, inliers
+        coefficients, _, rank, _ = np.linalg.lstsq(design[inliers], expected[inliers], rcond=None)
+        if rank < terms:
+            return None, inliers
+        if inliers.sum() <= terms + 1:
+            return coefficients, inliers
+        residuals = np.linalg.norm(design @ coefficients - expected, axis=1)
+        candidates = np.where(inliers, residuals, -1.0)
+        worst = int(np.argmax(candidates))
+        limit = max(reject_factor * float(np.median(residuals[inliers])), min_residual)
+        if residuals[worst] <= limit:
+            return coefficients, inliers
+        inliers[worst] = False
+
+
 class CalibrationSession:
-    def __init__(self):
+    """Walks the user through a grid of targets and fits a CalibrationProfile.
+
+    `grid_size` picks the target layout from CALIBRATION_GRIDS (5, 9 or 16
+    points); `model` is "affine" or "poly2" (which needs at least 6 usable
+    points and falls back to affine otherwise).
+    """
+
+    def __init__(self, grid_size: int = 5, model: str = "affine", min_samples: int = 8, reservoir_size: int = 64):
+        if model not in MODEL_TERMS:
+            raise ValueError(f"Unknown calibration model: {model}")
+        self.targets = CALIBRATION_GRIDS[grid_size]
+        self.model = model
+        self.min_samples = min_samples
+        self.reservoir_size = reservoir_size
         self.active = False
         self.current_index = 0
-        self.samples: List[List[Tuple[float, float]]] = [[] for _ in CALIBRATION_POINTS]
+        self.points: List[PointAccumulator] = self._new_points()
+        self.inliers: Optional[np.ndarray] = None
+
+    def _new_points(self) -> List[PointAccumulator]:
+        return [PointAccumulator(self.reservoir_size) for _ in self.targets]
 
     def start(self) -> None:
         self.active = True
         self.current_index = 0
-        self.samples = [[] for _ in CALIBRATION_POINTS]
+        self.points = self._new_points()
+        self.inliers = None
 
     def add_sample(self, gaze: Optional[Tuple[float, float]]) -> None:
         if not self.active or gaze is None:
             return
-        self.samples[self.current_index].append(gaze)
+        self.points[self.current_index].add(gaze[0], gaze[1])
 
     def capture_current_point(self) -> bool:
         if not self.active:
             return False
-        if len(self.samples[self.current_index]) < 8:
+        if self.points[self.current_index].count < self.min_samples:
             return False
         self.current_index += 1
-        if self.current_index >= len(CALIBRATION_POINTS):
+        if self.current_index >= len(self.targets):
             self.active = False
             return True
         return False
@@ -79,34 +256,30 @@ class CalibrationSession:
     def current_target(self) -> Optional[Tuple[float, float]]:
         if not self.active:
             return None
-        return CALIBRATION_POINTS[self.current_index]
+        return self.targets[self.current_index]
 
     def build_profile(self) -> CalibrationProfile:
         observed = []
-        for point_samples in self.samples:
-            if point_samples:
-                x = sum(p[0] for p in point_samples) / len(point_samples)
-                y = sum(p[1] for p in point_samples) / len(point_samples)
-                observed.append((x, y))
+        expected = []
+        for target, point in zip(self.targets, self.points):
+            estimate = point.estimate()
+            if estimate is not None:
+                observed.append(estimate)
+                expected.append(target)
         if len(observed) < 3:
             return CalibrationProfile()
-
-        exp_x = [p[0] for p in CALIBRATION_POINTS]
-        exp_y = [p[1] for p in CALIBRATION_POINTS]
-        obs_x = [p[0] for p in observed]
-        obs_y = [p[1] for p in observed]
-
-        obs_min_x, obs_max_x = min(obs_x), max(obs_x)
-        obs_min_y, obs_max_y = min(obs_y), max(obs_y)
-        exp_min_x, exp_max_x = min(exp_x), max(exp_x)
-        exp_min_y, exp_max_y = min(exp_y), max(exp_y)
-
-        if abs(obs_max_x - obs_min_x) < 1e-4 or abs(obs_max_y - obs_min_y) < 1e-4:
+        spread = np.ptp(np.asarray(observed), axis=0)
+        if spread[0] < 1e-4 or spread[1] < 1e-4:
             return CalibrationProfile()
 
-        scale_x = (exp_max_x - exp_min_x) / (obs_max_x - obs_min_x)
-        scale_y = (exp_max_y - exp_min_y) / (obs_max_y - obs_min_y)
-        offset_x = exp_min_x - obs_min_x * scale_x
-        offset_y = exp_min_y - obs_min_y * scale_y
-
-        return CalibrationProfile(scale_x=scale_x, scale_y=scale_y, offset_x=offset_x, offset_y=offset_y)
+        model = self.model
+        if len(observed) < MODEL_TERMS[model]:
+            model = "affine"
+        coefficients, self.inliers = fit_mapping(observed, expected, model)
+        if coefficients is None and model != "affine":
+            # e.g. six points that do not determine the quadratic terms.
+            model = "affine"
+            coefficients, self.inliers = fit_mapping(observed, expected, model)
+        if coefficients is None:
+            return CalibrationProfile()
+        return CalibrationProfile(coefficients=coefficients, model=model)
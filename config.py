@@ -1,4 +1,5 @@
 from dataclasses import dataclass
+from typing import Tuple
 
 
 @dataclass(frozen=True)
@@ -9,11 +10,81 @@ class Config:
     frame_height: int = 720
     # Scale factor for display window (e.g. 1.35 = 35% larger).
     display_scale: float = 1.35
+    # Production mode: skip all preview rendering and display work (also --headless).
+    # Stop with Ctrl+C / SIGTERM instead of ESC.
+    headless: bool = False
+    # Capture on a background thread and always process the newest frame
+    # (stale frames are dropped instead of queuing up behind slow inference).
+    threaded_capture: bool = True
+    # "single": capture and inference in the main process. "multiprocess":
+    # capture and hand inference run in their own processes and hand frames
+    # and landmarks over shared memory (also --pipeline).
+    pipeline_mode: str = "single"
+    # Frame source (also --source): "camera" (camera_index), "video" (file at
+    # frame_source_path), "images" (directory or glob at frame_source_path,
+    # played at frame_source_fps) or "synthetic" (generated frames at
+    # frame_width x frame_height). Recorded and synthetic sources run at their
+    # frame rate unless frame_source_realtime is off (also --fast), then as
+    # fast as the pipeline consumes them; they stop at the end unless
+    # frame_source_loop is set. frame_source_frames > 0 limits synthetic runs.
+    # As fast as possible, idle mode is off and the single-process pipeline
+    # processes every frame; the multiprocess one still drops the frames
+    # inference cannot keep up with.
+    frame_source: str = "camera"
+    frame_source_path: str = ""
+    frame_source_realtime: bool = True
+    frame_source_loop: bool = False
+    frame_source_fps: float = 30.0
+    frame_source_frames: int = 0
 
     # MediaPipe hand tracking quality.
     hand_min_detection_confidence: float = 0.6
     hand_min_tracking_confidence: float = 0.5
     max_hands: int = 2
+    # ROI tracking: run inference on a padded crop around the previous frame's
+    # hands instead of the full frame. A full-frame re-detection runs every
+    # N frames, when a hand is lost, or when the handedness score drops. Every
+    # switch between crop and full frame (or move of the crop) restarts
+    # MediaPipe's tracking, costing one detection pass.
+    hand_roi_tracking: bool = False
+    hand_roi_padding: float = 0.35
+    hand_roi_min_size: int = 192
+    hand_roi_redetect_frames: int = 15
+    hand_roi_min_score: float = 0.8
+    # Skip-frame inference: run MediaPipe every N frames (1 = every frame) and
+    # move the landmarks with Lucas-Kanade optical flow on a grayscale frame
+    # downscaled by hand_flow_scale in between. Inference runs early when
+    # fewer than hand_flow_min_tracked of a hand's points are tracked.
+    hand_flow_interval: int = 1
+    hand_flow_scale: float = 0.5
+    hand_flow_min_tracked: float = 0.8
+
+    # Adaptive quality: step inference resolution / re-detection rate to hold
+    # target_frame_ms, and use a single-hand graph after only one hand has been
+    # seen for single_hand_downgrade_seconds. Levels go best -> cheapest as
+    # (inference scale, ROI re-detect every N frames).
+    adaptive_quality: bool = False
+    target_frame_ms: float = 33.0
+    quality_levels: Tuple[Tuple[float, int], ...] = ((1.0, 15), (0.75, 20), (0.5, 30), (0.35, 45))
+    single_hand_downgrade_seconds: float = 5.0
+
+    # Idle mode: after idle_after_seconds without a hand, stop hand inference
+    # and only watch a tiny grayscale thumbnail for motion, decoding a frame
+    # every idle_poll_seconds. More than idle_motion_threshold of the
+    # thumbnail changing wakes the full pipeline on that frame.
+    idle_mode: bool = True
+    idle_after_seconds: float = 30.0
+    idle_poll_seconds: float = 0.2
+    idle_motion_threshold: float = 0.02
+
+    # Gaze: run the face mesh alongside hand inference (on a worker thread,
+    # same frame) every face_inference_interval frames and estimate gaze from
+    # the irises. Single-process pipeline only.
+    gaze_tracking: bool = False
+    face_min_detection_confidence: float = 0.5
+    face_min_tracking_confidence: float = 0.5
+    face_inference_interval: int = 2
+    gaze_smoothing_alpha: float = 0.22
 
     # Which hand controls the cursor: "Right", "Left", or "Either".
     pointer_hand: str = "Right"
@@ -36,10 +107,29 @@ class Config:
     max_cursor_step_px: int = 35
     pen_active_margin_x: float = 0.15
     pen_active_margin_y: float = 0.18
+    # Keep an internal cursor position instead of querying the OS before every
+    # move; re-sync with the OS every cursor_resync_seconds (picks up touchpad
+    # or mouse moves made outside the app).
+    cursor_position_model: bool = True
+    cursor_resync_seconds: float = 0.5
+    # Inject mouse / keyboard input on a background thread: moves collapse to
+    # the newest target and scroll / zoom deltas add up while queued.
+    async_cursor_output: bool = True
 
     # Extra smoothing for stability (more = smoother, but adds lag).
     smoothing_alpha: float = 0.12
     moving_average_window: int = 8
+    # Cursor filter: "ema" (smoothing_alpha + moving_average_window above) or
+    # "one_euro" (speed-adaptive: steady when slow, little lag when fast;
+    # cutoffs in Hz, beta per px/s of cursor speed).
+    cursor_filter: str = "ema"
+    one_euro_min_cutoff: float = 0.5
+    one_euro_beta: float = 0.01
+    one_euro_d_cutoff: float = 1.0
+    # With "one_euro": extrapolate the cursor forward by the measured
+    # capture-to-output latency (capped at cursor_predict_max_ms).
+    cursor_predict_latency: bool = True
+    cursor_predict_max_ms: float = 60.0
 
     # Gesture thresholds and timing.
     pinch_threshold: float = 0.055
@@ -56,6 +146,27 @@ class Config:
     scroll_gain: float = 65.0
     zoom_gain: float = 45.0
 
+    # Per-stage latency histograms (capture, flip, bgr2rgb, mediapipe, ...).
+    # p50/p95/p99 are shown on the preview and logged every N seconds.
+    profile_stages: bool = True
+    profile_report_seconds: float = 5.0
+    # Trace heap allocations per frame with tracemalloc (slow; diagnostic only).
+    # Logs transient and retained bytes per frame every profile_report_seconds.
+    trace_allocations: bool = False
+
+    # Metrics for long runs, in the Prometheus text format: frames, hand-less
+    # frames, inference time, gestures, actions, drags, cursor moves and CPU
+    # time per profiler stage. metrics_file is rewritten every
+    # metrics_interval_seconds; metrics_http_port > 0 serves
+    # http://127.0.0.1:<port>/metrics. Empty / 0 for both = no metrics.
+    metrics_file: str = ""
+    metrics_http_port: int = 0
+    metrics_interval_seconds: float = 10.0
+
+    # Record HandTracker output of every session into this directory
+    # (one memory-mapped .tclm file per run; replay with replay.py). Empty = off.
+    record_sessions_dir: str = ""
+
     # Show an on-screen gesture demo for the first N seconds (press H to toggle).
     gesture_demo_seconds: float = 10.0
 
@@ -0,0 +1,205 @@
+"""Batch hand-landmark extraction from recorded videos, in parallel.
+
+    python extract_landmarks.py sessions/*.mp4 --out datasets/landmarks
+    python extract_landmarks.py talk.mp4 --out ds --workers 4 --chunk-seconds 20
+
+Every video is split into chunks of consecutive frames and the chunks run on
+a process pool with one HandTracker (one MediaPipe graph, tracking mode) per
+worker; tracking state is reset at the start of each chunk. Results stream,
+in frame order, into one .tclm landmark file per video (the session format
+written by main.py and read by replay.py / gesture_bench.py). A progress file
+next to each output records the completed chunks, so an interrupted run picks
+up after the last completed chunk when started again with the same arguments.
+"""
+import argparse
+import json
+import math
+import multiprocessing as mp
+import os
+import time
+from pathlib import Path
+from typing import List, Optional
+
+import cv2
+import numpy as np
+
+from config import CFG
+from modules.landmark_store import LandmarkRecorder, fill_record, record_dtype
+
+
+class _Job:
+    """One input video: its chunks, output file and progress."""
+
+    def __init__(self, index: int, source: Path, out_dir: Path, chunk_seconds: float, mirror: bool, max_hands: int):
+        self.index = index
+        self.source = source
+        self.output = out_dir / f"{source.stem}.tclm"
+        self.progress_path = self.output.with_name(self.output.name + ".progress.json")
+        cap = cv2.VideoCapture(str(source))
+        if not cap.isOpened():
+            raise ValueError(f"Cannot open video file: {source}")
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        self.fps = fps if fps > 0 else 30.0
+        self.total_frames = max(0, int(cap.get(cv2.CAP_PROP_FRAME_COUNT)))
+        cap.release()
+        self.chunk_frames = max(1, int(round(chunk_seconds * self.fps)))
+        # An unknown frame count (0) means a single chunk read to the end.
+        self.chunk_count = max(1, math.ceil(self.total_frames / self.chunk_frames))
+        self.mirror = mirror
+        self.max_hands = max_hands
+        self.chunks_done = 0
+        self.frames = 0
+        self.recorder: Optional[LandmarkRecorder] = None
+
+    def _settings(self) -> dict:
+        return {
+            "source": str(self.source.resolve()),
+            "source_size": self.source.stat().st_size,
+            "chunk_frames": self.chunk_frames,
+            "mirror": self.mirror,
+            "max_hands": self.max_hands,
+        }
+
+    @property
+    def complete(self) -> bool:
+        return self.chunks_done >= self.chunk_count
+
+    def open(self) -> None:
+        """Resume from the progress file when it matches this run, else start over."""
+        resume_frames = None
+        if self.progress_path.exists() and self.output.exists():
+            progress = json.loads(self.progress_path.read_text(encoding="utf-8"))
+            if all(progress.get(key) == value for key, value in self._settings().items()):
+                self.chunks_done = int(progress["chunks_done"])
+                self.frames = resume_frames = int(progress["frames"])
+        if not self.complete:
+            self.recorder = LandmarkRecorder(str(self.output), max_hands=self.max_hands, resume_frames=resume_frames)
+
+    def tasks(self) -> List[tuple]:
+        tasks = []
+        for chunk in range(self.chunks_done, self.chunk_count):
+            start = chunk * self.chunk_frames
+            end = None if chunk == self.chunk_count - 1 else start + self.chunk_frames
+            tasks.append((self.index, chunk, str(self.source), start, end, self.fps, self.mirror))
+        return tasks
+
+    def write_chunk(self, records: np.ndarray) -> None:
+        self.recorder.write_records(records)
+        self.recorder.flush()
+        self.chunks_done += 1
+        self.frames = self.recorder.frame_count
+        if self.complete:
+            self.recorder.close()
+            self.recorder = None
+        progress = dict(self._settings(), chunks_done=self.chunks_done, frames=self.frames, complete=self.complete)
+        tmp = self.progress_path.with_name(self.progress_path.name + ".tmp")
+        tmp.write_text(json.dumps(progress, indent=2) + "\n", encoding="utf-8")
+        os.replace(tmp, self.progress_path)
+
+    def close(self) -> None:
+        if self.recorder is not None:
+            self.recorder.close()
+            self.recorder = None
+
+
+_tracker = None
+_max_hands = 2
+
+
+def _init_worker(max_hands: int, min_detection_confidence: float, min_tracking_confidence: float) -> None:
+    """Build this worker's HandTracker once; chunks reuse it."""
+    global _tracker, _max_hands
+    from modules.hand_tracker import HandTracker
+
+    # The pool already uses every core; OpenCV's own threads would only compete.
+    cv2.setNumThreads(1)
+    _max_hands = max_hands
+    _tracker = HandTracker(min_detection_confidence, min_tracking_confidence, max_hands=max_hands)
+
+
+def _extract_chunk(task):
+    """Landmarks of frames [start, end) of one video (end None = to the end of the file)."""
+    job_index, chunk, path, start, end, fps, mirror = task
+    _tracker.reset()
+    cap = cv2.VideoCapture(path)
+    if start:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+    records = np.zeros(end - start if end is not None else 1024, dtype=record_dtype(_max_hands))
+    count = 0
+    raw = mirrored = None
+    while end is None or start + count < end:
+        ok, frame = cap.read(raw)
+        if not ok:
+            break
+        raw = frame
+        if mirror:
+            # Match the live pipeline, which mirrors camera frames before tracking.
+            mirrored = cv2.flip(raw, 1, dst=mirrored)
+            frame = mirrored
+        hands = _tracker.process(frame)
+        if count >= len(records):
+            records = np.resize(records, 2 * len(records))
+        fill_record(records[count], (start + count) / fps, hands, _max_hands)
+        count += 1
+    cap.release()
+    return job_index, chunk, records[:count]
+
+
+def extract(paths: List[str], out_dir: str, workers: int = 0, chunk_seconds: float = 30.0, mirror: bool = True, cfg=CFG) -> dict:
+    """Extract every video in `paths` into `out_dir`; returns run totals."""
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    jobs = [_Job(index, Path(path), out, chunk_seconds, mirror, cfg.max_hands) for index, path in enumerate(paths)]
+    outputs = [job.output for job in jobs]
+    if len(set(outputs)) != len(outputs):
+        raise ValueError("Input videos must have distinct file names (outputs are named after them).")
+    for job in jobs:
+        job.open()
+    tasks = [task for job in jobs for task in job.tasks()]
+    totals = {"videos": len(jobs), "chunks": len(tasks), "frames": 0, "seconds": 0.0}
+    if not tasks:
+        return totals
+
+    workers = min(workers or os.cpu_count() or 1, len(tasks))
+    started = time.perf_counter()
+    ctx = mp.get_context("spawn")
+    init_args = (cfg.max_hands, cfg.hand_min_detection_confidence, cfg.hand_min_tracking_confidence)
+    try:
+        with ctx.Pool(workers, initializer=_init_worker, initargs=init_args) as pool:
+            # imap keeps task order, so each file is written front to back even
+            # when chunks finish out of order on the workers.
+            for job_index, chunk, records in pool.imap(_extract_chunk, tasks):
+                job = jobs[job_index]
+                job.write_chunk(records)
+                totals["frames"] += len(records)
+                print(f"{job.source.name}: chunk {chunk + 1}/{job.chunk_count}, {job.frames} frames", flush=True)
+    finally:
+        for job in jobs:
+            job.close()
+    totals["seconds"] = time.perf_counter() - started
+    totals["workers"] = workers
+    return totals
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("videos", nargs="+", help="Video files to extract")
+    parser.add_argument("--out", required=True, help="Output directory (one .tclm per video)")
+    parser.add_argument("--workers", type=int, default=0, help="Worker processes (default: one per CPU core)")
+    parser.add_argument("--chunk-seconds", type=float, default=30.0, help="Video length per work chunk")
+    parser.add_argument("--no-mirror", action="store_true", help="Track frames as recorded instead of mirrored like the live camera")
+    args = parser.parse_args(argv)
+
+    totals = extract(args.videos, args.out, workers=max(0, args.workers), chunk_seconds=args.chunk_seconds, mirror=not args.no_mirror)
+    if not totals["chunks"]:
+        print("Nothing to do: every video is already extracted.")
+        return
+    seconds = max(totals["seconds"], 1e-9)
+    print(
+        f"Videos: {totals['videos']}  Chunks: {totals['chunks']}  Frames: {totals['frames']}  "
+        f"Workers: {totals['workers']}  Time: {seconds:.1f}s  Throughput: {totals['frames'] / seconds:.1f} frames/s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,458 @@
+"""Offline accuracy and throughput regression check for the gesture path.
+
+    python gesture_bench.py                                   # compare with gesture_baseline.json
+    python gesture_bench.py --set pinch_threshold=0.06        # try a tuning change
+    python gesture_bench.py --update-baseline                 # accept the current numbers
+    python gesture_bench.py --session s.tclm --labels s.json  # a labeled recording instead
+
+Labeled landmark frames (a seeded synthetic script by default) go through
+select_hands + GestureController.update with the recorded clock. The report
+covers per-gesture frame precision / recall, event recall and time-to-fire
+after onset, false fires (per minute, and during "rest" alone) and gesture-path
+frames per second. Throughput is compared as a multiple of a fixed calibration
+loop timed in the same process, so a baseline from one machine still holds on
+another. Exit status 1 when something regressed past a tolerance.
+"""
+import argparse
+import json
+import math
+import sys
+import time
+from collections import Counter
+from dataclasses import fields, replace
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional
+
+import numpy as np
+
+from config import CFG
+from modules.gesture_controller import GestureController
+from modules.gesture_events import DragEnd
+from modules.hand_roles import select_hands
+from modules.landmark_store import LandmarkReplay
+
+
+DEFAULT_BASELINE = Path(__file__).with_name("gesture_baseline.json")
+FPS = 30.0
+
+
+# --- Synthetic hands --------------------------------------------------------
+
+# Offsets from the wrist in normalized image units (y grows downward); a hand
+# is about 0.2 tall. Fingers: index, middle, ring, pinky.
+_MCP_X = (-0.045, -0.015, 0.015, 0.045)
+_MCP_Y = -0.09
+_FAN = (-1.0, -0.33, 0.33, 1.0)
+_EXTENDED = ((0.3, -0.04), (0.6, -0.07), (1.0, -0.095))  # (fan share, dy) for pip, dip, tip
+_CURLED = ((0.0, -0.03), (0.0, -0.01), (0.0, 0.015))
+_THUMB_CMC = (-0.035, -0.02)
+_THUMB_MCP = (-0.06, -0.04)
+_THUMB = {
+    "tucked": ((0.015, 0.0), (0.03, 0.01)),
+    "up": ((0.0, -0.04), (0.0, -0.08)),
+    "down": ((0.0, 0.04), (0.0, 0.08)),
+    "side": ((-0.025, -0.01), (-0.05, -0.015)),
+}
+
+
+def hand_pose(fingers: str, thumb: str = "tucked", spread: float = 0.0, pinch: bool = False) -> np.ndarray:
+    """(21, 2) wrist-relative pose. `fingers` has one char per finger
+    (index..pinky): "1" extended, "0" curled."""
+    xy = np.zeros((21, 2))
+    for idx, up in enumerate(fingers):
+        mcp = np.array((_MCP_X[idx], _MCP_Y))
+        base = 5 + idx * 4
+        xy[base] = mcp
+        fan = spread * 0.05 * _FAN[idx]
+        for joint, (share, dy) in enumerate(_EXTENDED if up == "1" else _CURLED, start=1):
+            xy[base + joint] = mcp + (fan * share, dy)
+    xy[1] = _THUMB_CMC
+    xy[2] = _THUMB_MCP
+    ip, tip = _THUMB[thumb]
+    xy[3] = np.add(_THUMB_MCP, ip)
+    xy[4] = np.add(_THUMB_MCP, tip)
+    if pinch:
+        # "OK" sign: index hooked towards the thumb, thumb tip on the index tip.
+        mcp = xy[5]
+        xy[6] = mcp + (0.0, -0.04)
+        xy[7] = mcp + (-0.02, -0.05)
+        xy[8] = mcp + (-0.03, -0.035)
+        xy[3] = (xy[2] + xy[8]) * 0.5
+        xy[4] = xy[8] + (0.005, 0.008)
+    return xy
+
+
+POINTING = hand_pose("1000")
+OPEN_PALM = hand_pose("1111", "side", spread=0.3)
+
+
+class Scenario(NamedTuple):
+    gesture: np.ndarray  # gesture-hand pose
+    label: str  # GestureState.gesture expected while it is held
+    event: Optional[str] = None  # GestureEvent.key expected to fire (None = nothing may fire)
+    pointer: np.ndarray = POINTING
+    motion: str = ""  # "zoom": spread oscillates; "scroll": pointer moves up and down
+
+
+SCENARIOS: Dict[str, Scenario] = {
+    "rest": Scenario(OPEN_PALM, "rest"),
+    "left_click": Scenario(hand_pose("0111", pinch=True), "left_click", "click"),
+    "right_click": Scenario(hand_pose("1100"), "right_click", "right_click"),
+    "double_click": Scenario(hand_pose("0000", "up"), "double_click", "double_click"),
+    "drag": Scenario(hand_pose("0000"), "fist", "drag_down"),
+    "zoom": Scenario(hand_pose("1110"), "zoom", "zoom_delta", motion="zoom"),
+    "minimize": Scenario(hand_pose("0000", "down"), "minimize", "minimize_window"),
+    "maximize": Scenario(hand_pose("0011"), "maximize", "maximize_window"),
+    "close": Scenario(hand_pose("1001"), "close", "close_window"),
+    "show_all_windows": Scenario(
+        hand_pose("1111", "down", spread=1.0), "show_all_windows", "show_all_windows", pointer=hand_pose("1111", "down", spread=1.0)
+    ),
+    "scroll": Scenario(OPEN_PALM, "rest", "scroll_delta", pointer=hand_pose("1100"), motion="scroll"),
+}
+
+
+def _place(pose: np.ndarray, wrist, scale: float, angle: float, mirror: bool) -> np.ndarray:
+    c, s = math.cos(angle), math.sin(angle)
+    xy = pose * scale
+    if mirror:
+        xy = xy * (-1.0, 1.0)
+    xy = xy @ np.array(((c, s), (-s, c)))
+    out = np.zeros((21, 3), dtype=np.float32)
+    out[:, :2] = xy + wrist
+    return out
+
+
+class Segment(NamedTuple):
+    start: float
+    end: float
+    name: str
+    settled: float  # end of the onset transition (events of the previous gesture still count until here)
+
+
+class LabeledSequence(NamedTuple):
+    timestamps: List[float]
+    hands: List[list]
+    truth: List[Optional[str]]  # expected GestureState.gesture per frame (None = not scored)
+    segments: List[Segment]
+
+
+def synthetic_sequence(repeats: int = 3, seed: int = 7, hold_seconds: float = 1.5, rest_seconds: float = 0.6, transition_frames: int = 3, jitter: float = 0.0015) -> LabeledSequence:
+    """Every scenario `repeats` times in shuffled order, each after a rest
+    pose, with pose interpolation on onsets, per-segment scale and tilt, and
+    per-frame landmark jitter."""
+    rng = np.random.default_rng(seed)
+    names = [name for name in SCENARIOS if name != "rest"]
+    plan = []
+    for _ in range(repeats):
+        for name in rng.permutation(names):
+            plan.append(("rest", rest_seconds))
+            plan.append((str(name), hold_seconds))
+    plan.append(("rest", rest_seconds))
+
+    timestamps, hands, truth, segments = [], [], [], []
+    t = 0.0
+    # Pose, scale and tilt the hands had on the previous frame: onsets blend from them.
+    last_gesture, last_pointer, last_scale, last_angle = OPEN_PALM, POINTING, 1.0, 0.0
+    for name, seconds in plan:
+        scenario = SCENARIOS[name]
+        frames = int(round(seconds * FPS))
+        target_scale = rng.uniform(0.85, 1.15)
+        target_angle = math.radians(rng.uniform(-8.0, 8.0))
+        start_gesture, start_pointer, start_scale, start_angle = last_gesture, last_pointer, last_scale, last_angle
+        segments.append(Segment(t, t + frames / FPS, name, t + transition_frames / FPS))
+        for frame in range(frames):
+            # One full motion cycle per segment, so every motion ends where it started.
+            cycle = math.sin(math.pi * frame / frames) ** 2
+            gesture_pose = scenario.gesture
+            if scenario.motion == "zoom":
+                gesture_pose = hand_pose("1110", spread=0.6 * cycle)
+            pointer_wrist = (0.68 + 0.05 * math.sin(t * 1.7), 0.72 + 0.03 * math.sin(t * 1.3))
+            if scenario.motion == "scroll":
+                pointer_wrist = (pointer_wrist[0], pointer_wrist[1] - 0.12 * cycle)
+            pointer_pose = scenario.pointer
+            scale, angle = target_scale, target_angle
+            onset = frame < transition_frames
+            if onset:
+                w = (frame + 1) / (transition_frames + 1)
+                gesture_pose = start_gesture * (1.0 - w) + gesture_pose * w
+                pointer_pose = start_pointer * (1.0 - w) + pointer_pose * w
+                scale = start_scale * (1.0 - w) + scale * w
+                angle = start_angle * (1.0 - w) + angle * w
+            last_gesture, last_pointer, last_scale, last_angle = gesture_pose, pointer_pose, scale, angle
+            gesture_hand = _place(gesture_pose, (0.32, 0.72), scale, angle, mirror=False)
+            pointer_hand = _place(pointer_pose, pointer_wrist, scale, -angle, mirror=True)
+            gesture_hand[:, :2] += rng.normal(0.0, jitter, (21, 2))
+            pointer_hand[:, :2] += rng.normal(0.0, jitter, (21, 2))
+            timestamps.append(t)
+            hands.append([(pointer_hand, "Right"), (gesture_hand, "Left")])
+            truth.append(None if onset else scenario.label)
+            t += 1.0 / FPS
+    return LabeledSequence(timestamps, hands, truth, segments)
+
+
+def recorded_sequence(session_path: str, labels_path: str) -> LabeledSequence:
+    """A .tclm recording plus a JSON file of
+    {"segments": [{"start": s, "end": s, "name": <SCENARIOS key>, "onset": s}, ...]}
+    with times in seconds from the first frame; "onset" (default 0.1 s) is the
+    transition into the pose. Unlabeled frames are not scored."""
+    session = LandmarkReplay(session_path)
+    spec = json.loads(Path(labels_path).read_text(encoding="utf-8"))
+    origin = float(session.timestamps[0]) if len(session) else 0.0
+    segments = sorted(
+        (Segment(float(s["start"]), float(s["end"]), s["name"], float(s["start"]) + float(s.get("onset", 0.1))) for s in spec["segments"]),
+        key=lambda s: s.start,
+    )
+    timestamps, hands, truth = [], [], []
+    for timestamp, frame_hands in session:
+        t = timestamp - origin
+        label = None
+        for segment in segments:
+            if segment.start <= t < segment.end:
+                label = SCENARIOS[segment.name].label
+                break
+        timestamps.append(t)
+        hands.append([(np.array(points), handedness) for points, handedness in frame_hands])
+        truth.append(label)
+    return LabeledSequence(timestamps, hands, truth, segments)
+
+
+# --- Evaluation -------------------------------------------------------------
+
+
+def _run(cfg, sequence: LabeledSequence, offset: float = 0.0, events=None):
+    gestures = GestureController.from_config(cfg)
+    predicted = []
+    allow_single_hand = not cfg.require_two_hands_for_gestures
+    for timestamp, hands in zip(sequence.timestamps, sequence.hands):
+        pointer_hand, gesture_hand, gesture_handedness = select_hands(hands, cfg.pointer_hand)
+        state = gestures.update(
+            pointer_hand[0] if pointer_hand else None,
+            gesture_hand[0] if gesture_hand else None,
+            gesture_handedness=gesture_handedness,
+            now=timestamp + offset,
+            allow_single_hand=allow_single_hand,
+            allow_pointer_scroll=cfg.allow_pointer_scroll,
+            pointer_scroll_requires_gesture_rest=cfg.pointer_scroll_requires_gesture_rest,
+        )
+        if events is not None:
+            predicted.append(state.gesture)
+            for event in state.events:
+                events.append((timestamp, event))
+    return predicted
+
+
+_CALIBRATION_ITERATIONS = 2000
+
+
+def _calibration_pass(points: np.ndarray) -> None:
+    """A fixed reference workload: small NumPy reductions plus Python float
+    math over a hand's landmarks, the same mix as the gesture path."""
+    total = 0.0
+    for idx in range(_CALIBRATION_ITERATIONS):
+        tip = points[(idx % 5) * 4 + 4]
+        delta = points[:, :2] - tip[:2]
+        total += float(np.sqrt((delta * delta).sum(axis=1)).min())
+        total += math.hypot(float(tip[0]) - 0.5, float(tip[1]) - 0.5)
+
+
+def evaluate(cfg, sequence: LabeledSequence, loops: int = 5) -> dict:
+    events = []
+    predicted = _run(cfg, sequence, events=events)
+
+    # Frame-level precision / recall of GestureState.gesture.
+    true_pos, true_count, pred_count = Counter(), Counter(), Counter()
+    for truth, guess in zip(sequence.truth, predicted):
+        if truth is None:
+            continue
+        true_count[truth] += 1
+        pred_count[guess] += 1
+        if truth == guess:
+            true_pos[truth] += 1
+
+    # Event-level: did the expected event fire, how long after onset, and
+    # what fired that should not have.
+    per_scenario: Dict[str, dict] = {}
+    false_fires = rest_false_fires = 0
+    rest_seconds = 0.0
+    index = 0
+    previous_event = None
+    for segment in sequence.segments:
+        scenario = SCENARIOS[segment.name]
+        stats = per_scenario.setdefault(segment.name, {"segments": 0, "fired": 0, "time_to_fire": []})
+        stats["segments"] += 1
+        if segment.name == "rest":
+            rest_seconds += segment.end - segment.start
+        while index < len(events) and events[index][0] < segment.start:
+            index += 1
+        first = None
+        while index < len(events) and events[index][0] < segment.end:
+            timestamp, event = events[index]
+            index += 1
+            if event.key == scenario.event:
+                if first is None:
+                    first = timestamp
+            elif isinstance(event, DragEnd) or (event.key == previous_event and timestamp < segment.settled):
+                # Releasing a drag, or the previous gesture trailing while the hand changes pose.
+                continue
+            else:
+                false_fires += 1
+                if segment.name == "rest":
+                    rest_false_fires += 1
+        if first is not None:
+            stats["fired"] += 1
+            stats["time_to_fire"].append(first - segment.start)
+        previous_event = scenario.event
+
+    total_seconds = (sequence.timestamps[-1] - sequence.timestamps[0] + 1.0 / FPS) if sequence.timestamps else 0.0
+    labels = {}
+    for name, stats in sorted(per_scenario.items()):
+        label = SCENARIOS[name].label
+        entry = {
+            "precision": true_pos[label] / pred_count[label] if pred_count[label] else 1.0,
+            "recall": true_pos[label] / true_count[label] if true_count[label] else 1.0,
+        }
+        if SCENARIOS[name].event is not None:
+            entry["event_recall"] = stats["fired"] / stats["segments"]
+            entry["time_to_fire_ms"] = float(np.median(stats["time_to_fire"]) * 1e3) if stats["time_to_fire"] else None
+        labels[name] = entry
+
+    # Throughput of the gesture path and of the calibration loop, interleaved
+    # so both see the same machine state: the fastest of `loops` passes each,
+    # which is far less noisy than the mean on a busy machine.
+    best = best_calibration = float("inf")
+    points = np.random.default_rng(0).random((21, 3))
+    for _ in range(loops):
+        started = time.perf_counter()
+        _run(cfg, sequence)
+        best = min(best, time.perf_counter() - started)
+        started = time.perf_counter()
+        _calibration_pass(points)
+        best_calibration = min(best_calibration, time.perf_counter() - started)
+    fps = len(sequence.timestamps) / max(best, 1e-9)
+    calibration_rate = _CALIBRATION_ITERATIONS / max(best_calibration, 1e-9)
+
+    return {
+        "frames": len(sequence.timestamps),
+        "fps": fps,
+        "calibration_rate": calibration_rate,
+        # Machine-independent throughput: gesture frames per calibration iteration.
+        "relative_fps": fps / calibration_rate,
+        "false_fires_per_min": false_fires / max(total_seconds, 1e-9) * 60.0,
+        "rest_false_fires_per_min": rest_false_fires / max(rest_seconds, 1e-9) * 60.0,
+        "scenarios": labels,
+    }
+
+
+def compare(result: dict, baseline: dict, fps_tolerance: float, accuracy_tolerance: float, latency_tolerance_ms: float, false_fire_tolerance: float) -> List[str]:
+    """Human-readable regressions of `result` against `baseline` (empty = pass)."""
+    problems = []
+    # Raw fps depends on the machine; only the calibrated figure is compared
+    # (a baseline written before it existed has no throughput check).
+    if "relative_fps" in baseline and result["relative_fps"] < baseline["relative_fps"] * (1.0 - fps_tolerance):
+        problems.append(
+            f"throughput {result['relative_fps']:.3f}x calibration < baseline {baseline['relative_fps']:.3f}x - {fps_tolerance:.0%}"
+        )
+    for key in ("false_fires_per_min", "rest_false_fires_per_min"):
+        if result[key] > baseline[key] + false_fire_tolerance:
+            problems.append(f"{key} {result[key]:.2f} > baseline {baseline[key]:.2f} + {false_fire_tolerance}")
+    for name, base in baseline["scenarios"].items():
+        current = result["scenarios"].get(name)
+        if current is None:
+            problems.append(f"{name}: missing from this run")
+            continue
+        for metric in ("precision", "recall", "event_recall"):
+            if metric in base and current.get(metric, 0.0) < base[metric] - accuracy_tolerance:
+                problems.append(f"{name} {metric} {current.get(metric, 0.0):.3f} < baseline {base[metric]:.3f} - {accuracy_tolerance}")
+        if base.get("time_to_fire_ms") is not None:
+            ttf = current.get("time_to_fire_ms")
+            if ttf is None or ttf > base["time_to_fire_ms"] + latency_tolerance_ms:
+                shown = "never" if ttf is None else f"{ttf:.0f} ms"
+                problems.append(f"{name} time to fire {shown} > baseline {base['time_to_fire_ms']:.0f} ms + {latency_tolerance_ms:.0f}")
+    return problems
+
+
+def format_report(result: dict) -> str:
+    lines = [
+        f"Frames: {result['frames']}  Gesture path: {result['fps']:.0f} frames/s ({result['relative_fps']:.3f}x the calibration loop)",
+        f"False fires: {result['false_fires_per_min']:.2f}/min overall, {result['rest_false_fires_per_min']:.2f}/min at rest",
+        f"{'scenario':<18}{'precision':>10}{'recall':>8}{'fired':>8}{'to fire':>10}",
+    ]
+    for name, entry in result["scenarios"].items():
+        fired = f"{entry['event_recall']:.2f}" if "event_recall" in entry else "-"
+        ttf = entry.get("time_to_fire_ms")
+        ttf_text = f"{ttf:.0f} ms" if ttf is not None else "-"
+        lines.append(f"{name:<18}{entry['precision']:>10.3f}{entry['recall']:>8.3f}{fired:>8}{ttf_text:>10}")
+    return "\n".join(lines)
+
+
+def _config_with_overrides(assignments: List[str]):
+    types = {f.name: f.type for f in fields(CFG)}
+    overrides = {}
+    for assignment in assignments:
+        key, _, value = assignment.partition("=")
+        current = getattr(CFG, key, None)
+        if key not in types or current is None:
+            raise SystemExit(f"Unknown config field: {key}")
+        if isinstance(current, bool):
+            overrides[key] = value.strip().lower() in ("1", "true", "yes", "on")
+        else:
+            overrides[key] = type(current)(value)
+    return replace(CFG, **overrides)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--set", action="append", default=[], metavar="FIELD=VALUE", help="Override a Config field (repeatable)")
+    parser.add_argument("--session", help="Labeled .tclm recording instead of the synthetic script")
+    parser.add_argument("--labels", help="Segment labels for --session (JSON)")
+    parser.add_argument("--repeats", type=int, default=3, help="Synthetic script: times each gesture is performed")
+    parser.add_argument("--seed", type=int, default=7, help="Synthetic script: random seed")
+    parser.add_argument("--loops", type=int, default=5, help="Timed passes over the sequence (the fastest counts)")
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE), help="Baseline JSON file")
+    parser.add_argument("--update-baseline", action="store_true", help="Write this run as the new baseline")
+    parser.add_argument("--fps-tolerance", type=float, default=0.4, help="Allowed drop of calibrated throughput (fraction)")
+    parser.add_argument("--accuracy-tolerance", type=float, default=0.02, help="Allowed precision / recall drop")
+    parser.add_argument("--latency-tolerance-ms", type=float, default=50.0, help="Allowed time-to-fire increase")
+    parser.add_argument("--false-fire-tolerance", type=float, default=0.5, help="Allowed false fires/min increase")
+    args = parser.parse_args(argv)
+
+    cfg = _config_with_overrides(args.set)
+    if args.session:
+        if not args.labels:
+            parser.error("--session needs --labels")
+        sequence = recorded_sequence(args.session, args.labels)
+    else:
+        sequence = synthetic_sequence(repeats=max(1, args.repeats), seed=args.seed)
+
+    result = evaluate(cfg, sequence, loops=max(1, args.loops))
+    print(format_report(result))
+
+    baseline_path = Path(args.baseline)
+    if args.update_baseline:
+        # Raw rates only describe this machine; the baseline keeps relative_fps.
+        baseline = {key: value for key, value in result.items() if key not in ("fps", "calibration_rate")}
+        baseline_path.write_text(json.dumps(baseline, indent=2) + "\n", encoding="utf-8")
+        print(f"Baseline written to {baseline_path}")
+        return 0
+    if not baseline_path.exists():
+        print(f"No baseline at {baseline_path}; run with --update-baseline to create one.")
+        return 0
+    problems = compare(
+        result,
+        json.loads(baseline_path.read_text(encoding="utf-8")),
+        args.fps_tolerance,
+        args.accuracy_tolerance,
+        args.latency_tolerance_ms,
+        args.false_fire_tolerance,
+    )
+    if problems:
+        print("REGRESSION:")
+        for problem in problems:
+            print(f"  {problem}")
+        return 1
+    print("OK: within tolerance of the baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
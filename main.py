@@ -1,254 +1,413 @@
+import argparse
+import logging
+import os
+import signal
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+from pathlib import Path
 
 import cv2
 
-from config import CFG
+from config import CFG, Config
 from modules.camera import CameraStream
 from modules.cursor_controller import CursorController
+from modules.cursor_output import CursorOutputWorker
+from modules.eye_tracker import EyeTracker
+from modules.face_tracker import FaceTracker
+from modules.frame_source import open_frame_source, paced_source
 from modules.gesture_controller import GestureController
-from modules.hand_tracker import HandTracker
+from modules.hand_roles import select_hands
+from modules.hand_tracker import HandTracker, draw_hand
+from modules.landmark_store import LandmarkRecorder
+from modules.overlay import OverlayRenderer
+from modules.perception import PerceptionStage
+from modules.pipeline import LocalPipeline, ProcessPipeline, idle_gate_from_config
+from modules.quality_controller import AdaptiveQualityController
 from modules.smoothing import CursorSmoother
+from utils.metrics import MetricsHTTPServer, MetricsRegistry, PrometheusFileExporter
+from utils.profiler import AllocationTracer, ProfileReporter, StageProfiler, StartupTrace
 
-
-def _draw_semi_transparent_rect(frame, x1: int, y1: int, x2: int, y2: int, color_bgr, alpha: float):
-    """Draw a semi-transparent rectangle on frame (in-place)."""
-    roi = frame[y1:y2, x1:x2]
-    overlay = roi.copy()
-    cv2.rectangle(overlay, (0, 0), (x2 - x1, y2 - y1), color_bgr, -1)
-    cv2.addWeighted(overlay, alpha, roi, 1.0 - alpha, 0, roi)
-
-
-def draw_status(frame, fps: float, tracking: bool, gesture: str, dragging: bool, paused: bool):
-    if not tracking:
-        status_text = "Hand Lost"
-        status_color = (0, 0, 255)
-    elif paused:
-        status_text = "Paused (Touchpad Enabled)"
-        status_color = (0, 220, 255)
-    else:
-        status_text = "Pen Active"
-        status_color = (0, 200, 0)
-
-    h, w = frame.shape[:2]
-    margin = 16
-    box_w, box_h = 320, 110
-    x1 = w - box_w - margin
-    y1 = h - box_h - margin
-    x2, y2 = x1 + box_w, y1 + box_h
-
-    _draw_semi_transparent_rect(frame, x1, y1, x2, y2, (20, 20, 20), 0.65)
-    line_h = 26
-    base_y = y1 + 24
-    cv2.putText(frame, f"FPS: {fps:.1f}", (x1 + 12, base_y), cv2.FONT_HERSHEY_SIMPLEX, 0.65, (0, 220, 255), 2)
-    cv2.putText(frame, f"Status: {status_text}", (x1 + 12, base_y + line_h), cv2.FONT_HERSHEY_SIMPLEX, 0.6, status_color, 2)
-    cv2.putText(frame, f"Gesture: {gesture}", (x1 + 12, base_y + 2 * line_h), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 200, 0), 2)
-    cv2.putText(frame, f"Drag: {'ON' if dragging else 'OFF'}", (x1 + 12, base_y + 3 * line_h), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
-
-
-def draw_gesture_demo(frame):
-    lines = [
-        "--- Gesture Summary ---",
-        "",
-        "Pointer hand",
-        "  Index tip -> Move cursor",
-        "  Two fingers -> Scroll",
-        "  Open palm -> Pause tracking",
-        "",
-        "Gesture hand (mouse)",
-        "  Pinch -> Left click",
-        "  Two fingers -> Right click",
-        "  Thumbs up -> Double click",
-        "  Fist hold -> Drag",
-        "",
-        "Gesture hand (zoom)",
-        "  Three fingers spread -> Zoom in",
-        "  Three fingers pinch -> Zoom out",
-        "",
-        "Window control (gesture hand)",
-        "  Spider -> Close window",
-        "  Thumbs down -> Minimize",
-        "  Ring + pinky up -> Maximize",
-        "  Both hands: four fingers spread, thumb down -> Show all windows",
-        "",
-        "Press H to toggle this help",
-    ]
-    x, y = 20, 150
-    width = 460
-    height = 20 * len(lines) + 20
-    cv2.rectangle(frame, (x - 10, y - 20), (x + width, y - 20 + height), (15, 15, 15), -1)
-    for idx, line in enumerate(lines):
-        if not line:
-            continue
-        if line.startswith("---") or line.startswith("Pointer") or line.startswith("Gesture") or line.startswith("Window"):
-            color = (0, 220, 255)
-        else:
-            color = (220, 220, 220)
-        cv2.putText(
-            frame,
-            line,
-            (x, y + idx * 20),
-            cv2.FONT_HERSHEY_SIMPLEX,
-            0.5,
-            color,
-            1,
-        )
+log = logging.getLogger("touchless_cursor")
 
 
-def select_hands(hands, pointer_preference: str):
-    """Returns (pointer_hand, gesture_hand, gesture_handedness)."""
-    if not hands:
-        return None, None, None
-
-    pref = (pointer_preference or "").strip().lower()
-    pointer_idx = None
-    if pref in {"left", "right"}:
-        for idx, (_, handedness) in enumerate(hands):
-            if handedness and handedness.lower() == pref:
-                pointer_idx = idx
-                break
-
-    if pointer_idx is None:
-        pointer_idx = 0
-
-    pointer = hands[pointer_idx]
-    gesture = None
-    gesture_handedness = None
-    if len(hands) > 1:
-        for idx, hand in enumerate(hands):
-            if idx != pointer_idx:
-                gesture = hand
-                gesture_handedness = hand[1]  # handedness label
-                break
-
-    return pointer, gesture, gesture_handedness
-
-
-def main():
-    camera = CameraStream(CFG.camera_index, CFG.frame_width, CFG.frame_height)
-    hand_tracker = HandTracker(
-        CFG.hand_min_detection_confidence,
-        CFG.hand_min_tracking_confidence,
-        max_hands=CFG.max_hands,
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Touchless Cursor: hand-gesture controlled mouse.")
+    parser.add_argument(
+        "--headless",
+        action="store_true",
+        default=None,
+        help="Run without the preview window (no drawing or display work); stop with Ctrl+C / SIGTERM.",
     )
-
-    cursor = CursorController(
-        CFG.cursor_sensitivity_x,
-        CFG.cursor_sensitivity_y,
-        invert_x=CFG.invert_x,
-        invert_y=CFG.invert_y,
-        max_cursor_step_px=CFG.max_cursor_step_px,
-        pen_active_margin_x=CFG.pen_active_margin_x,
-        pen_active_margin_y=CFG.pen_active_margin_y,
+    parser.add_argument(
+        "--pipeline",
+        choices=("single", "multiprocess"),
+        default=None,
+        help="Run capture and hand inference inline (single) or in separate processes over shared memory.",
     )
-    smoother = CursorSmoother(alpha=CFG.smoothing_alpha, window_size=CFG.moving_average_window)
-    gestures = GestureController(
-        pinch_threshold=CFG.pinch_threshold,
-        v_shape_threshold=CFG.v_shape_threshold,
-        hold_seconds=CFG.gesture_hold_seconds,
-        click_cooldown_seconds=CFG.click_cooldown_seconds,
-        right_click_cooldown_seconds=CFG.right_click_cooldown_seconds,
-        double_click_cooldown_seconds=CFG.double_click_cooldown_seconds,
-        window_action_cooldown_seconds=CFG.window_action_cooldown_seconds,
-        scroll_gain=CFG.scroll_gain,
-        zoom_gain=CFG.zoom_gain,
-        gesture_switch_cooldown_seconds=CFG.gesture_switch_cooldown_seconds,
+    parser.add_argument(
+        "--trace-allocations",
+        action="store_true",
+        default=None,
+        help="Log per-frame heap allocations (tracemalloc); slows the loop down.",
     )
-
-    prev_time = time.time()
-    demo_until = prev_time + max(0.0, CFG.gesture_demo_seconds)
-    demo_pinned = False
-
+    parser.add_argument(
+        "--source",
+        default=None,
+        help='Frame source: "camera" or a camera index, "synthetic", an image directory or glob, or a video file.',
+    )
+    parser.add_argument(
+        "--fast",
+        action="store_true",
+        default=None,
+        help="Play recorded / synthetic sources as fast as possible instead of at their frame rate.",
+    )
+    parser.add_argument("--source-frames", type=int, default=None, help="Stop a synthetic source after N frames.")
+    parser.add_argument("--metrics-file", default=None, help="Periodically rewrite this file with Prometheus metrics.")
+    parser.add_argument("--metrics-port", type=int, default=None, help="Serve Prometheus metrics on http://127.0.0.1:PORT/metrics.")
+    return parser.parse_args(argv)
+
+
+def _source_overrides(source: str) -> dict:
+    if source == "camera":
+        return {"frame_source": "camera"}
+    if source.isdigit():
+        return {"frame_source": "camera", "camera_index": int(source)}
+    if source == "synthetic":
+        return {"frame_source": "synthetic"}
+    if os.path.isdir(source) or any(ch in source for ch in "*?["):
+        return {"frame_source": "images", "frame_source_path": source}
+    return {"frame_source": "video", "frame_source_path": source}
+
+
+def config_from_args(args) -> Config:
+    overrides = {}
+    if args.headless is not None:
+        overrides["headless"] = args.headless
+    if args.pipeline is not None:
+        overrides["pipeline_mode"] = args.pipeline
+    if args.trace_allocations is not None:
+        overrides["trace_allocations"] = args.trace_allocations
+    if args.source is not None:
+        overrides.update(_source_overrides(args.source))
+    if args.fast is not None:
+        overrides["frame_source_realtime"] = not args.fast
+    if args.source_frames is not None:
+        overrides["frame_source_frames"] = args.source_frames
+    if args.metrics_file is not None:
+        overrides["metrics_file"] = args.metrics_file
+    if args.metrics_port is not None:
+        overrides["metrics_http_port"] = args.metrics_port
+    return replace(CFG, **overrides)
+
+
+def _install_stop_handlers(stop: threading.Event) -> None:
+    """Clean shutdown on SIGINT / SIGTERM (and Ctrl+Break on Windows)."""
+
+    def _request_stop(signum, _frame):
+        log.info("Received signal %s, shutting down.", signum)
+        stop.set()
+
+    for name in ("SIGINT", "SIGTERM", "SIGBREAK"):
+        sig = getattr(signal, name, None)
+        if sig is not None:
+            signal.signal(sig, _request_stop)
+
+
+def _start_hand_tracker(cfg, profiler, metrics, startup: StartupTrace) -> HandTracker:
+    """Build the hand graph and run its warm-up frame (on a startup thread)."""
+    hand_tracker = HandTracker.from_config(cfg, profiler=profiler, metrics=metrics)
+    hand_tracker.warm_up(cfg.frame_width, cfg.frame_height)
+    startup.mark("hand_tracker_ready")
+    return hand_tracker
+
+
+def _close_startup(camera, startup_pool, hand_future, face_future) -> None:
+    """Release a single-process startup that failed before its LocalPipeline existed."""
+    if camera is not None:
+        camera.release()
+    if startup_pool is None:
+        return
+    # Waits for a model still loading, then closes whatever did load.
+    startup_pool.shutdown(cancel_futures=True)
+    for future in (hand_future, face_future):
+        if future is not None and not future.cancelled() and future.exception() is None:
+            future.result().close()
+
+
+def main(argv=None):
+    cfg = config_from_args(parse_args(argv))
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    startup = StartupTrace(logger=log)
+    metrics = MetricsRegistry() if cfg.metrics_file or cfg.metrics_http_port else None
+    profiler = None
+    if cfg.profile_stages or metrics is not None:
+        # With metrics the profiler's laps also feed per-stage CPU time.
+        cpu_seconds = None
+        if metrics is not None:
+            cpu_seconds = metrics.labeled_counter(
+                "touchless_stage_cpu_seconds_total", "Process CPU time spent in each main-loop stage.", "stage"
+            )
+        profiler = StageProfiler(cpu_seconds=cpu_seconds)
+    reporter = ProfileReporter(profiler, cfg.profile_report_seconds, logger=log) if cfg.profile_stages else None
+
+    quality = None
+    perception = None
+    # Everything below is created inside the try so a failing startup step
+    # (a model that does not load, a busy metrics port) still releases what
+    # was already opened.
+    pipeline = camera = cursor_output = recorder = allocations = None
+    startup_pool = hand_future = face_future = None
+    exporters = []
+    frames_processed = 0
     try:
-        while True:
-            frame = camera.read()
-            if frame is None:
+        if cfg.pipeline_mode == "multiprocess":
+            # Adaptive quality (if enabled) runs inside the inference process.
+            pipeline = ProcessPipeline(cfg, profiler=profiler, metrics=metrics)
+            startup.mark("pipeline_started")
+            if cfg.gaze_tracking:
+                log.warning("gaze_tracking is only supported with the single-process pipeline; ignoring it.")
+        else:
+            # MediaPipe graphs load (and the hand graph warms up) on helper threads
+            # while this thread opens the camera and the cursor output.
+            startup_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="startup")
+            hand_future = startup_pool.submit(_start_hand_tracker, cfg, profiler, metrics, startup)
+            if cfg.gaze_tracking:
+                face_future = startup_pool.submit(FaceTracker, cfg.face_min_detection_confidence, cfg.face_min_tracking_confidence)
+            camera = CameraStream(
+                cfg.camera_index,
+                cfg.frame_width,
+                cfg.frame_height,
+                # A recorded source played as fast as possible is read inline so
+                # every frame gets processed (a capture thread would drop most).
+                threaded=cfg.threaded_capture and paced_source(cfg),
+                profiler=profiler,
+                source=open_frame_source(cfg),
+            )
+            startup.mark("camera_open")
+
+        cursor = CursorController(
+            cfg.cursor_sensitivity_x,
+            cfg.cursor_sensitivity_y,
+            invert_x=cfg.invert_x,
+            invert_y=cfg.invert_y,
+            max_cursor_step_px=cfg.max_cursor_step_px,
+            pen_active_margin_x=cfg.pen_active_margin_x,
+            pen_active_margin_y=cfg.pen_active_margin_y,
+            track_position=cfg.cursor_position_model,
+            resync_seconds=cfg.cursor_resync_seconds,
+            metrics=metrics,
+        )
+        if cfg.async_cursor_output:
+            cursor = cursor_output = CursorOutputWorker(cursor, report_seconds=cfg.profile_report_seconds)
+        startup.mark("cursor_ready")
+        smoother = CursorSmoother(
+            alpha=cfg.smoothing_alpha,
+            window_size=cfg.moving_average_window,
+            mode=cfg.cursor_filter,
+            min_cutoff=cfg.one_euro_min_cutoff,
+            beta=cfg.one_euro_beta,
+            d_cutoff=cfg.one_euro_d_cutoff,
+        )
+        predict_max_seconds = cfg.cursor_predict_max_ms / 1000.0 if cfg.cursor_predict_latency else 0.0
+        gestures = GestureController.from_config(cfg, metrics=metrics)
+
+        if startup_pool is not None:
+            hand_tracker = hand_future.result()
+            tracker = hand_tracker
+            if face_future is not None:
+                tracker = perception = PerceptionStage(
+                    hand_tracker,
+                    face_future.result(),
+                    EyeTracker(alpha=cfg.gaze_smoothing_alpha),
+                    face_interval=cfg.face_inference_interval,
+                    profiler=profiler,
+                )
+            startup_pool.shutdown()
+            pipeline = LocalPipeline(camera, tracker, idle_gate=idle_gate_from_config(cfg, metrics=metrics))
+            if cfg.adaptive_quality:
+                quality = AdaptiveQualityController(
+                    hand_tracker,
+                    target_frame_seconds=cfg.target_frame_ms / 1000.0,
+                    levels=cfg.quality_levels,
+                    single_hand_seconds=cfg.single_hand_downgrade_seconds,
+                )
+
+        frames_total = frames_without_hands = None
+        if metrics is not None:
+            frames_total = metrics.counter("touchless_frames_total", "Frames processed by the main loop.")
+            frames_without_hands = metrics.counter("touchless_frames_without_hands_total", "Frames in which no hand was found.")
+            started_at = time.monotonic()
+            metrics.gauge("touchless_uptime_seconds", "Seconds since startup.", lambda: time.monotonic() - started_at)
+            metrics.gauge(
+                "touchless_startup_first_frame_seconds", "Seconds from startup to the first processed frame.", lambda: startup.elapsed("first_frame")
+            )
+            metrics.gauge(
+                "touchless_startup_first_move_seconds", "Seconds from startup to the first cursor move.", lambda: startup.elapsed("first_move")
+            )
+            if cfg.metrics_file:
+                exporters.append(PrometheusFileExporter(metrics, cfg.metrics_file, cfg.metrics_interval_seconds))
+            if cfg.metrics_http_port:
+                exporters.append(MetricsHTTPServer(metrics, cfg.metrics_http_port))
+
+        if cfg.record_sessions_dir:
+            session_name = time.strftime("session_%Y%m%d_%H%M%S.tclm")
+            recorder = LandmarkRecorder(str(Path(cfg.record_sessions_dir) / session_name), max_hands=cfg.max_hands)
+
+        stop = threading.Event()
+        _install_stop_handlers(stop)
+        if cfg.headless:
+            log.info("Running headless: preview disabled, send SIGINT/SIGTERM to stop.")
+
+        overlay = None if cfg.headless else OverlayRenderer()
+        pool = pipeline.pool
+        allocations = AllocationTracer(cfg.profile_report_seconds, logger=log) if cfg.trace_allocations else None
+        prev_time = time.time()
+        demo_until = prev_time + max(0.0, cfg.gesture_demo_seconds)
+        demo_pinned = False
+        run_started = time.perf_counter()
+
+        while not stop.is_set():
+            if profiler is not None:
+                profiler.start_frame()
+            if allocations is not None:
+                allocations.start_frame()
+            frame, hands = pipeline.read(want_frame=not cfg.headless)
+            if hands is None:
+                if pipeline.finished:
+                    log.info("Frame source finished.")
+                    break
                 continue
-
-            hands = hand_tracker.process(frame)
-            pointer_hand, gesture_hand, gesture_handedness = select_hands(hands, CFG.pointer_hand)
+            frames_processed += 1
+            if frames_processed == 1:
+                startup.mark("first_frame")
+            if frames_total is not None:
+                frames_total.inc()
+                if not hands:
+                    frames_without_hands.inc()
+            if recorder is not None:
+                recorder.write(pipeline.frame_timestamp, hands)
+            pointer_hand, gesture_hand, gesture_handedness = select_hands(hands, cfg.pointer_hand)
             pointer_landmarks = pointer_hand[0] if pointer_hand else None
             gesture_landmarks = gesture_hand[0] if gesture_hand else None
+            if profiler is not None:
+                profiler.lap("select_hands")
 
-            if CFG.draw_hand_landmarks:
-                for hand_landmarks, handedness in hands:
-                    label = handedness if CFG.draw_hand_handedness else None
-                    hand_tracker.draw(frame, hand_landmarks, label, draw_label=CFG.draw_hand_handedness)
-
-            gesture_result = gestures.detect(
+            gesture_state = gestures.update(
                 pointer_landmarks,
                 gesture_landmarks,
                 gesture_handedness=gesture_handedness,
-                allow_single_hand=not CFG.require_two_hands_for_gestures,
-                allow_pointer_scroll=CFG.allow_pointer_scroll,
-                pointer_scroll_requires_gesture_rest=CFG.pointer_scroll_requires_gesture_rest,
+                allow_single_hand=not cfg.require_two_hands_for_gestures,
+                allow_pointer_scroll=cfg.allow_pointer_scroll,
+                pointer_scroll_requires_gesture_rest=cfg.pointer_scroll_requires_gesture_rest,
             )
 
+            if profiler is not None:
+                profiler.lap("gesture")
+
             tracking = bool(hands)
-            paused = gesture_result["paused"]
+            paused = gesture_state.paused
 
             # Move cursor only when pointing (not when scrolling or zooming) so scroll doesn't move cursor
-            if gesture_result["pen_active"] and not paused and not gesture_result["scroll_mode"]:
-                pen_x, pen_y = gesture_result["pen_point"]
+            if gesture_state.pen_active and not paused and not gesture_state.scroll_mode:
+                pen_x, pen_y = gesture_state.pen_point
                 target = cursor.map_pen_to_screen(pen_x, pen_y)
-                smoothed = smoother.update(target)
+                # Capture-to-output latency of this frame, used as prediction lead.
+                lead = min(max(time.time() - pipeline.frame_timestamp, 0.0), predict_max_seconds)
+                smoothed = smoother.update(target, timestamp=pipeline.frame_timestamp, lead=lead)
                 cursor.move_cursor(int(smoothed[0]), int(smoothed[1]))
+                if "first_move" not in startup.marks:
+                    startup.mark("first_move")
+                    log.info("Startup trace: %s", startup.summary())
             else:
                 smoother.reset()
 
-            if gesture_result["click"]:
-                cursor.left_click()
-            if gesture_result["right_click"]:
-                cursor.right_click()
-            if gesture_result["double_click"]:
-                cursor.double_click()
-            if gesture_result["minimize_window"]:
-                cursor.minimize_window()
-            if gesture_result["maximize_window"]:
-                cursor.maximize_window()
-            if gesture_result["close_window"]:
-                cursor.close_window()
-            if gesture_result["show_all_windows"]:
-                cursor.show_all_windows()
-            if gesture_result["drag_down"]:
-                cursor.drag_down()
-            if gesture_result["drag_up"]:
-                cursor.drag_up()
-            if gesture_result["scroll_mode"] and abs(gesture_result["scroll_delta"]) > 0:
-                cursor.scroll(gesture_result["scroll_delta"])
-            if gesture_result["zoom_mode"] and abs(gesture_result["zoom_delta"]) > 0:
-                cursor.zoom(gesture_result["zoom_delta"])
+            # Clicks, drags, scroll/zoom steps and window actions: only what changed this frame.
+            for event in gesture_state.events:
+                event.apply(cursor)
+            if profiler is not None:
+                profiler.lap("cursor")
 
             now = time.time()
-            fps = 1.0 / max(now - prev_time, 1e-6)
+            if not cfg.headless and frame is not None:
+                fps = 1.0 / max(now - prev_time, 1e-6)
+                image = frame.bgr
+
+                if cfg.draw_hand_landmarks:
+                    for hand_landmarks, handedness in hands:
+                        label = handedness if cfg.draw_hand_handedness else None
+                        draw_hand(image, hand_landmarks, label, draw_label=cfg.draw_hand_handedness)
+                if perception is not None and perception.gaze is not None:
+                    h, w = image.shape[:2]
+                    gaze_point = (int(perception.gaze[0] * w), int(perception.gaze[1] * h))
+                    cv2.circle(image, gaze_point, 10, (255, 0, 255), 2)
+                overlay.draw_status(
+                    image,
+                    fps=fps,
+                    tracking=tracking,
+                    gesture=gesture_state.gesture,
+                    dragging=gesture_state.dragging,
+                    paused=paused,
+                    dropped=pipeline.dropped_frames,
+                )
+                if demo_pinned or now <= demo_until:
+                    overlay.draw_gesture_demo(image)
+                if reporter is not None:
+                    overlay.draw_profile(image, reporter.latest)
+
+                display = None
+                if cfg.display_scale != 1.0:
+                    h, w = image.shape[:2]
+                    display_w = int(w * cfg.display_scale)
+                    display_h = int(h * cfg.display_scale)
+                    display = pool.acquire((display_h, display_w, 3))
+                    cv2.resize(image, (display_w, display_h), dst=display, interpolation=cv2.INTER_LINEAR)
+                if profiler is not None:
+                    profiler.lap("overlay")
+                cv2.imshow("Touchless Cursor (Pen + Gestures)", image if display is None else display)
+                pool.release(display)
+                key = cv2.waitKey(1) & 0xFF
+                if profiler is not None:
+                    profiler.lap("display")
+                if key == 27:
+                    frame.release()
+                    break
+                if key in (ord("h"), ord("H")):
+                    demo_pinned = not demo_pinned
             prev_time = now
-
-            draw_status(
-                frame,
-                fps=fps,
-                tracking=tracking,
-                gesture=gesture_result["gesture"],
-                dragging=gesture_result["dragging"],
-                paused=paused,
-            )
-            if demo_pinned or time.time() <= demo_until:
-                draw_gesture_demo(frame)
-
-            if CFG.display_scale != 1.0:
-                h, w = frame.shape[:2]
-                display_w = int(w * CFG.display_scale)
-                display_h = int(h * CFG.display_scale)
-                frame = cv2.resize(frame, (display_w, display_h), interpolation=cv2.INTER_LINEAR)
-            cv2.imshow("Touchless Cursor (Pen + Gestures)", frame)
-            key = cv2.waitKey(1) & 0xFF
-            if key == 27:
-                break
-            if key in (ord("h"), ord("H")):
-                demo_pinned = not demo_pinned
+            if frame is not None:
+                frame.release()
+
+            if quality is not None:
+                # Measured from before inference, which the quality levels control.
+                quality.update(time.perf_counter() - pipeline.work_started, len(hands), now)
+            if profiler is not None:
+                profiler.end_frame()
+            if reporter is not None:
+                reporter.maybe_report(now)
+            if allocations is not None:
+                allocations.end_frame(now)
 
     finally:
-        camera.release()
-        hand_tracker.close()
-        cv2.destroyAllWindows()
+        if frames_processed:
+            elapsed = max(time.perf_counter() - run_started, 1e-9)
+            log.info("Processed %d frames in %.1f s (%.1f fps).", frames_processed, elapsed, frames_processed / elapsed)
+        for exporter in exporters:
+            exporter.close()
+        if allocations is not None:
+            allocations.report()
+            allocations.stop()
+        if cursor_output is not None:
+            cursor_output.close()
+        if recorder is not None:
+            recorder.close()
+        if pipeline is not None:
+            pipeline.close()
+        else:
+            _close_startup(camera, startup_pool, hand_future, face_future)
+        if not cfg.headless:
+            cv2.destroyAllWindows()
 
 
 if __name__ == "__main__":
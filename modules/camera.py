@@ -1,17 +1,144 @@
-﻿import cv2
+﻿import threading
+import time
+from typing import Optional
+
+import cv2
+
+from modules.frame import Frame, FrameBufferPool
+from modules.frame_source import CameraSource
 
 
 class CameraStream:
-    def __init__(self, index: int, width: int, height: int):
-        self.cap = cv2.VideoCapture(index)
-        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
-        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+    """Webcam capture with an optional background "latest frame" mode.
+
+    In threaded mode a capture thread reads and flips frames continuously and
+    keeps only the newest one, so the main loop always runs inference on the
+    freshest frame instead of draining stale frames queued by the driver.
+
+    read() returns a Frame whose buffers come from `pool` (the driver's
+    capture buffer is reused too); release() it once the loop is done with it.
+
+    `source` replaces the webcam with another FrameSource (video file, image
+    sequence, synthetic frames; see modules.frame_source).
+    """
+
+    def __init__(self, index: int, width: int, height: int, threaded: bool = False, profiler=None, source=None):
+        if source is None:
+            source = CameraSource(index, width, height)
+        self.cap = source
+        self.threaded = threaded
+        # Optional StageProfiler: read() laps "capture" and "flip"; in threaded
+        # mode the capture thread records "flip" itself and read() laps the wait.
+        self.profiler = profiler
+        self.pool = FrameBufferPool()
+        self._raw = None  # capture buffer, reused by cap.read()
+
+        # Metadata of the frame most recently returned by read().
+        self.frame_timestamp: float = 0.0
+        self.frame_sequence: int = 0
+        # Frames captured but overwritten before read() picked them up.
+        self.dropped_frames: int = 0
+        # Idle mode: when > 0, frames are only grabbed (not decoded) until
+        # decode_interval seconds have passed since the last decoded frame.
+        # Ignored for an unpaced source, which must deliver every frame.
+        self.decode_interval: float = 0.0
+        self._last_decoded: float = 0.0
+
+        self._cond = threading.Condition()
+        self._latest: Optional[Frame] = None
+        self._latest_sequence: int = 0
+        self._consumed_sequence: int = 0
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+        if threaded:
+            self._running = True
+            self._thread = threading.Thread(target=self._capture_loop, name="camera-capture", daemon=True)
+            self._thread.start()
+
+    def _read_frame(self):
+        if self.cap.paced:
+            while (self._running or not self.threaded) and time.monotonic() - self._last_decoded < self.decode_interval:
+                if not self.cap.grab():
+                    break
+        ok, frame = self.cap.read(self._raw)
+        self._last_decoded = time.monotonic()
+        if ok:
+            self._raw = frame
+        return ok, frame
+
+    def _flip(self, raw):
+        mirrored = self.pool.acquire(raw.shape, raw.dtype)
+        return cv2.flip(raw, 1, dst=mirrored)
+
+    def _capture_loop(self) -> None:
+        sequence = 0
+        while self._running:
+            ok, frame = self._read_frame()
+            if not ok:
+                if self.cap.finished:
+                    break
+                # Device hiccup; avoid a hot spin while it recovers.
+                time.sleep(0.005)
+                continue
+            timestamp = time.time()
+            flip_started = time.perf_counter()
+            sequence += 1
+            frame = Frame(self._flip(frame), timestamp, sequence, self.pool)
+            if self.profiler is not None:
+                self.profiler.record("flip", time.perf_counter() - flip_started)
+            with self._cond:
+                stale = self._latest
+                if self._latest_sequence > self._consumed_sequence:
+                    self.dropped_frames += 1
+                self._latest = frame
+                self._latest_sequence = sequence
+                self._cond.notify()
+            if stale is not None:
+                stale.release()
+
+    def read(self, timeout: float = 0.5):
+        if not self.threaded:
+            ok, frame = self._read_frame()
+            if not ok:
+                return None
+            self.frame_timestamp = time.time()
+            self.frame_sequence += 1
+            if self.profiler is not None:
+                self.profiler.lap("capture")
+            frame = Frame(self._flip(frame), self.frame_timestamp, self.frame_sequence, self.pool)
+            if self.profiler is not None:
+                self.profiler.lap("flip")
+            return frame
+
+        with self._cond:
+            if self._latest_sequence <= self._consumed_sequence:
+                self._cond.wait_for(lambda: self._latest_sequence > self._consumed_sequence or not self._running, timeout)
+            if self._latest_sequence <= self._consumed_sequence:
+                return None
+            frame = self._latest
+            self._latest = None
+            self._consumed_sequence = self._latest_sequence
+            self.frame_timestamp = frame.timestamp
+            self.frame_sequence = frame.sequence
+        if self.profiler is not None:
+            self.profiler.lap("capture")
+        return frame
 
-    def read(self):
-        ok, frame = self.cap.read()
-        if not ok:
-            return None
-        return cv2.flip(frame, 1)
+    @property
+    def finished(self) -> bool:
+        """True once a finite source has delivered its last frame (and read() has returned it)."""
+        if not self.cap.finished:
+            return False
+        if not self.threaded:
+            return True
+        with self._cond:
+            return self._latest_sequence <= self._consumed_sequence
 
     def release(self) -> None:
+        if self._thread is not None:
+            self._running = False
+            with self._cond:
+                self._cond.notify_all()
+            self._thread.join(timeout=1.0)
+            self._thread = None
         self.cap.release()
@@ -1,7 +1,20 @@
-import pyautogui
+import time
 
 from utils.math_utils import clamp
 
+# Imported by the first CursorController rather than at module load: importing
+# pyautogui connects to the display, which is slow and not needed by tools.
+pyautogui = None
+
+
+def _import_pyautogui():
+    global pyautogui
+    if pyautogui is None:
+        import pyautogui as module
+
+        pyautogui = module
+    return pyautogui
+
 
 class CursorController:
     def __init__(
@@ -13,7 +26,12 @@ class CursorController:
         max_cursor_step_px: int = 50,
         pen_active_margin_x: float = 0.15,
         pen_active_margin_y: float = 0.18,
+        track_position: bool = False,
+        resync_seconds: float = 0.5,
+        external_move_tolerance_px: int = 3,
+        metrics=None,
     ):
+        _import_pyautogui()
         pyautogui.FAILSAFE = False
         self.screen_width, self.screen_height = pyautogui.size()
         self.sensitivity_x = sensitivity_x
@@ -24,6 +42,22 @@ class CursorController:
         self.pen_active_margin_x = pen_active_margin_x
         self.pen_active_margin_y = pen_active_margin_y
 
+        # Position model: with track_position the controller trusts its own
+        # record of where it last put the cursor and only asks the OS every
+        # `resync_seconds` (also the first move after an idle spell), adopting
+        # the OS position when the user moved the pointer some other way.
+        self.track_position = track_position
+        self.resync_seconds = resync_seconds
+        self.external_move_tolerance_px = external_move_tolerance_px
+        self.external_moves = 0
+        self._position = None
+        self._synced_at = 0.0
+
+        # Optional MetricsRegistry: injected moves (rate() of the counter gives moves/s).
+        self._moves = None
+        if metrics is not None:
+            self._moves = metrics.counter("touchless_cursor_moves_total", "Cursor moves sent to the OS.")
+
     def map_pen_to_screen(self, pen_x: float, pen_y: float):
         active_min_x = self.pen_active_margin_x
         active_max_x = 1.0 - self.pen_active_margin_x
@@ -50,11 +84,35 @@ class CursorController:
         screen_y = int(ny * self.screen_height)
         return screen_x, screen_y
 
+    def _cursor_position(self):
+        if not self.track_position:
+            return pyautogui.position()
+        now = time.monotonic()
+        if self._position is None or now - self._synced_at >= self.resync_seconds:
+            actual = tuple(pyautogui.position())
+            if self._position is not None and (
+                abs(actual[0] - self._position[0]) > self.external_move_tolerance_px
+                or abs(actual[1] - self._position[1]) > self.external_move_tolerance_px
+            ):
+                self.external_moves += 1
+            self._position = actual
+            self._synced_at = now
+        return self._position
+
     def move_cursor(self, x: int, y: int) -> None:
-        cx, cy = pyautogui.position()
+        cx, cy = self._cursor_position()
         dx = int(clamp(x - cx, -self.max_cursor_step_px, self.max_cursor_step_px))
         dy = int(clamp(y - cy, -self.max_cursor_step_px, self.max_cursor_step_px))
-        pyautogui.moveTo(cx + dx, cy + dy, _pause=False)
+        nx, ny = cx + dx, cy + dy
+        pyautogui.moveTo(nx, ny, _pause=False)
+        if self._moves is not None:
+            self._moves.inc()
+        if self.track_position:
+            # The OS clamps the pointer to the screen; mirror that.
+            self._position = (
+                int(clamp(nx, 0, self.screen_width - 1)),
+                int(clamp(ny, 0, self.screen_height - 1)),
+            )
 
     def left_click(self) -> None:
         pyautogui.click(_pause=False)
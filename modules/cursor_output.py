@@ -0,0 +1,157 @@
+import logging
+import threading
+import time
+from collections import deque
+from typing import Optional
+
+from utils.profiler import LatencyHistogram
+
+
+log = logging.getLogger(__name__)
+
+# Operations that merge with an identical operation still waiting at the tail
+# of the queue: a newer move target replaces the pending one, scroll / zoom
+# deltas add up. Everything else is delivered one-for-one and in order.
+_REPLACE_OPS = ("move_cursor",)
+_SUM_OPS = ("scroll", "zoom")
+
+
+class CursorOutputWorker:
+    """Runs a CursorController's OS input injection on a background thread.
+
+    Exposes the same action methods as CursorController, but they only queue
+    the operation and return immediately, so slow input round-trips never
+    stall the vision loop. Merging only happens with the queue tail, so a
+    move queued before a click is still delivered before that click.
+    Queue depth and injection latency are logged every `report_seconds`.
+    """
+
+    def __init__(self, cursor, report_seconds: float = 5.0):
+        self.cursor = cursor
+        self.report_seconds = report_seconds
+
+        # Time spent inside the OS call, and time from enqueue to completion.
+        self.inject_latency = LatencyHistogram()
+        self.output_lag = LatencyHistogram()
+        self.max_queue_depth = 0
+        self.coalesced = 0
+
+        self._queue = deque()
+        self._cond = threading.Condition()
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="cursor-output", daemon=True)
+        self._thread.start()
+
+    # CursorController's pure mapping stays synchronous.
+    def map_pen_to_screen(self, pen_x: float, pen_y: float):
+        return self.cursor.map_pen_to_screen(pen_x, pen_y)
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._queue)
+
+    def _put(self, op: str, *args) -> None:
+        queued_at = time.perf_counter()
+        with self._cond:
+            queue = self._queue
+            if queue and queue[-1][0] == op and op in _REPLACE_OPS:
+                # Keep the older enqueue time so output_lag covers the whole wait.
+                queue[-1] = (op, args, queue[-1][2])
+                self.coalesced += 1
+            elif queue and queue[-1][0] == op and op in _SUM_OPS:
+                queue[-1] = (op, (queue[-1][1][0] + args[0],), queue[-1][2])
+                self.coalesced += 1
+            else:
+                queue.append((op, args, queued_at))
+                if len(queue) > self.max_queue_depth:
+                    self.max_queue_depth = len(queue)
+                self._cond.notify()
+
+    def move_cursor(self, x: int, y: int) -> None:
+        self._put("move_cursor", x, y)
+
+    def left_click(self) -> None:
+        self._put("left_click")
+
+    def right_click(self) -> None:
+        self._put("right_click")
+
+    def double_click(self) -> None:
+        self._put("double_click")
+
+    def drag_down(self) -> None:
+        self._put("drag_down")
+
+    def drag_up(self) -> None:
+        self._put("drag_up")
+
+    def scroll(self, amount: int) -> None:
+        self._put("scroll", amount)
+
+    def zoom(self, amount: int) -> None:
+        self._put("zoom", amount)
+
+    def minimize_window(self) -> None:
+        self._put("minimize_window")
+
+    def maximize_window(self) -> None:
+        self._put("maximize_window")
+
+    def close_window(self) -> None:
+        self._put("close_window")
+
+    def show_all_windows(self) -> None:
+        self._put("show_all_windows")
+
+    def _run(self) -> None:
+        next_report = time.perf_counter() + self.report_seconds
+        while True:
+            with self._cond:
+                if not self._queue and self._running:
+                    self._cond.wait(max(0.0, next_report - time.perf_counter()))
+                if not self._queue and not self._running:
+                    break
+                item = self._queue.popleft() if self._queue else None
+
+            if item is not None:
+                op, args, queued_at = item
+                if op in _SUM_OPS and args[0] == 0:
+                    # Opposite deltas cancelled out while queued.
+                    continue
+                started = time.perf_counter()
+                try:
+                    getattr(self.cursor, op)(*args)
+                except Exception:
+                    log.exception("Cursor output %s failed", op)
+                done = time.perf_counter()
+                self.inject_latency.add(done - started)
+                self.output_lag.add(done - queued_at)
+
+            now = time.perf_counter()
+            if now >= next_report:
+                next_report = now + self.report_seconds
+                self._report()
+
+    def _report(self) -> None:
+        if self.inject_latency.count:
+            log.info(
+                "Cursor output: %d ops, %d coalesced, max queue depth %d, inject p50/p95 %.1f/%.1f ms, lag p50/p95 %.1f/%.1f ms",
+                self.inject_latency.count,
+                self.coalesced,
+                self.max_queue_depth,
+                self.inject_latency.percentile(50) * 1e3,
+                self.inject_latency.percentile(95) * 1e3,
+                self.output_lag.percentile(50) * 1e3,
+                self.output_lag.percentile(95) * 1e3,
+            )
+        self.inject_latency.reset()
+        self.output_lag.reset()
+        self.max_queue_depth = len(self._queue)
+        self.coalesced = 0
+
+    def close(self, timeout: Optional[float] = 2.0) -> None:
+        """Deliver what is still queued (e.g. a pending drag release), then stop."""
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        self._thread.join(timeout=timeout)
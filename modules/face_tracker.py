@@ -1,12 +1,12 @@
-﻿import cv2
-
-try:
-    import mediapipe as mp
-except Exception as exc:
-    raise RuntimeError("MediaPipe is not installed correctly.") from exc
+﻿from modules.frame import rgb_of
 
 
 def _get_face_mesh_module():
+    # Imported on first use, like in hand_tracker (mediapipe is slow to import).
+    try:
+        import mediapipe as mp
+    except Exception as exc:
+        raise RuntimeError("MediaPipe is not installed correctly.") from exc
     if hasattr(mp, "solutions") and hasattr(mp.solutions, "face_mesh"):
         return mp.solutions.face_mesh
     raise RuntimeError(
@@ -27,7 +27,7 @@ class FaceTracker:
         )
 
     def process(self, frame_bgr):
-        rgb = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2RGB)
+        rgb = rgb_of(frame_bgr)
         result = self._face_mesh.process(rgb)
         if not result.multi_face_landmarks:
             return None
@@ -0,0 +1,85 @@
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+
+class FrameBufferPool:
+    """Free lists of preallocated image buffers, keyed by shape and dtype.
+
+    acquire() hands out a recycled buffer when one of the right shape is
+    free and allocates otherwise; release() gives it back. In a steady state
+    (same resolution every frame) no image memory is allocated at all.
+    """
+
+    def __init__(self, max_free_per_shape: int = 4):
+        self.max_free_per_shape = max_free_per_shape
+        self._free: Dict[Tuple[tuple, str], List[np.ndarray]] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, shape, dtype=np.uint8) -> np.ndarray:
+        key = (tuple(shape), np.dtype(dtype).str)
+        with self._lock:
+            free = self._free.get(key)
+            if free:
+                return free.pop()
+        return np.empty(shape, dtype=dtype)
+
+    def release(self, buffer: Optional[np.ndarray]) -> None:
+        if buffer is None:
+            return
+        key = (buffer.shape, buffer.dtype.str)
+        with self._lock:
+            free = self._free.setdefault(key, [])
+            if len(free) < self.max_free_per_shape:
+                free.append(buffer)
+
+
+class Frame:
+    """One captured frame shared by every stage of the loop.
+
+    Carries the (mirrored) BGR image plus capture metadata, and converts to
+    RGB at most once, on first access of `rgb`, into a pooled buffer, so the
+    hand and face trackers share a single conversion. release() returns the
+    buffers to the pool; the frame must not be used afterwards.
+    """
+
+    __slots__ = ("bgr", "timestamp", "sequence", "_rgb", "_pool")
+
+    def __init__(self, bgr: np.ndarray, timestamp: float = 0.0, sequence: int = 0, pool: Optional[FrameBufferPool] = None):
+        self.bgr = bgr
+        self.timestamp = timestamp
+        self.sequence = sequence
+        self._rgb: Optional[np.ndarray] = None
+        self._pool = pool
+
+    @property
+    def shape(self):
+        return self.bgr.shape
+
+    @property
+    def rgb(self) -> np.ndarray:
+        if self._rgb is None:
+            dst = self._pool.acquire(self.bgr.shape) if self._pool is not None else None
+            self._rgb = cv2.cvtColor(self.bgr, cv2.COLOR_BGR2RGB, dst=dst)
+        return self._rgb
+
+    def release(self) -> None:
+        if self._pool is not None:
+            self._pool.release(self.bgr)
+            self._pool.release(self._rgb)
+        self.bgr = None
+        self._rgb = None
+
+
+def bgr_of(frame) -> np.ndarray:
+    """BGR image of a Frame or a plain array."""
+    return frame.bgr if isinstance(frame, Frame) else frame
+
+
+def rgb_of(frame) -> np.ndarray:
+    """RGB image of a Frame (shared, converted once) or a plain BGR array."""
+    if isinstance(frame, Frame):
+        return frame.rgb
+    return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
@@ -0,0 +1,234 @@
+import abc
+import glob
+import os
+import time
+from typing import List, Optional
+
+import cv2
+import numpy as np
+
+
+class FrameSource(abc.ABC):
+    """Where CameraStream gets its frames from.
+
+    Sources follow the slice of the cv2.VideoCapture API that CameraStream
+    uses: read(image=None) -> (ok, frame), grab() -> ok (skip a frame without
+    decoding it) and release(). `finished` turns True once a finite source
+    has run out, so the loop can stop instead of waiting for more frames.
+
+    Recorded and synthetic sources are paced at `fps` when `realtime` is set
+    (like a camera) and run as fast as the consumer pulls otherwise. Only
+    `paced` sources may have frames skipped (idle mode): an unpaced run is
+    meant to process every frame.
+    """
+
+    finished = False
+
+    def __init__(self, fps: float = 30.0, realtime: bool = True):
+        self.fps = fps if fps > 0 else 30.0
+        self.realtime = realtime
+        self._started: Optional[float] = None
+        self._delivered = 0
+
+    @property
+    def paced(self) -> bool:
+        """True when frames arrive in real time rather than as fast as they are read."""
+        return self.realtime
+
+    def _pace(self) -> None:
+        """Wait for the next frame slot (realtime mode) and count the frame."""
+        if self.realtime:
+            now = time.monotonic()
+            if self._started is None:
+                self._started = now
+            due = self._started + self._delivered / self.fps
+            if due > now:
+                time.sleep(due - now)
+        self._delivered += 1
+
+    def grab(self) -> bool:
+        ok, _ = self.read()
+        return ok
+
+    @abc.abstractmethod
+    def read(self, image: Optional[np.ndarray] = None):
+        """(ok, frame), reusing `image` as the output buffer when it fits."""
+
+    def release(self) -> None:
+        pass
+
+
+class CameraSource(FrameSource):
+    """A live webcam (cv2.VideoCapture(index)); the driver paces it."""
+
+    def __init__(self, index: int, width: int, height: int):
+        super().__init__(realtime=False)
+        self.cap = cv2.VideoCapture(index)
+        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+
+    @property
+    def paced(self) -> bool:
+        return True
+
+    def grab(self) -> bool:
+        return self.cap.grab()
+
+    def read(self, image: Optional[np.ndarray] = None):
+        return self.cap.read(image)
+
+    def release(self) -> None:
+        self.cap.release()
+
+
+class VideoFileSource(FrameSource):
+    """A video file, at its native frame rate (`realtime`) or as fast as possible."""
+
+    def __init__(self, path: str, realtime: bool = True, loop: bool = False):
+        self.cap = cv2.VideoCapture(path)
+        if not self.cap.isOpened():
+            raise ValueError(f"Cannot open video file: {path}")
+        super().__init__(fps=self.cap.get(cv2.CAP_PROP_FPS), realtime=realtime)
+        self.path = path
+        self.loop = loop
+
+    def _rewind(self) -> bool:
+        if not self.loop:
+            self.finished = True
+            return False
+        self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+        return True
+
+    def grab(self) -> bool:
+        self._pace()
+        if self.cap.grab():
+            return True
+        return self._rewind() and self.cap.grab()
+
+    def read(self, image: Optional[np.ndarray] = None):
+        self._pace()
+        ok, frame = self.cap.read(image)
+        if not ok and self._rewind():
+            ok, frame = self.cap.read(image)
+        return ok, frame
+
+    def release(self) -> None:
+        self.cap.release()
+
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp")
+
+
+class ImageSequenceSource(FrameSource):
+    """Still images (a directory, read in name order, or a glob pattern) played as video."""
+
+    def __init__(self, pattern: str, fps: float = 30.0, realtime: bool = True, loop: bool = False):
+        super().__init__(fps=fps, realtime=realtime)
+        if os.path.isdir(pattern):
+            paths = [os.path.join(pattern, name) for name in os.listdir(pattern)]
+            paths = [p for p in paths if p.lower().endswith(IMAGE_EXTENSIONS)]
+        else:
+            paths = glob.glob(pattern)
+        self.paths: List[str] = sorted(paths)
+        if not self.paths:
+            raise ValueError(f"No images found for {pattern}")
+        self.loop = loop
+        self._index = 0
+
+    def _next_path(self) -> Optional[str]:
+        if self._index >= len(self.paths):
+            if not self.loop:
+                self.finished = True
+                return None
+            self._index = 0
+        path = self.paths[self._index]
+        self._index += 1
+        return path
+
+    def grab(self) -> bool:
+        self._pace()
+        return self._next_path() is not None
+
+    def read(self, image: Optional[np.ndarray] = None):
+        self._pace()
+        path = self._next_path()
+        if path is None:
+            return False, None
+        frame = cv2.imread(path, cv2.IMREAD_COLOR)
+        if frame is None:
+            return False, None
+        if image is not None and image.shape == frame.shape:
+            np.copyto(image, frame)
+            return True, image
+        return True, frame
+
+
+class SyntheticSource(FrameSource):
+    """Deterministic generated frames: a fixed noisy backdrop with a bright
+    disc moving along a Lissajous path. `frames` > 0 ends the stream after
+    that many frames."""
+
+    def __init__(self, width: int, height: int, fps: float = 30.0, realtime: bool = True, frames: int = 0, seed: int = 0):
+        super().__init__(fps=fps, realtime=realtime)
+        self.width = width
+        self.height = height
+        self.frames = frames
+        rng = np.random.default_rng(seed)
+        gradient = np.linspace(40, 200, width, dtype=np.float32)[None, :, None]
+        noise = rng.normal(0.0, 6.0, (height, width, 3)).astype(np.float32)
+        self._background = np.clip(gradient + noise, 0, 255).astype(np.uint8)
+        self._index = 0
+
+    def _advance(self) -> Optional[int]:
+        if self.frames and self._index >= self.frames:
+            self.finished = True
+            return None
+        self._index += 1
+        return self._index - 1
+
+    def grab(self) -> bool:
+        self._pace()
+        return self._advance() is not None
+
+    def read(self, image: Optional[np.ndarray] = None):
+        self._pace()
+        index = self._advance()
+        if index is None:
+            return False, None
+        if image is None or image.shape != self._background.shape:
+            image = np.empty_like(self._background)
+        np.copyto(image, self._background)
+        t = index / self.fps
+        center = (
+            int(self.width * (0.5 + 0.35 * np.sin(t * 1.3))),
+            int(self.height * (0.5 + 0.35 * np.sin(t * 1.7 + 0.5))),
+        )
+        cv2.circle(image, center, max(4, self.height // 12), (230, 210, 190), -1)
+        return True, image
+
+
+def paced_source(cfg) -> bool:
+    """Whether the source selected by `cfg` is paced (see FrameSource.paced)."""
+    return cfg.frame_source == "camera" or cfg.frame_source_realtime
+
+
+def open_frame_source(cfg) -> FrameSource:
+    """The FrameSource selected by cfg.frame_source ("camera", "video", "images", "synthetic")."""
+    kind = cfg.frame_source
+    if kind == "camera":
+        return CameraSource(cfg.camera_index, cfg.frame_width, cfg.frame_height)
+    if kind == "video":
+        return VideoFileSource(cfg.frame_source_path, realtime=cfg.frame_source_realtime, loop=cfg.frame_source_loop)
+    if kind == "images":
+        return ImageSequenceSource(
+            cfg.frame_source_path, fps=cfg.frame_source_fps, realtime=cfg.frame_source_realtime, loop=cfg.frame_source_loop
+        )
+    if kind == "synthetic":
+        return SyntheticSource(
+            cfg.frame_width,
+            cfg.frame_height,
+            fps=cfg.frame_source_fps,
+            realtime=cfg.frame_source_realtime,
+            frames=cfg.frame_source_frames,
+        )
+    raise ValueError(f"Unknown frame_source: {kind}")
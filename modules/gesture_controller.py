@@ -1,7 +1,24 @@
 import time
-from typing import Dict, Optional, Tuple
-
-from utils.math_utils import distance_2d
+from typing import Dict, Optional
+
+import numpy as np
+
+from modules.gesture_events import ACTION_EVENTS, DRAG_END, DRAG_START, GestureEvent, GestureState, Scroll, Zoom
+from modules.gesture_rules import (
+    BOTH_HANDS_SHOW_WINDOWS,
+    GESTURE_RULES,
+    INDEX_UP,
+    MIDDLE_UP,
+    PINCH,
+    PINKY_UP,
+    RING_PINKY_UP,
+    RING_UP,
+    SPIDER,
+    THUMBS_DOWN,
+    THUMBS_UP,
+    CompiledGestureRules,
+)
+from utils.landmarks import landmarks_to_array
 
 
 TIP_IDS = {
@@ -28,6 +45,112 @@ MCP_IDS = {
 }
 
 
+# Tip-to-wrist / pip-to-wrist ratio thresholds: > 1 => extended, < 1 => curled.
+EXTENDED_RATIO = 1.05  # finger clearly extended
+CURLED_RATIO = 1.0  # finger clearly curled
+# Thumb tip must be this far from its MCP to count as extended (so a fist is not a thumbs-down).
+THUMB_EXTENDED_MIN = 0.06
+# Minimum spread (index-tip to pinky-tip distance) for show-all-windows — keeps gesture distinct.
+SHOW_WINDOWS_SPREAD_MIN = 0.14
+
+_FINGERS = ("index", "middle", "ring", "pinky")
+
+# Every 2D difference vector the classifier needs, as (from, to) landmark pairs:
+# 0-3 finger tip->wrist, 4-7 finger pip->wrist, 8 thumb tip->index tip (pinch),
+# 9 thumb tip->thumb MCP, 10 index tip->pinky tip (spread),
+# 11 index tip->middle tip, 12 middle tip->ring tip (zoom spread),
+# 13-16 finger tip->pip (finger-up test).
+_PAIRS = (
+    [(TIP_IDS[f], 0) for f in _FINGERS]
+    + [(PIP_IDS[f], 0) for f in _FINGERS]
+    + [
+        (TIP_IDS["thumb"], TIP_IDS["index"]),
+        (TIP_IDS["thumb"], MCP_IDS["thumb"]),
+        (TIP_IDS["index"], TIP_IDS["pinky"]),
+        (TIP_IDS["index"], TIP_IDS["middle"]),
+        (TIP_IDS["middle"], TIP_IDS["ring"]),
+    ]
+    + [(TIP_IDS[f], PIP_IDS[f]) for f in _FINGERS]
+)
+_NUM_DISTANCES = 13
+# One (pairs, 21) +1/-1 matrix turns all of them into a single matmul per hand.
+_DIFF_MATRIX = np.zeros((len(_PAIRS), 21))
+for _row, (_a, _b) in enumerate(_PAIRS):
+    _DIFF_MATRIX[_row, _a] += 1.0
+    _DIFF_MATRIX[_row, _b] -= 1.0
+
+
+class HandFeatures:
+    """Every per-hand quantity the gesture logic reads, computed once per frame."""
+
+    __slots__ = (
+        "finger_up",
+        "fingers_up_count",
+        "ext_ratio",
+        "thumb_up",
+        "thumb_down",
+        "pinch_distance",
+        "open_palm",
+        "thumbs_up",
+        "thumbs_down",
+        "spider",
+        "ring_pinky_up",
+        "show_all_windows",
+        "zoom_spread",
+        "pen_point",
+        "scroll_y",
+        "pose_mask",
+    )
+
+
+def extract_hand_features(hand_landmarks) -> HandFeatures:
+    """Build the HandFeatures record for one hand (protobuf landmarks or a (21, 3) array)."""
+    xy = landmarks_to_array(hand_landmarks)[:, :2].astype(np.float64)
+    diff = _DIFF_MATRIX @ xy
+    dist = np.hypot(diff[:_NUM_DISTANCES, 0], diff[:_NUM_DISTANCES, 1]).tolist()
+    # Image y grows downward: a finger is up when its tip is above its pip.
+    index_up, middle_up, ring_up, pinky_up = [dy < 0.0 for dy in diff[_NUM_DISTANCES:, 1].tolist()]
+    idx_r, mid_r, rng_r, pnk_r = [tip / pip if pip > 1e-6 else 0.0 for tip, pip in zip(dist[0:4], dist[4:8])]
+    pinch, thumb_extension, spread, idx_mid, mid_rng = dist[8:_NUM_DISTANCES]
+    thumb_dy = diff[9, 1]
+
+    f = HandFeatures()
+    f.finger_up = (index_up, middle_up, ring_up, pinky_up)
+    f.fingers_up_count = index_up + middle_up + ring_up + pinky_up
+    f.ext_ratio = (idx_r, mid_r, rng_r, pnk_r)
+    f.thumb_up = bool(thumb_dy < 0.0)
+    f.thumb_down = bool(thumb_dy > 0.0)
+    f.pinch_distance = pinch
+    all_curled = f.fingers_up_count == 0
+
+    f.open_palm = f.fingers_up_count >= 4
+    f.thumbs_up = f.thumb_up and all_curled
+    # Thumbs down needs an extended thumb so a fist is not mistaken for it.
+    f.thumbs_down = all_curled and f.thumb_down and thumb_extension > THUMB_EXTENDED_MIN
+    # Spider: index + pinky extended, middle + ring curled. Wrist-distance ratios
+    # keep this robust when the hand is tilted or rotated.
+    f.spider = idx_r > EXTENDED_RATIO and pnk_r > EXTENDED_RATIO and mid_r < CURLED_RATIO and rng_r < CURLED_RATIO
+    # Maximize: only ring and pinky extended.
+    f.ring_pinky_up = idx_r < CURLED_RATIO and mid_r < CURLED_RATIO and rng_r > EXTENDED_RATIO and pnk_r > EXTENDED_RATIO
+    # Show-all-windows (one hand of it): four fingers up and spread, thumb down.
+    f.show_all_windows = f.fingers_up_count == 4 and f.thumb_down and spread >= SHOW_WINDOWS_SPREAD_MIN
+    f.zoom_spread = idx_mid + mid_rng
+    index_x, index_y = xy[TIP_IDS["index"]].tolist()
+    f.pen_point = (index_x, index_y)
+    f.scroll_y = (index_y + float(xy[TIP_IDS["middle"], 1])) * 0.5
+    f.pose_mask = (
+        (INDEX_UP if index_up else 0)
+        | (MIDDLE_UP if middle_up else 0)
+        | (RING_UP if ring_up else 0)
+        | (PINKY_UP if pinky_up else 0)
+        | (THUMBS_UP if f.thumbs_up else 0)
+        | (THUMBS_DOWN if f.thumbs_down else 0)
+        | (SPIDER if f.spider else 0)
+        | (RING_PINKY_UP if f.ring_pinky_up else 0)
+    )
+    return f
+
+
 class GestureController:
     def __init__(
         self,
@@ -41,6 +164,7 @@ class GestureController:
         scroll_gain: float,
         zoom_gain: float,
         gesture_switch_cooldown_seconds: float = 0.3,
+        metrics=None,
     ):
         self.pinch_threshold = pinch_threshold
         self.v_shape_threshold = v_shape_threshold
@@ -53,15 +177,22 @@ class GestureController:
         self.zoom_gain = zoom_gain
         self.gesture_switch_cooldown_seconds = gesture_switch_cooldown_seconds
 
-        self._active_gesture: Optional[str] = None
+        # Gesture table compiled once; per-action cooldowns come from the settings above.
+        self._rules = CompiledGestureRules(
+            GESTURE_RULES,
+            {
+                "click_cooldown_seconds": click_cooldown_seconds,
+                "right_click_cooldown_seconds": right_click_cooldown_seconds,
+                "double_click_cooldown_seconds": double_click_cooldown_seconds,
+                "window_action_cooldown_seconds": window_action_cooldown_seconds,
+            },
+        )
+        self._fist_id = self._rules.gesture_id("fist")
+        self._zoom_id = self._rules.gesture_id("three_fingers")
+
+        self._active_gesture: Optional[int] = None
         self._gesture_started_at: float = 0.0
-        self._last_left_click_at: float = 0.0
-        self._last_right_click_at: float = 0.0
-        self._last_double_click_at: float = 0.0
-        self._last_minimize_at: float = 0.0
-        self._last_maximize_at: float = 0.0
-        self._last_close_at: float = 0.0
-        self._last_show_all_windows_at: float = 0.0
+        self._last_action_at = [0.0] * len(self._rules.actions)
         self._last_gesture_action_at: float = 0.0
 
         self._dragging = False
@@ -71,148 +202,41 @@ class GestureController:
         self._previous_pointer_scroll_y = None
         self._scroll_smoothed: float = 0.0  # for smooth scroll output
 
-    @staticmethod
-    def _finger_up(hand_landmarks, tip_idx: int, pip_idx: int) -> bool:
-        return hand_landmarks.landmark[tip_idx].y < hand_landmarks.landmark[pip_idx].y
-
-    @staticmethod
-    def _point(hand_landmarks, idx: int) -> Tuple[float, float]:
-        lm = hand_landmarks.landmark[idx]
-        return lm.x, lm.y
-
-    def _finger_states(self, hand_landmarks):
-        index_up = self._finger_up(hand_landmarks, TIP_IDS["index"], PIP_IDS["index"])
-        middle_up = self._finger_up(hand_landmarks, TIP_IDS["middle"], PIP_IDS["middle"])
-        ring_up = self._finger_up(hand_landmarks, TIP_IDS["ring"], PIP_IDS["ring"])
-        pinky_up = self._finger_up(hand_landmarks, TIP_IDS["pinky"], PIP_IDS["pinky"])
-        return index_up, middle_up, ring_up, pinky_up
-
-    def _is_open_palm(self, hand_landmarks) -> bool:
-        if hand_landmarks is None:
-            return False
-        index_up, middle_up, ring_up, pinky_up = self._finger_states(hand_landmarks)
-        return (index_up + middle_up + ring_up + pinky_up) >= 4
+        # Reused every frame; update() resets it in place and fills its events.
+        self.state = GestureState()
+        self._action_events = [ACTION_EVENTS[action] for action in self._rules.actions]
+        self._subscribers = []
+
+        # Optional MetricsRegistry: gesture activations, fired events, drag sessions.
+        self._activations = self._actions = self._drags = None
+        self._last_label = "none"
+        if metrics is not None:
+            self._activations = metrics.labeled_counter("touchless_gesture_activations_total", "Times each gesture label became active.", "gesture")
+            self._actions = metrics.labeled_counter("touchless_gesture_actions_total", "Gesture events fired, by detect() result key.", "action")
+            self._drags = metrics.counter("touchless_drag_sessions_total", "Drags started (fist hold).")
+
+    @classmethod
+    def from_config(cls, cfg, metrics=None) -> "GestureController":
+        return cls(
+            pinch_threshold=cfg.pinch_threshold,
+            v_shape_threshold=cfg.v_shape_threshold,
+            hold_seconds=cfg.gesture_hold_seconds,
+            click_cooldown_seconds=cfg.click_cooldown_seconds,
+            right_click_cooldown_seconds=cfg.right_click_cooldown_seconds,
+            double_click_cooldown_seconds=cfg.double_click_cooldown_seconds,
+            window_action_cooldown_seconds=cfg.window_action_cooldown_seconds,
+            scroll_gain=cfg.scroll_gain,
+            zoom_gain=cfg.zoom_gain,
+            gesture_switch_cooldown_seconds=cfg.gesture_switch_cooldown_seconds,
+            metrics=metrics,
+        )
 
     def is_open_palm(self, hand_landmarks) -> bool:
-        return self._is_open_palm(hand_landmarks)
-
-    def _is_thumb_down(self, hand_landmarks) -> bool:
-        """Thumb extended downward (tip below MCP) with all other fingers curled.
-        Requires thumb to be extended (not curled in a fist) so we don't confuse fist with thumbs-down.
-        """
-        if hand_landmarks is None:
-            return False
-        thumb_tip = hand_landmarks.landmark[TIP_IDS["thumb"]]
-        thumb_mcp = hand_landmarks.landmark[MCP_IDS["thumb"]]
-        index_up, middle_up, ring_up, pinky_up = self._finger_states(hand_landmarks)
-        all_fingers_curled = not index_up and not middle_up and not ring_up and not pinky_up
-        if not all_fingers_curled:
-            return False
-        # Thumb pointing downward: tip below MCP (higher y = lower in frame)
-        thumb_down = thumb_tip.y > thumb_mcp.y
-        # Thumb must be extended (not curled): tip reasonably far from MCP so we don't treat fist as thumbs-down
-        thumb_extended = distance_2d(
-            (thumb_tip.x, thumb_tip.y),
-            (thumb_mcp.x, thumb_mcp.y),
-        ) > 0.06
-        return thumb_down and thumb_extended
-
-    def _is_spider(self, hand_landmarks) -> bool:
-        """Spider-Man / spidy gesture: index + pinky up, middle + ring curled.
-
-        Uses distance-based checks (tip-to-wrist vs pip-to-wrist) so detection
-        is robust even when the hand is tilted or rotated.
-        """
         if hand_landmarks is None:
             return False
+        return extract_hand_features(hand_landmarks).open_palm
 
-        lm = hand_landmarks.landmark
-        wrist = (lm[0].x, lm[0].y)
-
-        def _ext_ratio(finger: str) -> float:
-            """Return tip-to-wrist / pip-to-wrist.  > 1 ⇒ extended, < 1 ⇒ curled."""
-            tip = (lm[TIP_IDS[finger]].x, lm[TIP_IDS[finger]].y)
-            pip = (lm[PIP_IDS[finger]].x, lm[PIP_IDS[finger]].y)
-            d_tip = distance_2d(tip, wrist)
-            d_pip = distance_2d(pip, wrist)
-            return d_tip / d_pip if d_pip > 1e-6 else 0.0
-
-        idx_r = _ext_ratio("index")
-        mid_r = _ext_ratio("middle")
-        rng_r = _ext_ratio("ring")
-        pnk_r = _ext_ratio("pinky")
-
-        # Index & pinky should be extended (ratio well above 1)
-        # Middle & ring should be curled  (ratio below 1)
-        extended_thresh = 1.05   # finger clearly extended
-        curled_thresh   = 1.0    # finger clearly curled
-
-        index_ext = idx_r > extended_thresh
-        pinky_ext = pnk_r > extended_thresh
-        middle_cur = mid_r < curled_thresh
-        ring_cur   = rng_r < curled_thresh
-
-        return index_ext and pinky_ext and middle_cur and ring_cur
-
-    def _is_ring_pinky_up(self, hand_landmarks) -> bool:
-        """Only ring and pinky extended; index and middle curled. Used for maximize.
-        Uses wrist-distance ratios (like spider) so it's robust and doesn't conflict with pinch."""
-        if hand_landmarks is None:
-            return False
-        lm = hand_landmarks.landmark
-        wrist = (lm[0].x, lm[0].y)
-
-        def _ext_ratio(finger: str) -> float:
-            tip = (lm[TIP_IDS[finger]].x, lm[TIP_IDS[finger]].y)
-            pip = (lm[PIP_IDS[finger]].x, lm[PIP_IDS[finger]].y)
-            d_tip = distance_2d(tip, wrist)
-            d_pip = distance_2d(pip, wrist)
-            return d_tip / d_pip if d_pip > 1e-6 else 0.0
-
-        extended_thresh = 1.05
-        curled_thresh = 1.0
-        index_curled = _ext_ratio("index") < curled_thresh
-        middle_curled = _ext_ratio("middle") < curled_thresh
-        ring_extended = _ext_ratio("ring") > extended_thresh
-        pinky_extended = _ext_ratio("pinky") > extended_thresh
-        return index_curled and middle_curled and ring_extended and pinky_extended
-
-    # Minimum spread (index-tip to pinky-tip distance) for show-all-windows — keeps gesture distinct.
-    SHOW_WINDOWS_SPREAD_MIN = 0.14
-
-    def _is_show_all_windows_gesture(self, hand_landmarks) -> bool:
-        """Clean, distinct gesture for show-all-windows: four fingers up, thumb down, fingers spread.
-        Avoids confusion with rest/open palm and works in single-hand mode (does not trigger pause)."""
-        if hand_landmarks is None:
-            return False
-        index_up, middle_up, ring_up, pinky_up = self._finger_states(hand_landmarks)
-        if not (index_up and middle_up and ring_up and pinky_up):
-            return False
-        # Thumb must be down (not relaxed open palm)
-        thumb_tip = hand_landmarks.landmark[TIP_IDS["thumb"]]
-        thumb_mcp = hand_landmarks.landmark[MCP_IDS["thumb"]]
-        thumb_down = thumb_tip.y > thumb_mcp.y
-        if not thumb_down:
-            return False
-        # Fingers must be spread apart (deliberate pose, not accidental)
-        idx_pt = self._point(hand_landmarks, TIP_IDS["index"])
-        pnk_pt = self._point(hand_landmarks, TIP_IDS["pinky"])
-        spread = distance_2d(idx_pt, pnk_pt)
-        return spread >= self.SHOW_WINDOWS_SPREAD_MIN
-
-    def _is_thumbs_up(self, hand_landmarks) -> bool:
-        """Thumbs up: thumb extended upward, all other fingers curled."""
-        if hand_landmarks is None:
-            return False
-        thumb_tip = hand_landmarks.landmark[TIP_IDS["thumb"]]
-        thumb_mcp = hand_landmarks.landmark[MCP_IDS["thumb"]]
-        index_up, middle_up, ring_up, pinky_up = self._finger_states(hand_landmarks)
-        # Thumb pointing upward: tip above MCP (lower y = higher in frame)
-        thumb_up = thumb_tip.y < thumb_mcp.y
-        all_fingers_curled = not index_up and not middle_up and not ring_up and not pinky_up
-        return thumb_up and all_fingers_curled
-
-    def _update_hold_timer(self, gesture: Optional[str], now: float) -> float:
+    def _update_hold_timer(self, gesture: Optional[int], now: float) -> float:
         if gesture != self._active_gesture:
             self._active_gesture = gesture
             self._gesture_started_at = now
@@ -226,7 +250,18 @@ class GestureController:
         """Record that a gesture action just fired."""
         self._last_gesture_action_at = now
 
-    def detect(
+    def subscribe(self, handler) -> None:
+        """Call handler(event, now) for every edge event update() emits."""
+        self._subscribers.append(handler)
+
+    def _emit(self, event: GestureEvent) -> None:
+        self.state.events.append(event)
+
+    def detect(self, *args, **kwargs) -> Dict[str, object]:
+        """update() in the legacy layout: a fresh dict of state and edge flags per frame."""
+        return self.update(*args, **kwargs).as_dict()
+
+    def update(
         self,
         pointer_landmarks,
         gesture_landmarks,
@@ -235,235 +270,152 @@ class GestureController:
         allow_single_hand: bool = False,
         allow_pointer_scroll: bool = False,
         pointer_scroll_requires_gesture_rest: bool = True,
-    ) -> Dict[str, object]:
+    ) -> GestureState:
+        """Advance one frame. Returns the (reused) GestureState; its `events`
+        holds this frame's edge events, which subscribers also receive."""
         now = now if now is not None else time.time()
-
-        result = {
-            "gesture": "none",
-            "paused": False,
-            "pen_active": False,
-            "pen_point": None,
-            "click": False,
-            "right_click": False,
-            "double_click": False,
-            "drag_down": False,
-            "drag_up": False,
-            "scroll_mode": False,
-            "scroll_delta": 0,
-            "zoom_mode": False,
-            "zoom_delta": 0,
-            "dragging": self._dragging,
-            "gesture_resting": False,
-            "minimize_window": False,
-            "maximize_window": False,
-            "close_window": False,
-            "show_all_windows": False,
-        }
-
+        state = self.state
+        state.reset(self._dragging)
+        self._classify(state, pointer_landmarks, gesture_landmarks, now, allow_single_hand, allow_pointer_scroll, pointer_scroll_requires_gesture_rest)
+        if self._activations is not None:
+            self._count(state)
+        if self._subscribers and state.events:
+            for event in state.events:
+                for handler in self._subscribers:
+                    handler(event, now)
+        return state
+
+    def _count(self, state: GestureState) -> None:
+        if state.gesture != self._last_label:
+            self._last_label = state.gesture
+            if state.gesture != "none":
+                self._activations.inc(state.gesture)
+        for event in state.events:
+            self._actions.inc(event.key)
+            if event is DRAG_START:
+                self._drags.inc()
+
+    def _classify(
+        self,
+        state: GestureState,
+        pointer_landmarks,
+        gesture_landmarks,
+        now: float,
+        allow_single_hand: bool,
+        allow_pointer_scroll: bool,
+        pointer_scroll_requires_gesture_rest: bool,
+    ) -> None:
         if pointer_landmarks is None and gesture_landmarks is None:
             held = self._update_hold_timer(None, now)
             _ = held
             if self._dragging:
-                result["drag_up"] = True
+                self._emit(DRAG_END)
                 self._dragging = False
             self._previous_zoom_dist = None
             self._pointer_scroll_active = False
             self._previous_pointer_scroll_y = None
-            result["dragging"] = self._dragging
-            return result
+            state.dragging = self._dragging
+            return
+
+        # Features for each visible hand, computed once and shared by every check below.
+        pointer = extract_hand_features(pointer_landmarks) if pointer_landmarks is not None else None
+        gesture = extract_hand_features(gesture_landmarks) if gesture_landmarks is not None else None
 
         # Two-hand gesture: both hands in "show all windows" pose (four fingers spread, thumb down)
         both_hands_show_windows = (
-            pointer_landmarks is not None
-            and gesture_landmarks is not None
-            and self._is_show_all_windows_gesture(pointer_landmarks)
-            and self._is_show_all_windows_gesture(gesture_landmarks)
+            pointer is not None
+            and gesture is not None
+            and pointer.show_all_windows
+            and gesture.show_all_windows
         )
 
         # Don't pause when both hands are doing show-all-windows
-        result["paused"] = (
-            self._is_open_palm(pointer_landmarks)
+        state.paused = (
+            pointer is not None
+            and pointer.open_palm
             and not both_hands_show_windows
         )
-        if result["paused"]:
+        if state.paused:
             if self._dragging:
-                result["drag_up"] = True
+                self._emit(DRAG_END)
                 self._dragging = False
-            result["gesture"] = "paused"
-            result["dragging"] = self._dragging
+            state.gesture = "paused"
+            state.dragging = self._dragging
             self._previous_zoom_dist = None
             self._pointer_scroll_active = False
             self._previous_pointer_scroll_y = None
-            return result
+            return
 
-        if gesture_landmarks is not None and self._is_open_palm(gesture_landmarks) and not both_hands_show_windows:
-            result["gesture_resting"] = True
+        if gesture is not None and gesture.open_palm and not both_hands_show_windows:
+            state.gesture_resting = True
 
-        gesture_source = gesture_landmarks
-        if (gesture_source is None or result["gesture_resting"]) and allow_single_hand:
-            gesture_source = pointer_landmarks
+        gesture_source = gesture
+        if (gesture_source is None or state.gesture_resting) and allow_single_hand:
+            gesture_source = pointer
         if gesture_source is None:
             held = self._update_hold_timer(None, now)
             _ = held
             if self._dragging:
-                result["drag_up"] = True
+                self._emit(DRAG_END)
                 self._dragging = False
-            result["dragging"] = self._dragging
+            state.dragging = self._dragging
             gesture_source = None
 
         if gesture_source is not None:
-            index_up, middle_up, ring_up, pinky_up = self._finger_states(gesture_source)
-            fingers_up_count = index_up + middle_up + ring_up + pinky_up
-
-            thumb = self._point(gesture_source, TIP_IDS["thumb"])
-            index = self._point(gesture_source, TIP_IDS["index"])
-
-            pinch_index = distance_2d(thumb, index) < self.pinch_threshold
-            thumbs_up = self._is_thumbs_up(gesture_source)
-            spider = self._is_spider(gesture_source)
-            thumb_down = self._is_thumb_down(gesture_source)
-            ring_pinky_up = self._is_ring_pinky_up(gesture_source)
-
-            three_fingers = index_up and middle_up and ring_up and not pinky_up
-            two_fingers = index_up and middle_up and not ring_up and not pinky_up
-
-            # Determine the gesture handedness label (normalized)
-            g_hand = (gesture_handedness or "").strip().lower()
-
-            # --- Classify raw gesture (single-hand). Show-all-windows is two-hand only. ---
+            # --- Classify raw gesture via the compiled rule table. ---
             # Gesture hand is always the non-pointer hand (e.g. left when pointer=Right), so all gestures are same hand.
-            raw_gesture = "none"
+            mask = gesture_source.pose_mask
+            if gesture_source.pinch_distance < self.pinch_threshold:
+                mask |= PINCH
             if both_hands_show_windows:
-                raw_gesture = "two_hands_show_windows"
-            elif fingers_up_count <= 1 and not thumb_down and not thumbs_up:
-                raw_gesture = "fist"
-            elif thumb_down:
-                raw_gesture = "thumbs_down"
-            elif thumbs_up:
-                raw_gesture = "thumbs_up"
-            elif spider:
-                raw_gesture = "spider"
-            elif ring_pinky_up:
-                raw_gesture = "ring_pinky_up"
-            elif pinch_index and not ring_pinky_up:
-                raw_gesture = "pinch"
-            elif three_fingers and not pinch_index:
-                raw_gesture = "three_fingers"
-            elif two_fingers and not pinch_index:
-                raw_gesture = "two_fingers"
-            elif fingers_up_count >= 4:
-                raw_gesture = "open_palm"
-
-            held_for = self._update_hold_timer(raw_gesture, now)
-            stable = held_for >= self.hold_seconds
-
-            # --- Map raw gesture to action label ---
-            # Two fingers = right click; three fingers = zoom (spread/pinch)
-            gesture_label = raw_gesture
-            if raw_gesture == "pinch":
-                gesture_label = "left_click"
-            elif raw_gesture == "two_fingers":
-                gesture_label = "right_click"
-            elif raw_gesture == "three_fingers":
-                gesture_label = "zoom"
-            elif raw_gesture == "thumbs_up":
-                gesture_label = "double_click"
-            elif raw_gesture == "spider":
-                gesture_label = "close"
-            elif raw_gesture == "thumbs_down":
-                gesture_label = "minimize"
-            elif raw_gesture == "ring_pinky_up":
-                gesture_label = "maximize"
-            elif raw_gesture == "two_hands_show_windows":
-                gesture_label = "show_all_windows"
-            elif raw_gesture == "open_palm":
-                gesture_label = "rest"
-            result["gesture"] = gesture_label
-
-            # --- Fire actions (with hold + cooldown) ---
-
-            # Left click: pinch
-            if raw_gesture == "pinch" and stable and self._global_cooldown_ok(now):
-                if now - self._last_left_click_at >= self.click_cooldown_seconds:
-                    result["click"] = True
-                    self._last_left_click_at = now
-                    self._mark_action(now)
-
-            # Right click: two fingers (index + middle)
-            if raw_gesture == "two_fingers" and stable and self._global_cooldown_ok(now):
-                if now - self._last_right_click_at >= self.right_click_cooldown_seconds:
-                    result["right_click"] = True
-                    self._last_right_click_at = now
-                    self._mark_action(now)
-
-            # Double click: thumbs up
-            if raw_gesture == "thumbs_up" and stable and self._global_cooldown_ok(now):
-                if now - self._last_double_click_at >= self.double_click_cooldown_seconds:
-                    result["double_click"] = True
-                    self._last_double_click_at = now
-                    self._mark_action(now)
-
-            # Window control (gesture hand only — e.g. left when pointer=Right)
-            if raw_gesture == "spider" and stable and self._global_cooldown_ok(now):
-                if now - self._last_close_at >= self.window_action_cooldown_seconds:
-                    result["close_window"] = True
-                    self._last_close_at = now
-                    self._mark_action(now)
+                mask |= BOTH_HANDS_SHOW_WINDOWS
+            rules = self._rules
+            gesture_id = rules.gesture_by_mask[mask]
 
-            if raw_gesture == "thumbs_down" and stable and self._global_cooldown_ok(now):
-                if now - self._last_minimize_at >= self.window_action_cooldown_seconds:
-                    result["minimize_window"] = True
-                    self._last_minimize_at = now
-                    self._mark_action(now)
-
-            if raw_gesture == "ring_pinky_up" and stable and self._global_cooldown_ok(now):
-                if now - self._last_maximize_at >= self.window_action_cooldown_seconds:
-                    result["maximize_window"] = True
-                    self._last_maximize_at = now
+            held_for = self._update_hold_timer(gesture_id, now)
+            stable = held_for >= self.hold_seconds
+            state.gesture = rules.labels[gesture_id]
+
+            # --- Fire the gesture's action (with hold + per-action and global cooldown) ---
+            slot = rules.action_slot[gesture_id]
+            if slot >= 0 and stable and self._global_cooldown_ok(now):
+                if now - self._last_action_at[slot] >= rules.cooldowns[slot]:
+                    self._emit(self._action_events[slot])
+                    self._last_action_at[slot] = now
                     self._mark_action(now)
 
             # Drag: fist hold
-            if raw_gesture == "fist" and stable:
+            if gesture_id == self._fist_id and stable:
                 if not self._dragging:
-                    result["drag_down"] = True
+                    self._emit(DRAG_START)
                     self._dragging = True
 
-            if self._dragging and raw_gesture != "fist":
-                result["drag_up"] = True
+            if self._dragging and gesture_id != self._fist_id:
+                self._emit(DRAG_END)
                 self._dragging = False
 
             # Zoom: three fingers (index + middle + ring) — spread = zoom in, pinch = zoom out
-            if raw_gesture == "three_fingers":
-                result["zoom_mode"] = True
-                idx_pt = self._point(gesture_source, TIP_IDS["index"])
-                mid_pt = self._point(gesture_source, TIP_IDS["middle"])
-                rng_pt = self._point(gesture_source, TIP_IDS["ring"])
+            if gesture_id == self._zoom_id:
+                state.zoom_mode = True
                 # Use sum of adjacent finger distances as spread measure
-                tip_dist = distance_2d(idx_pt, mid_pt) + distance_2d(mid_pt, rng_pt)
+                tip_dist = gesture_source.zoom_spread
 
                 if self._previous_zoom_dist is not None:
                     # delta > 0 => spreading => zoom in; delta < 0 => pinch => zoom out
                     delta = tip_dist - self._previous_zoom_dist
-                    result["zoom_delta"] = int(delta * self.zoom_gain * 100)
+                    state.zoom_delta = int(delta * self.zoom_gain * 100)
 
                 self._previous_zoom_dist = tip_dist
             else:
                 self._previous_zoom_dist = None
 
-            # Show all windows: two-hand gesture only (both hands: four fingers spread, thumb down)
-            if raw_gesture == "two_hands_show_windows" and stable and self._global_cooldown_ok(now):
-                if now - self._last_show_all_windows_at >= self.window_action_cooldown_seconds:
-                    result["show_all_windows"] = True
-                    self._last_show_all_windows_at = now
-                    self._mark_action(now)
-
-        if allow_pointer_scroll and pointer_landmarks is not None:
-            if pointer_scroll_requires_gesture_rest and gesture_landmarks is not None and not result["gesture_resting"]:
+        if allow_pointer_scroll and pointer is not None:
+            if pointer_scroll_requires_gesture_rest and gesture is not None and not state.gesture_resting:
                 self._pointer_scroll_active = False
                 self._previous_pointer_scroll_y = None
                 self._scroll_smoothed = 0.0
             else:
-                p_index_up, p_middle_up, p_ring_up, p_pinky_up = self._finger_states(pointer_landmarks)
+                p_index_up, p_middle_up, p_ring_up, p_pinky_up = pointer.finger_up
                 pointer_two_fingers = p_index_up and p_middle_up and not p_ring_up and not p_pinky_up
                 if pointer_two_fingers:
                     if not self._pointer_scroll_active:
@@ -471,18 +423,16 @@ class GestureController:
                         self._pointer_scroll_started_at = now
                         self._scroll_smoothed = 0.0
                     if now - self._pointer_scroll_started_at >= self.hold_seconds:
-                        result["scroll_mode"] = True
+                        state.scroll_mode = True
                         # Use average of index and middle finger for stable direction (finger direction = scroll direction)
-                        idx_y = pointer_landmarks.landmark[TIP_IDS["index"]].y
-                        mid_y = pointer_landmarks.landmark[TIP_IDS["middle"]].y
-                        finger_y = (idx_y + mid_y) * 0.5
+                        finger_y = pointer.scroll_y
                         if self._previous_pointer_scroll_y is not None:
                             # Finger up (finger_y decreases) -> positive scroll (scroll up); finger down -> negative
                             raw_delta = (self._previous_pointer_scroll_y - finger_y) * self.scroll_gain * 100
                             # Smooth scroll: blend with previous for less jumpy movement
                             scroll_alpha = 0.4
                             self._scroll_smoothed = scroll_alpha * self._scroll_smoothed + (1.0 - scroll_alpha) * raw_delta
-                            result["scroll_delta"] = int(round(self._scroll_smoothed))
+                            state.scroll_delta = int(round(self._scroll_smoothed))
                         self._previous_pointer_scroll_y = finger_y
                 else:
                     self._pointer_scroll_active = False
@@ -490,13 +440,16 @@ class GestureController:
                     self._scroll_smoothed = 0.0
 
         if (
-            pointer_landmarks is not None
-            and not result["scroll_mode"]
-            and not result["zoom_mode"]
-            and not result["paused"]
+            pointer is not None
+            and not state.scroll_mode
+            and not state.zoom_mode
+            and not state.paused
         ):
-            result["pen_active"] = True
-            result["pen_point"] = self._point(pointer_landmarks, TIP_IDS["index"])
-
-        result["dragging"] = self._dragging
-        return result
+            state.pen_active = True
+            state.pen_point = pointer.pen_point
+
+        if state.scroll_mode and state.scroll_delta:
+            self._emit(Scroll(state.scroll_delta))
+        if state.zoom_mode and state.zoom_delta:
+            self._emit(Zoom(state.zoom_delta))
+        state.dragging = self._dragging
@@ -0,0 +1,172 @@
+import abc
+from typing import Dict, List
+
+
+class GestureEvent(abc.ABC):
+    """Base of the edge events GestureController emits.
+
+    An event is emitted only on the frame where something happens (a click
+    fires, a drag starts, the scroll wheel turns), never for unchanged state.
+    apply(cursor) performs it on a CursorController / CursorOutputWorker;
+    `key` names the matching flag of the legacy detect() result dict.
+    """
+
+    __slots__ = ()
+    key = ""
+
+    @abc.abstractmethod
+    def apply(self, cursor) -> None:
+        """Perform the event on `cursor`."""
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__ if name != "key")
+        return f"{type(self).__name__}({fields})"
+
+
+_CLICK_KEYS = {"left": "click", "right": "right_click", "double": "double_click"}
+_CLICK_METHODS = {"left": "left_click", "right": "right_click", "double": "double_click"}
+_WINDOW_KEYS = {
+    "minimize": "minimize_window",
+    "maximize": "maximize_window",
+    "close": "close_window",
+    "show_all": "show_all_windows",
+}
+
+
+class ClickEvent(GestureEvent):
+    __slots__ = ("button", "key")
+
+    def __init__(self, button: str):
+        self.button = button  # "left", "right" or "double"
+        self.key = _CLICK_KEYS[button]
+
+    def apply(self, cursor) -> None:
+        getattr(cursor, _CLICK_METHODS[self.button])()
+
+
+class DragStart(GestureEvent):
+    __slots__ = ()
+    key = "drag_down"
+
+    def apply(self, cursor) -> None:
+        cursor.drag_down()
+
+
+class DragEnd(GestureEvent):
+    __slots__ = ()
+    key = "drag_up"
+
+    def apply(self, cursor) -> None:
+        cursor.drag_up()
+
+
+class Scroll(GestureEvent):
+    __slots__ = ("delta",)
+    key = "scroll_delta"
+
+    def __init__(self, delta: int):
+        self.delta = delta
+
+    def apply(self, cursor) -> None:
+        cursor.scroll(self.delta)
+
+
+class Zoom(GestureEvent):
+    __slots__ = ("delta",)
+    key = "zoom_delta"
+
+    def __init__(self, delta: int):
+        self.delta = delta
+
+    def apply(self, cursor) -> None:
+        cursor.zoom(self.delta)
+
+
+class WindowAction(GestureEvent):
+    __slots__ = ("action", "key")
+
+    def __init__(self, action: str):
+        self.action = action  # "minimize", "maximize", "close" or "show_all"
+        self.key = _WINDOW_KEYS[action]
+
+    def apply(self, cursor) -> None:
+        getattr(cursor, self.key)()
+
+
+# Events without a payload are shared instances, so emitting them allocates nothing.
+DRAG_START = DragStart()
+DRAG_END = DragEnd()
+
+# Rule-table action name (GestureRule.action) -> the event it emits.
+ACTION_EVENTS: Dict[str, GestureEvent] = {
+    "click": ClickEvent("left"),
+    "right_click": ClickEvent("right"),
+    "double_click": ClickEvent("double"),
+    "minimize_window": WindowAction("minimize"),
+    "maximize_window": WindowAction("maximize"),
+    "close_window": WindowAction("close"),
+    "show_all_windows": WindowAction("show_all"),
+}
+
+# Legacy detect() flags that are set by events.
+EDGE_KEYS = tuple(event.key for event in ACTION_EVENTS.values()) + (DragStart.key, DragEnd.key)
+
+
+class GestureState:
+    """Continuous per-frame gesture state, reused by GestureController across frames.
+
+    `events` lists the edge events of the current frame (usually empty); it is
+    cleared, not replaced, at the start of every update.
+    """
+
+    __slots__ = (
+        "gesture",
+        "paused",
+        "pen_active",
+        "pen_point",
+        "scroll_mode",
+        "scroll_delta",
+        "zoom_mode",
+        "zoom_delta",
+        "dragging",
+        "gesture_resting",
+        "events",
+    )
+
+    def __init__(self):
+        self.events: List[GestureEvent] = []
+        self.reset(False)
+
+    def reset(self, dragging: bool) -> None:
+        self.gesture = "none"
+        self.paused = False
+        self.pen_active = False
+        self.pen_point = None  # (x, y) normalized index tip while pen_active
+        self.scroll_mode = False
+        self.scroll_delta = 0
+        self.zoom_mode = False
+        self.zoom_delta = 0
+        self.dragging = dragging
+        self.gesture_resting = False
+        self.events.clear()
+
+    def as_dict(self) -> Dict[str, object]:
+        """The state plus this frame's events in the legacy detect() dict layout."""
+        result = {
+            "gesture": self.gesture,
+            "paused": self.paused,
+            "pen_active": self.pen_active,
+            "pen_point": self.pen_point,
+            "scroll_mode": self.scroll_mode,
+            "scroll_delta": self.scroll_delta,
+            "zoom_mode": self.zoom_mode,
+            "zoom_delta": self.zoom_delta,
+            "dragging": self.dragging,
+            "gesture_resting": self.gesture_resting,
+        }
+        for key in EDGE_KEYS:
+            result[key] = False
+        for event in self.events:
+            if event.key in EDGE_KEYS:
+                result[event.key] = True
+        return result
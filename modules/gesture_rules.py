@@ -0,0 +1,102 @@
+from typing import List, Mapping, NamedTuple, Optional, Sequence
+
+
+# Bits of the per-frame pose mask. Finger and single-hand pose bits come from
+# HandFeatures.pose_mask; PINCH and BOTH_HANDS_SHOW_WINDOWS are added by the
+# controller because they depend on its threshold / on both hands.
+INDEX_UP = 1 << 0
+MIDDLE_UP = 1 << 1
+RING_UP = 1 << 2
+PINKY_UP = 1 << 3
+THUMBS_UP = 1 << 4
+THUMBS_DOWN = 1 << 5
+SPIDER = 1 << 6
+RING_PINKY_UP = 1 << 7
+PINCH = 1 << 8
+BOTH_HANDS_SHOW_WINDOWS = 1 << 9
+MASK_BITS = 10
+
+FINGER_BITS = (INDEX_UP, MIDDLE_UP, RING_UP, PINKY_UP)
+
+NO_GESTURE = "none"
+
+
+class GestureRule(NamedTuple):
+    """One row of the gesture table; rules are matched in order, first match wins."""
+
+    name: str  # raw gesture name (what the hand is doing)
+    label: str  # label reported in the result / overlay
+    all_of: int = 0  # mask bits that must be set
+    none_of: int = 0  # mask bits that must be clear
+    min_fingers: int = 0
+    max_fingers: int = 4
+    action: Optional[str] = None  # result key fired once the gesture is held
+    cooldown: Optional[str] = None  # key of the per-action cooldown in seconds
+
+
+WINDOW_COOLDOWN = "window_action_cooldown_seconds"
+
+GESTURE_RULES = (
+    # Show-all-windows is the only two-hand gesture.
+    GestureRule("two_hands_show_windows", "show_all_windows", all_of=BOTH_HANDS_SHOW_WINDOWS, action="show_all_windows", cooldown=WINDOW_COOLDOWN),
+    GestureRule("fist", "fist", none_of=THUMBS_DOWN | THUMBS_UP, max_fingers=1),
+    GestureRule("thumbs_down", "minimize", all_of=THUMBS_DOWN, action="minimize_window", cooldown=WINDOW_COOLDOWN),
+    GestureRule("thumbs_up", "double_click", all_of=THUMBS_UP, action="double_click", cooldown="double_click_cooldown_seconds"),
+    GestureRule("spider", "close", all_of=SPIDER, action="close_window", cooldown=WINDOW_COOLDOWN),
+    GestureRule("ring_pinky_up", "maximize", all_of=RING_PINKY_UP, action="maximize_window", cooldown=WINDOW_COOLDOWN),
+    GestureRule("pinch", "left_click", all_of=PINCH, action="click", cooldown="click_cooldown_seconds"),
+    GestureRule("three_fingers", "zoom", all_of=INDEX_UP | MIDDLE_UP | RING_UP, none_of=PINKY_UP | PINCH),
+    GestureRule("two_fingers", "right_click", all_of=INDEX_UP | MIDDLE_UP, none_of=RING_UP | PINKY_UP | PINCH, action="right_click", cooldown="right_click_cooldown_seconds"),
+    GestureRule("open_palm", "rest", min_fingers=4),
+)
+
+
+def _fingers_up(mask: int) -> int:
+    return sum(1 for bit in FINGER_BITS if mask & bit)
+
+
+class CompiledGestureRules:
+    """Rule table flattened into lookup lists indexed by pose mask / gesture id.
+
+    Gesture id 0 is always "none". `gesture_by_mask[mask]` gives the gesture id,
+    and per-gesture lists give its name, label and action slot (-1 = no action).
+    Per-frame cost is a list lookup regardless of how many rules exist.
+    """
+
+    def __init__(self, rules: Sequence[GestureRule], cooldowns: Mapping[str, float]):
+        self.names: List[str] = [NO_GESTURE]
+        self.labels: List[str] = [NO_GESTURE]
+        self.action_slot: List[int] = [-1]
+        # One slot per distinct action; cooldown in seconds per slot.
+        self.actions: List[str] = []
+        self.cooldowns: List[float] = []
+
+        for rule in rules:
+            slot = -1
+            if rule.action is not None:
+                if rule.action in self.actions:
+                    slot = self.actions.index(rule.action)
+                else:
+                    slot = len(self.actions)
+                    self.actions.append(rule.action)
+                    self.cooldowns.append(float(cooldowns[rule.cooldown]) if rule.cooldown else 0.0)
+            self.names.append(rule.name)
+            self.labels.append(rule.label)
+            self.action_slot.append(slot)
+
+        self.gesture_by_mask: List[int] = []
+        for mask in range(1 << MASK_BITS):
+            fingers = _fingers_up(mask)
+            gesture_id = 0
+            for rule_idx, rule in enumerate(rules):
+                if (
+                    mask & rule.all_of == rule.all_of
+                    and not mask & rule.none_of
+                    and rule.min_fingers <= fingers <= rule.max_fingers
+                ):
+                    gesture_id = rule_idx + 1
+                    break
+            self.gesture_by_mask.append(gesture_id)
+
+    def gesture_id(self, name: str) -> int:
+        return self.names.index(name)
@@ -0,0 +1,27 @@
+def select_hands(hands, pointer_preference: str):
+    """Returns (pointer_hand, gesture_hand, gesture_handedness)."""
+    if not hands:
+        return None, None, None
+
+    pref = (pointer_preference or "").strip().lower()
+    pointer_idx = None
+    if pref in {"left", "right"}:
+        for idx, (_, handedness) in enumerate(hands):
+            if handedness and handedness.lower() == pref:
+                pointer_idx = idx
+                break
+
+    if pointer_idx is None:
+        pointer_idx = 0
+
+    pointer = hands[pointer_idx]
+    gesture = None
+    gesture_handedness = None
+    if len(hands) > 1:
+        for idx, hand in enumerate(hands):
+            if idx != pointer_idx:
+                gesture = hand
+                gesture_handedness = hand[1]  # handedness label
+                break
+
+    return pointer, gesture, gesture_handedness
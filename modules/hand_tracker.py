@@ -1,12 +1,20 @@
-﻿import cv2
+﻿import time
 
-try:
-    import mediapipe as mp
-except Exception as exc:
-    raise RuntimeError("MediaPipe is not installed correctly.") from exc
+import cv2
+import numpy as np
+
+from modules.frame import bgr_of, rgb_of
+from modules.landmark_flow import LandmarkFlowPropagator
+from utils.landmarks import HAND_CONNECTIONS, landmarks_to_array
 
 
 def _get_hands_module():
+    # Imported on first use: mediapipe takes about a second to import, and
+    # processes that never build a graph (e.g. the multiprocess main) skip it.
+    try:
+        import mediapipe as mp
+    except Exception as exc:
+        raise RuntimeError("MediaPipe is not installed correctly.") from exc
     if hasattr(mp, "solutions") and hasattr(mp.solutions, "hands"):
         return mp.solutions.hands
     raise RuntimeError(
@@ -15,48 +23,289 @@ def _get_hands_module():
     )
 
 
+def draw_hand(frame_bgr, hand_landmarks, handedness: str = None, draw_label: bool = False) -> None:
+    """Draw a hand skeleton (and optional handedness label) from landmarks; needs no graph."""
+    h, w = frame_bgr.shape[:2]
+    points = landmarks_to_array(hand_landmarks)[:, :2] * (w, h)
+    points = points.astype(np.int32).tolist()
+    for start, end in HAND_CONNECTIONS:
+        cv2.line(frame_bgr, points[start], points[end], (224, 224, 224), 2)
+    for x, y in points:
+        cv2.circle(frame_bgr, (x, y), 4, (48, 48, 255), -1)
+
+    if draw_label and handedness:
+        x = points[0][0] - 10
+        y = points[0][1] - 10
+        cv2.putText(frame_bgr, handedness, (x, y), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
+
+
+def _hands_box(hands, width: int, height: int):
+    """Tight pixel bounding box (x0, y0, x1, y1) around all hands' landmarks."""
+    xy = np.concatenate([points[:, :2] for points, _ in hands])
+    x0, y0 = xy.min(axis=0) * (width, height)
+    x1, y1 = xy.max(axis=0) * (width, height)
+    return x0, y0, x1, y1
+
+
+def _padded_roi(box, width: int, height: int, padding: float, min_size: int):
+    """Grow a tight box by `padding` x its size (at least `min_size` px), clipped to the frame."""
+    x0, y0, x1, y1 = box
+    cx, cy = (x0 + x1) * 0.5, (y0 + y1) * 0.5
+    half_w = max((x1 - x0) * (0.5 + padding), min_size * 0.5)
+    half_h = max((y1 - y0) * (0.5 + padding), min_size * 0.5)
+    return (
+        max(0, int(cx - half_w)),
+        max(0, int(cy - half_h)),
+        min(width, int(cx + half_w)),
+        min(height, int(cy + half_h)),
+    )
+
+
+def hand_metrics(registry):
+    """HandTracker's metrics in `registry`: (frames by landmark source, MediaPipe call time)."""
+    return (
+        registry.labeled_counter("touchless_hand_frames_total", "Frames processed by the hand tracker, by landmark source.", "source"),
+        registry.summary("touchless_hand_inference_seconds", "Wall time of one MediaPipe Hands call."),
+    )
+
+
 class HandTracker:
-    def __init__(self, min_detection_confidence: float, min_tracking_confidence: float, max_hands: int = 1):
-        self._mp_hands = _get_hands_module()
-        self._mp_drawing = mp.solutions.drawing_utils
-        self._mp_styles = mp.solutions.drawing_styles
-        self._hands = self._mp_hands.Hands(
-            static_image_mode=False,
-            max_num_hands=max_hands,
-            model_complexity=0,
-            min_detection_confidence=min_detection_confidence,
-            min_tracking_confidence=min_tracking_confidence,
+    @classmethod
+    def from_config(cls, cfg, profiler=None, metrics=None) -> "HandTracker":
+        return cls(
+            cfg.hand_min_detection_confidence,
+            cfg.hand_min_tracking_confidence,
+            max_hands=cfg.max_hands,
+            profiler=profiler,
+            roi_tracking=cfg.hand_roi_tracking,
+            roi_padding=cfg.hand_roi_padding,
+            roi_min_size=cfg.hand_roi_min_size,
+            roi_redetect_interval=cfg.hand_roi_redetect_frames,
+            roi_min_score=cfg.hand_roi_min_score,
+            flow_interval=cfg.hand_flow_interval,
+            flow_scale=cfg.hand_flow_scale,
+            flow_min_tracked=cfg.hand_flow_min_tracked,
+            metrics=metrics,
         )
 
+    def __init__(
+        self,
+        min_detection_confidence: float,
+        min_tracking_confidence: float,
+        max_hands: int = 1,
+        profiler=None,
+        roi_tracking: bool = False,
+        roi_padding: float = 0.35,
+        roi_min_size: int = 192,
+        roi_redetect_interval: int = 15,
+        roi_min_score: float = 0.8,
+        flow_interval: int = 1,
+        flow_scale: float = 0.5,
+        flow_min_tracked: float = 0.8,
+        metrics=None,
+    ):
+        self._mp_hands = _get_hands_module()
+        # Optional StageProfiler: process() laps "bgr2rgb" and "mediapipe".
+        self.profiler = profiler
+        # Optional MetricsRegistry: frames by landmark source, MediaPipe time.
+        self._frames = self._inference_time = None
+        if metrics is not None:
+            self._frames, self._inference_time = hand_metrics(metrics)
+        self.min_detection_confidence = min_detection_confidence
+        self.min_tracking_confidence = min_tracking_confidence
+        self.max_hands = max_hands
+        # One graph per (max_num_hands, static_image_mode), built on demand (see
+        # set_active_max_hands and the max-hands probe in _infer).
+        self._graphs = {}
+        self._hands = self._graph(max_hands)
+
+        # Quality knobs (driven by AdaptiveQualityController): the frame or crop
+        # is downscaled by `inference_scale` before inference, and while fewer
+        # hands than `max_hands` are tracked a static (detection-only) graph for
+        # `max_hands` still runs every `max_hands_probe_interval` frames so a
+        # second hand is picked up; it keeps no tracking state between probes.
+        self.inference_scale = 1.0
+        self.active_max_hands = max_hands
+        self.max_hands_probe_interval = 10
+        self._frame_index = 0
+
+        # ROI tracking: run inference on a padded crop around the previous
+        # frame's hands; fall back to the full frame every
+        # `roi_redetect_interval` frames, when a hand is lost or when the
+        # handedness score drops below `roi_min_score`.
+        self.roi_tracking = roi_tracking
+        self.roi_padding = roi_padding
+        self.roi_min_size = roi_min_size
+        self.roi_redetect_interval = roi_redetect_interval
+        self.roi_min_score = roi_min_score
+        self.roi = None  # (x0, y0, x1, y1) in pixels, or None for a full-frame pass
+        # Input of the tracking graph's previous pass (a crop or None). MediaPipe's
+        # tracking prior lives in the input's normalized coordinates, so the graph
+        # is reset whenever this changes: one detection pass per crop switch.
+        self._graph_input = None
+        self._roi_frames = 0
+        self._full_frame_hands = 0
+
+        # Skip-frame inference: with flow_interval > 1, MediaPipe runs on every
+        # flow_interval-th frame and the frames in between get the previous
+        # landmarks moved by optical flow (back to inference as soon as flow
+        # tracking degrades or no hand is being tracked).
+        self.flow_interval = flow_interval
+        self.flow = LandmarkFlowPropagator(scale=flow_scale, min_tracked_ratio=flow_min_tracked) if flow_interval > 1 else None
+        self._flow_frames = 0
+
+    def _graph(self, max_hands: int, static: bool = False):
+        graph = self._graphs.get((max_hands, static))
+        if graph is None:
+            graph = self._graphs[(max_hands, static)] = self._mp_hands.Hands(
+                static_image_mode=static,
+                max_num_hands=max_hands,
+                model_complexity=0,
+                min_detection_confidence=self.min_detection_confidence,
+                min_tracking_confidence=self.min_tracking_confidence,
+            )
+        return graph
+
+    def set_active_max_hands(self, max_hands: int) -> None:
+        self.active_max_hands = max(1, min(self.max_hands, max_hands))
+        graph = self._graph(self.active_max_hands)
+        if graph is not self._hands:
+            # Its tracking state is from when it was last active; start fresh.
+            graph.reset()
+            self._hands = graph
+            self._graph_input = self.roi if self.roi_tracking else None
+
+    def _next_roi(self, hands, width: int, height: int):
+        """Keep the current crop while the hands stay well inside it, so the crop
+        (and MediaPipe's tracking coordinates) only moves when it has to."""
+        box = _hands_box(hands, width, height)
+        if self.roi is not None:
+            x0, y0, x1, y1 = self.roi
+            margin_x = (box[2] - box[0]) * self.roi_padding * 0.5
+            margin_y = (box[3] - box[1]) * self.roi_padding * 0.5
+            inside = (
+                (box[0] - margin_x >= x0 or x0 == 0)
+                and (box[1] - margin_y >= y0 or y0 == 0)
+                and (box[2] + margin_x <= x1 or x1 == width)
+                and (box[3] + margin_y <= y1 or y1 == height)
+            )
+            if inside:
+                return self.roi
+        return _padded_roi(box, width, height, self.roi_padding, self.roi_min_size)
+
     def process(self, frame_bgr):
-        rgb = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2RGB)
-        result = self._hands.process(rgb)
-        if not result.multi_hand_landmarks:
-            return []
+        """Hands in a BGR array or a Frame (whose shared RGB image is used for full-frame passes)."""
+        if self.flow is not None:
+            if self.flow.active and self._flow_frames + 1 < self.flow_interval:
+                hands = self.flow.propagate(frame_bgr)
+                if self.profiler is not None:
+                    self.profiler.lap("optical_flow")
+                if hands is not None:
+                    self._flow_frames += 1
+                    if self._frames is not None:
+                        self._frames.inc("optical_flow")
+                    return hands
+            hands = self._infer(frame_bgr)
+            self.flow.reset(frame_bgr, hands)
+            self._flow_frames = 0
+            return hands
+        return self._infer(frame_bgr)
 
+    def _infer(self, frame):
+        frame_bgr = bgr_of(frame)
+        height, width = frame_bgr.shape[:2]
+        roi = self.roi if self.roi_tracking else None
+        if roi is None and self.inference_scale >= 1.0:
+            rgb = rgb_of(frame)
+        else:
+            if roi is not None:
+                x0, y0, x1, y1 = roi
+                frame_bgr = frame_bgr[y0:y1, x0:x1]
+            if self.inference_scale < 1.0:
+                in_h, in_w = frame_bgr.shape[:2]
+                size = (max(1, int(in_w * self.inference_scale)), max(1, int(in_h * self.inference_scale)))
+                frame_bgr = cv2.resize(frame_bgr, size, interpolation=cv2.INTER_LINEAR)
+            rgb = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2RGB)
+        if self.profiler is not None:
+            self.profiler.lap("bgr2rgb")
+        graph = self._hands
+        self._frame_index += 1
+        if self.active_max_hands < self.max_hands and self._frame_index % self.max_hands_probe_interval == 0:
+            graph = self._graph(self.max_hands, static=True)
+        elif roi != self._graph_input:
+            graph.reset()
+            self._graph_input = roi
+        if self._frames is not None:
+            started = time.perf_counter()
+            result = graph.process(rgb)
+            self._inference_time.observe(time.perf_counter() - started)
+            self._frames.inc("mediapipe")
+        else:
+            result = graph.process(rgb)
+        if self.profiler is not None:
+            self.profiler.lap("mediapipe")
+
+        # Landmarks leave here as (21, 3) float32 arrays of normalized x, y, z so
+        # nothing downstream touches protobuf attributes again.
         hands = []
-        for idx, hand_landmarks in enumerate(result.multi_hand_landmarks):
+        min_score = 1.0
+        for idx, hand_landmarks in enumerate(result.multi_hand_landmarks or ()):
             handedness = None
             if result.multi_handedness and idx < len(result.multi_handedness):
-                handedness = result.multi_handedness[idx].classification[0].label
-            hands.append((hand_landmarks, handedness))
+                classification = result.multi_handedness[idx].classification[0]
+                handedness = classification.label
+                min_score = min(min_score, classification.score)
+            points = landmarks_to_array(hand_landmarks)
+            if roi is not None:
+                # Crop-normalized -> full-frame-normalized coordinates.
+                crop_w, crop_h = x1 - x0, y1 - y0
+                points[:, 0] = (points[:, 0] * crop_w + x0) / width
+                points[:, 1] = (points[:, 1] * crop_h + y0) / height
+                points[:, 2] *= crop_w / width
+            hands.append((points, handedness))
+
+        if self.roi_tracking:
+            self._update_roi(hands, roi is not None, min_score, width, height)
         return hands
 
-    def draw(self, frame_bgr, hand_landmarks, handedness: str = None, draw_label: bool = False) -> None:
-        self._mp_drawing.draw_landmarks(
-            frame_bgr,
-            hand_landmarks,
-            self._mp_hands.HAND_CONNECTIONS,
-            self._mp_styles.get_default_hand_landmarks_style(),
-            self._mp_styles.get_default_hand_connections_style(),
+    def _update_roi(self, hands, used_roi: bool, min_score: float, width: int, height: int) -> None:
+        if not used_roi:
+            self._full_frame_hands = len(hands)
+            self._roi_frames = 0
+        else:
+            self._roi_frames += 1
+
+        redetect = (
+            not hands
+            or min_score < self.roi_min_score
+            or len(hands) < self._full_frame_hands
+            or self._roi_frames >= self.roi_redetect_interval
         )
+        self.roi = None if redetect else self._next_roi(hands, width, height)
 
-        if draw_label and handedness:
-            h, w = frame_bgr.shape[:2]
-            wrist = hand_landmarks.landmark[0]
-            x = int(wrist.x * w) - 10
-            y = int(wrist.y * h) - 10
-            cv2.putText(frame_bgr, handedness, (x, y), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
+    def warm_up(self, width: int, height: int) -> None:
+        """Run one blank frame through the graph so the first real frame does not
+        pay for model loading and delegate setup. A blank frame has no hands, so
+        it leaves no tracking state behind (and reset() would undo the warm-up)."""
+        self._hands.process(np.zeros((height, width, 3), dtype=np.uint8))
+
+    def reset(self) -> None:
+        """Forget all tracking state, e.g. before a frame that does not follow the previous one."""
+        for graph in self._graphs.values():
+            graph.reset()
+        self.roi = None
+        self._graph_input = None
+        self._roi_frames = 0
+        self._full_frame_hands = 0
+        self._frame_index = 0
+        self._flow_frames = 0
+        if self.flow is not None:
+            self.flow.reset(None, [])
+
+    def draw(self, frame_bgr, hand_landmarks, handedness: str = None, draw_label: bool = False) -> None:
+        draw_hand(frame_bgr, hand_landmarks, handedness, draw_label=draw_label)
 
     def close(self) -> None:
-        self._hands.close()
+        for graph in self._graphs.values():
+            graph.close()
+        self._graphs.clear()
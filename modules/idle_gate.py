@@ -0,0 +1,149 @@
+import logging
+import time
+from typing import Optional
+
+import cv2
+import numpy as np
+
+from modules.frame import bgr_of
+from utils.profiler import LatencyHistogram
+
+
+log = logging.getLogger(__name__)
+
+
+def idle_metrics(registry):
+    """IdleGate's metrics in `registry`: (idle seconds, active seconds, wakes,
+    waking-frame inference time), plus a duty-cycle gauge computed from the two time counters."""
+    idle = registry.counter("touchless_idle_seconds_total", "Seconds the idle gate kept hand inference off.")
+    active = registry.counter("touchless_active_seconds_total", "Seconds the idle gate ran hand inference.")
+
+    def duty_cycle() -> float:
+        total = idle.value + active.value
+        return idle.value / total if total else 0.0
+
+    registry.gauge("touchless_idle_duty_cycle", "Fraction of time spent idle (hand inference off).", duty_cycle)
+    return (
+        idle,
+        active,
+        registry.counter("touchless_idle_wakes_total", "Times motion woke the idle gate."),
+        registry.summary(
+            "touchless_idle_wake_inference_seconds", "Capture of the frame that woke the idle gate to its hands being available."
+        ),
+    )
+
+
+class IdleGate:
+    """Suspends hand inference while nobody is in front of the camera.
+
+    process() runs inference normally until no hand has been seen for
+    `idle_after_seconds`; then it only compares a tiny grayscale thumbnail of
+    each frame with the previous one. When more than `motion_threshold` of the
+    thumbnail's pixels change, the gate wakes and runs inference on that same
+    frame. Callers read `idle` to lower the capture rate to `poll_seconds`.
+
+    Metrics: duty_cycle() (fraction of time idle), wakes, and wake_inference
+    (capture of the frame that showed motion -> its hands being available).
+    The time from the motion itself to that frame, up to one poll interval,
+    is not included. With a MetricsRegistry they are exported too (see
+    idle_metrics).
+    """
+
+    def __init__(
+        self,
+        idle_after_seconds: float = 30.0,
+        poll_seconds: float = 0.2,
+        motion_threshold: float = 0.02,
+        pixel_delta: int = 24,
+        thumb_size=(32, 18),
+        metrics=None,
+    ):
+        self.idle_after_seconds = idle_after_seconds
+        self.poll_seconds = poll_seconds
+        self.motion_threshold = motion_threshold
+        self.pixel_delta = pixel_delta
+        self.thumb_size = thumb_size
+
+        self.idle = False
+        self.wakes = 0
+        self.wake_inference = LatencyHistogram()
+        self._idle_total = self._active_total = self._wakes_total = None
+        if metrics is not None:
+            self._idle_total, self._active_total, self._wakes_total, wake_inference = idle_metrics(metrics)
+            # Share the exported histogram so report() and the metric agree.
+            self.wake_inference = wake_inference.histogram
+        self.idle_seconds = 0.0
+        self.active_seconds = 0.0
+        self._last_hands_at: Optional[float] = None
+        self._last_update: Optional[float] = None
+        self._thumb: Optional[np.ndarray] = None
+
+    def _thumbnail(self, frame_bgr) -> np.ndarray:
+        small = cv2.resize(bgr_of(frame_bgr), self.thumb_size, interpolation=cv2.INTER_AREA)
+        return cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+
+    def _motion(self, thumb: np.ndarray) -> float:
+        """Fraction of thumbnail pixels that changed since the previous poll."""
+        changed = cv2.absdiff(thumb, self._thumb) > self.pixel_delta
+        return float(np.count_nonzero(changed)) / changed.size
+
+    def duty_cycle(self) -> float:
+        total = self.idle_seconds + self.active_seconds
+        return self.idle_seconds / total if total else 0.0
+
+    def report(self) -> None:
+        log.info(
+            "Idle gate: idle %.0f%% of the time, %d wakes, waking-frame inference p50/p95 %.1f/%.1f ms",
+            self.duty_cycle() * 100.0,
+            self.wakes,
+            self.wake_inference.percentile(50) * 1e3,
+            self.wake_inference.percentile(95) * 1e3,
+        )
+
+    def process(self, frame_bgr, infer, timestamp: Optional[float] = None):
+        """infer(frame_bgr) when active (or waking), [] while idle."""
+        now = time.monotonic()
+        if self._last_update is not None:
+            elapsed = now - self._last_update
+            if self.idle:
+                self.idle_seconds += elapsed
+                if self._idle_total is not None:
+                    self._idle_total.inc(elapsed)
+            else:
+                self.active_seconds += elapsed
+                if self._active_total is not None:
+                    self._active_total.inc(elapsed)
+        self._last_update = now
+        if self._last_hands_at is None:
+            self._last_hands_at = now
+
+        if self.idle:
+            thumb = self._thumbnail(frame_bgr)
+            motion = self._motion(thumb)
+            self._thumb = thumb
+            if motion < self.motion_threshold:
+                return []
+            self.idle = False
+            self.wakes += 1
+            if self._wakes_total is not None:
+                self._wakes_total.inc()
+            self._last_hands_at = now
+            hands = infer(frame_bgr)
+            if timestamp is not None:
+                self.wake_inference.add(max(0.0, time.time() - timestamp))
+            log.info("Waking: %.0f%% of the thumbnail changed.", motion * 100.0)
+            return hands
+
+        hands = infer(frame_bgr)
+        if hands:
+            self._last_hands_at = now
+        elif now - self._last_hands_at >= self.idle_after_seconds:
+            self.idle = True
+            self._thumb = self._thumbnail(frame_bgr)
+            log.info(
+                "Idle: no hands for %.0f s, polling for motion every %.2f s (idle %.0f%% of the time so far).",
+                now - self._last_hands_at,
+                self.poll_seconds,
+                self.duty_cycle() * 100.0,
+            )
+        return hands
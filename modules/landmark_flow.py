@@ -0,0 +1,88 @@
+from typing import List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from modules.frame import bgr_of
+
+
+class LandmarkFlowPropagator:
+    """Carries hand landmarks forward between inference frames with sparse
+    Lucas-Kanade optical flow on a downscaled grayscale frame.
+
+    reset() is called with each frame that went through full inference and
+    its hands; propagate() then moves those landmarks onto the next frame.
+    It returns None when tracking quality is too poor (too few points
+    tracked, or a large flow error), so the caller falls back to inference.
+    """
+
+    def __init__(self, scale: float = 0.5, min_tracked_ratio: float = 0.8, max_error: float = 20.0, win_size: int = 15, max_level: int = 2):
+        self.scale = scale
+        self.min_tracked_ratio = min_tracked_ratio
+        self.max_error = max_error
+        self._lk_params = dict(
+            winSize=(win_size, win_size),
+            maxLevel=max_level,
+            criteria=(cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 10, 0.03),
+        )
+        self._prev_gray: Optional[np.ndarray] = None
+        self._points: Optional[np.ndarray] = None  # (hands * 21, 1, 2) float32, scaled pixels
+        self._hands: List[Tuple[np.ndarray, Optional[str]]] = []
+
+    def _gray(self, frame_bgr) -> np.ndarray:
+        gray = cv2.cvtColor(bgr_of(frame_bgr), cv2.COLOR_BGR2GRAY)
+        if self.scale != 1.0:
+            h, w = gray.shape
+            size = (max(1, int(w * self.scale)), max(1, int(h * self.scale)))
+            gray = cv2.resize(gray, size, interpolation=cv2.INTER_AREA)
+        return gray
+
+    @property
+    def active(self) -> bool:
+        return bool(self._hands)
+
+    def reset(self, frame_bgr, hands) -> None:
+        self._hands = list(hands)
+        if not hands:
+            self._prev_gray = None
+            self._points = None
+            return
+        self._prev_gray = self._gray(frame_bgr)
+        h, w = self._prev_gray.shape
+        xy = np.concatenate([points[:, :2] for points, _ in hands]) * (w, h)
+        self._points = xy.astype(np.float32).reshape(-1, 1, 2)
+
+    def propagate(self, frame_bgr):
+        """Hands moved onto `frame_bgr`, in HandTracker.process() format, or None."""
+        if not self._hands:
+            return None
+        gray = self._gray(frame_bgr)
+        moved, status, error = cv2.calcOpticalFlowPyrLK(self._prev_gray, gray, self._points, None, **self._lk_params)
+        if moved is None:
+            return None
+        status = status.reshape(-1).astype(bool) & (error.reshape(-1) <= self.max_error)
+        moved = moved.reshape(-1, 2)
+        previous = self._points.reshape(-1, 2)
+
+        h, w = gray.shape
+        hands = []
+        for idx, (points, handedness) in enumerate(self._hands):
+            sl = slice(idx * 21, idx * 21 + 21)
+            ok = status[sl]
+            if ok.mean() < self.min_tracked_ratio:
+                return None
+            hand_moved = moved[sl]
+            if not ok.all():
+                # Lost points follow the hand's median motion.
+                shift = np.median(hand_moved[ok] - previous[sl][ok], axis=0)
+                hand_moved = np.where(ok[:, None], hand_moved, previous[sl] + shift)
+                moved[sl] = hand_moved
+            new_points = points.copy()
+            new_points[:, 0] = hand_moved[:, 0] / w
+            new_points[:, 1] = hand_moved[:, 1] / h
+            hands.append((new_points, handedness))
+
+        self._prev_gray = gray
+        self._points = moved.reshape(-1, 1, 2)
+        self._hands = hands
+        return hands
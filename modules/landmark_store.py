@@ -0,0 +1,167 @@
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from utils.landmarks import NUM_HAND_LANDMARKS, landmarks_to_array
+
+
+# File layout: a fixed 32-byte header followed by fixed-size frame records.
+MAGIC = b"TCLMREC1"
+HEADER_DTYPE = np.dtype([("magic", "S8"), ("version", "<u4"), ("max_hands", "<u4"), ("frame_count", "<u8"), ("_reserved", "<u8")])
+HEADER_SIZE = HEADER_DTYPE.itemsize
+FORMAT_VERSION = 1
+
+HANDEDNESS_CODES = {None: 0, "Left": 1, "Right": 2}
+HANDEDNESS_LABELS = {code: label for label, code in HANDEDNESS_CODES.items()}
+
+
+def record_dtype(max_hands: int) -> np.dtype:
+    return np.dtype(
+        [
+            ("timestamp", "<f8"),
+            ("hand_count", "u1"),
+            ("handedness", "u1", (max_hands,)),
+            ("landmarks", "<f4", (max_hands, NUM_HAND_LANDMARKS, 3)),
+        ]
+    )
+
+
+def fill_record(record, timestamp: float, hands, max_hands: int) -> None:
+    """Store one frame of HandTracker output into a record_dtype(max_hands) record."""
+    count = min(len(hands), max_hands)
+    record["timestamp"] = timestamp
+    record["hand_count"] = count
+    for idx in range(count):
+        hand_landmarks, handedness = hands[idx]
+        landmarks_to_array(hand_landmarks, out=record["landmarks"][idx])
+        record["handedness"][idx] = HANDEDNESS_CODES.get(handedness, 0)
+
+
+class LandmarkRecorder:
+    """Append HandTracker output to a memory-mapped session file.
+
+    The file grows in blocks of `grow_frames` records so writing a frame is a
+    couple of array assignments into the mapping. The header frame count is
+    updated with every frame, so a crashed session is still readable.
+
+    With `resume_frames` set, an existing file is reopened and writing
+    continues after its first `resume_frames` records (anything after them
+    is overwritten).
+    """
+
+    def __init__(self, path: str, max_hands: int = 2, grow_frames: int = 4096, resume_frames: Optional[int] = None):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_hands = max_hands
+        self.grow_frames = max(1, grow_frames)
+        self._dtype = record_dtype(max_hands)
+        self.frame_count = 0
+
+        if resume_frames is not None:
+            self._file = open(self.path, "r+b")
+            header = np.fromfile(self._file, dtype=HEADER_DTYPE, count=1)
+            if len(header) != 1 or header["magic"][0] != MAGIC or int(header["max_hands"][0]) != max_hands:
+                self._file.close()
+                raise ValueError(f"{self.path} is not a landmark recording with max_hands={max_hands}.")
+            stored = (self.path.stat().st_size - HEADER_SIZE) // self._dtype.itemsize
+            self.frame_count = min(resume_frames, int(header["frame_count"][0]), stored)
+        else:
+            self._file = open(self.path, "w+b")
+            header = np.zeros(1, dtype=HEADER_DTYPE)
+            header["magic"] = MAGIC
+            header["version"] = FORMAT_VERSION
+            header["max_hands"] = max_hands
+            self._file.write(header.tobytes())
+            self._file.flush()
+        self._header = None
+        self._records = None
+        self._capacity = 0
+        self._map(self.frame_count + self.grow_frames)
+        self._header["frame_count"] = self.frame_count
+
+    def _map(self, capacity: int) -> None:
+        if self._records is not None:
+            # Drop the old mappings first: Windows refuses to resize a mapped file.
+            self._records.flush()
+            self._header.flush()
+            self._records = None
+            self._header = None
+        self._file.truncate(HEADER_SIZE + capacity * self._dtype.itemsize)
+        self._header = np.memmap(self._file, dtype=HEADER_DTYPE, mode="r+", offset=0, shape=(1,))
+        self._records = np.memmap(self._file, dtype=self._dtype, mode="r+", offset=HEADER_SIZE, shape=(capacity,))
+        self._capacity = capacity
+
+    def write(self, timestamp: float, hands) -> None:
+        """Store one frame; `hands` is the list returned by HandTracker.process()."""
+        if self.frame_count >= self._capacity:
+            self._map(self._capacity + self.grow_frames)
+
+        fill_record(self._records[self.frame_count], timestamp, hands, self.max_hands)
+        self.frame_count += 1
+        self._header["frame_count"] = self.frame_count
+
+    def write_records(self, records: np.ndarray) -> None:
+        """Append a block of record_dtype(max_hands) records (e.g. one batch chunk)."""
+        end = self.frame_count + len(records)
+        if end > self._capacity:
+            self._map(end + self.grow_frames)
+        self._records[self.frame_count:end] = records
+        self.frame_count = end
+        self._header["frame_count"] = end
+
+    def flush(self) -> None:
+        self._header.flush()
+        self._records.flush()
+
+    def close(self) -> None:
+        if self._records is None:
+            return
+        self.flush()
+        self._records = None
+        self._header = None
+        self._file.truncate(HEADER_SIZE + self.frame_count * self._dtype.itemsize)
+        self._file.close()
+
+
+class LandmarkReplay:
+    """Read-only, memory-mapped view over a recorded session."""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        header = np.fromfile(self.path, dtype=HEADER_DTYPE, count=1)
+        if len(header) != 1 or header["magic"][0] != MAGIC:
+            raise ValueError(f"{self.path} is not a landmark recording.")
+        if int(header["version"][0]) != FORMAT_VERSION:
+            raise ValueError(f"Unsupported landmark recording version: {int(header['version'][0])}")
+        self.max_hands = int(header["max_hands"][0])
+        dtype = record_dtype(self.max_hands)
+        stored = (self.path.stat().st_size - HEADER_SIZE) // dtype.itemsize
+        count = min(int(header["frame_count"][0]), stored)
+        if count > 0:
+            self.records = np.memmap(self.path, dtype=dtype, mode="r", offset=HEADER_SIZE, shape=(count,))
+        else:
+            self.records = np.zeros(0, dtype=dtype)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        return self.records["timestamp"]
+
+    def hands_at(self, index: int) -> List[Tuple[np.ndarray, Optional[str]]]:
+        """Frame `index` in the same (landmarks, handedness) shape HandTracker.process() returns."""
+        record = self.records[index]
+        landmarks = record["landmarks"]
+        handedness = record["handedness"]
+        return [
+            (landmarks[idx], HANDEDNESS_LABELS.get(int(handedness[idx])))
+            for idx in range(int(record["hand_count"]))
+        ]
+
+    def __iter__(self) -> Iterator[Tuple[float, list]]:
+        """Yield (timestamp, hands) for every frame, as fast as the consumer pulls."""
+        timestamps = self.records["timestamp"]
+        for index in range(len(self.records)):
+            yield float(timestamps[index]), self.hands_at(index)
@@ -0,0 +1,195 @@
+from typing import List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+
+GESTURE_DEMO_LINES = [
+    "--- Gesture Summary ---",
+    "",
+    "Pointer hand",
+    "  Index tip -> Move cursor",
+    "  Two fingers -> Scroll",
+    "  Open palm -> Pause tracking",
+    "",
+    "Gesture hand (mouse)",
+    "  Pinch -> Left click",
+    "  Two fingers -> Right click",
+    "  Thumbs up -> Double click",
+    "  Fist hold -> Drag",
+    "",
+    "Gesture hand (zoom)",
+    "  Three fingers spread -> Zoom in",
+    "  Three fingers pinch -> Zoom out",
+    "",
+    "Window control (gesture hand)",
+    "  Spider -> Close window",
+    "  Thumbs down -> Minimize",
+    "  Ring + pinky up -> Maximize",
+    "  Both hands: four fingers spread, thumb down -> Show all windows",
+    "",
+    "Press H to toggle this help",
+]
+
+_PANEL_COLOR = (20, 20, 20)
+_PANEL_ALPHA = 0.65
+_MARGIN = 16
+
+
+class PanelSprite:
+    """Pre-rendered overlay panel: a uniform background at `alpha` with opaque
+    content (text) on top.
+
+    Content is kept as premultiplied ink plus a coverage mask (text may be
+    anti-aliased), and folded into two cached planes so that compositing is a
+    single per-pixel blend, frame = frame * keep / 255 + paint, instead of
+    re-rasterizing and blending every frame. Only the rows touched since the
+    last draw are re-folded.
+    """
+
+    def __init__(self, width: int, height: int, color, alpha: float):
+        self.width = width
+        self.height = height
+        self.color = color
+        self.alpha = alpha
+        self._ink = np.zeros((height, width, 3), dtype=np.uint8)
+        self._coverage = np.zeros((height, width), dtype=np.uint8)
+        self._keep = np.empty((height, width, 3), dtype=np.uint8)
+        self._paint = np.empty((height, width, 3), dtype=np.uint8)
+        self._background = tuple(float(c) * alpha for c in color)
+        self._dirty: Optional[Tuple[int, int]] = (0, height)
+
+    def _mark(self, y0: int, y1: int) -> None:
+        y0, y1 = max(0, y0), min(self.height, y1)
+        if self._dirty is not None:
+            y0, y1 = min(y0, self._dirty[0]), max(y1, self._dirty[1])
+        if y0 < y1:
+            self._dirty = (y0, y1)
+
+    def clear(self, y0: int = 0, y1: Optional[int] = None) -> None:
+        """Erase the content in rows y0..y1 (the whole panel by default)."""
+        y1 = self.height if y1 is None else y1
+        self._ink[y0:y1] = 0
+        self._coverage[y0:y1] = 0
+        self._mark(y0, y1)
+
+    def put_text(self, text: str, org: Tuple[int, int], scale: float, color, thickness: int) -> None:
+        cv2.putText(self._ink, text, org, cv2.FONT_HERSHEY_SIMPLEX, scale, color, thickness)
+        cv2.putText(self._coverage, text, org, cv2.FONT_HERSHEY_SIMPLEX, scale, 255, thickness)
+        (_, text_h), baseline = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, scale, thickness)
+        self._mark(org[1] - text_h - thickness, org[1] + baseline + thickness)
+
+    def _fold(self) -> None:
+        y0, y1 = self._dirty
+        self._dirty = None
+        # uncovered = 255 - coverage; keep = uncovered * (1 - alpha);
+        # paint = uncovered / 255 * background * alpha + ink.
+        uncovered = cv2.cvtColor(cv2.bitwise_not(self._coverage[y0:y1]), cv2.COLOR_GRAY2BGR)
+        cv2.multiply(uncovered, (1.0 - self.alpha,) * 3, dst=self._keep[y0:y1])
+        paint = self._paint[y0:y1]
+        cv2.multiply(uncovered, self._background, dst=paint, scale=1.0 / 255.0)
+        cv2.add(paint, self._ink[y0:y1], dst=paint)
+
+    def draw(self, frame, x: int, y: int) -> None:
+        """Composite onto frame (in-place) with the top-left corner at (x, y)."""
+        if self._dirty is not None:
+            self._fold()
+        h, w = frame.shape[:2]
+        fx0, fy0 = max(x, 0), max(y, 0)
+        fx1, fy1 = min(x + self.width, w), min(y + self.height, h)
+        if fx0 >= fx1 or fy0 >= fy1:
+            return
+        sx0, sy0 = fx0 - x, fy0 - y
+        sx1, sy1 = sx0 + (fx1 - fx0), sy0 + (fy1 - fy0)
+        roi = frame[fy0:fy1, fx0:fx1]
+        paint = self._paint[sy0:sy1, sx0:sx1]
+        if self.alpha >= 1.0:
+            np.copyto(roi, paint)
+            return
+        cv2.multiply(roi, self._keep[sy0:sy1, sx0:sx1], dst=roi, scale=1.0 / 255.0)
+        cv2.add(roi, paint, dst=roi)
+
+
+class OverlayRenderer:
+    """Preview overlay panels backed by cached sprites.
+
+    The help panel is rasterized once; each status line is re-rendered only
+    when its text changes; the profile panel only when a new summary arrives.
+    """
+
+    # Status panel: 4 lines, baseline offsets from the panel top.
+    _STATUS_SIZE = (360, 110)
+    _STATUS_BASE_Y = 24
+    _STATUS_LINE_H = 26
+
+    def __init__(self):
+        self._demo: Optional[PanelSprite] = None
+        self._status = PanelSprite(*self._STATUS_SIZE, _PANEL_COLOR, _PANEL_ALPHA)
+        self._status_lines: List[Optional[tuple]] = [None] * 4
+        self._profile: Optional[PanelSprite] = None
+        self._profile_summary = None
+
+    def draw_status(self, frame, fps: float, tracking: bool, gesture: str, dragging: bool, paused: bool, dropped: int = 0) -> None:
+        if not tracking:
+            status_text = "Hand Lost"
+            status_color = (0, 0, 255)
+        elif paused:
+            status_text = "Paused (Touchpad Enabled)"
+            status_color = (0, 220, 255)
+        else:
+            status_text = "Pen Active"
+            status_color = (0, 200, 0)
+
+        lines = (
+            (f"FPS: {fps:.1f}  Dropped: {dropped}", 0.65, (0, 220, 255)),
+            (f"Status: {status_text}", 0.6, status_color),
+            (f"Gesture: {gesture}", 0.6, (255, 200, 0)),
+            (f"Drag: {'ON' if dragging else 'OFF'}", 0.6, (255, 255, 255)),
+        )
+        sprite = self._status
+        for idx, line in enumerate(lines):
+            if line == self._status_lines[idx]:
+                continue
+            self._status_lines[idx] = line
+            baseline = self._STATUS_BASE_Y + idx * self._STATUS_LINE_H
+            sprite.clear(baseline - 20, baseline + 6)
+            text, scale, color = line
+            sprite.put_text(text, (12, baseline), scale, color, 2)
+
+        h, w = frame.shape[:2]
+        sprite.draw(frame, w - sprite.width - _MARGIN, h - sprite.height - _MARGIN)
+
+    def draw_profile(self, frame, summary) -> None:
+        """Per-stage p50/p95/p99 latency panel (top-right corner)."""
+        if not summary:
+            return
+        if summary is not self._profile_summary:
+            self._profile_summary = summary
+            line_h = 18
+            sprite = PanelSprite(300, line_h * (len(summary) + 1) + 12, _PANEL_COLOR, _PANEL_ALPHA)
+            sprite.put_text("stage        p50   p95   p99 ms", (10, line_h), 0.45, (0, 220, 255), 1)
+            for idx, (stage, p50, p95, p99) in enumerate(summary, start=2):
+                text = f"{stage:<12} {p50 * 1e3:5.1f} {p95 * 1e3:5.1f} {p99 * 1e3:5.1f}"
+                sprite.put_text(text, (10, idx * line_h), 0.45, (220, 220, 220), 1)
+            self._profile = sprite
+        w = frame.shape[1]
+        self._profile.draw(frame, w - self._profile.width - _MARGIN, _MARGIN)
+
+    def draw_gesture_demo(self, frame) -> None:
+        if self._demo is None:
+            # Wide enough for the longest line so no text spills off the panel.
+            width = max(
+                [471] + [cv2.getTextSize(line, cv2.FONT_HERSHEY_SIMPLEX, 0.5, 1)[0][0] + 20 for line in GESTURE_DEMO_LINES]
+            )
+            height = 20 * len(GESTURE_DEMO_LINES) + 21
+            sprite = PanelSprite(width, height, (15, 15, 15), 1.0)
+            for idx, line in enumerate(GESTURE_DEMO_LINES):
+                if not line:
+                    continue
+                if line.startswith("---") or line.startswith("Pointer") or line.startswith("Gesture") or line.startswith("Window"):
+                    color = (0, 220, 255)
+                else:
+                    color = (220, 220, 220)
+                sprite.put_text(line, (10, 20 + idx * 20), 0.5, color, 1)
+            self._demo = sprite
+        self._demo.draw(frame, 10, 130)
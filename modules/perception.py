@@ -0,0 +1,59 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from modules.frame import Frame
+
+
+class PerceptionStage:
+    """Hand and face inference on the same frame, in parallel.
+
+    The face mesh runs on a worker thread while the hand graph runs on the
+    caller's thread (MediaPipe releases the GIL inside its graphs), and both
+    are joined before process() returns, so results always belong to the same
+    frame. The face model only runs every `face_interval` frames; in between
+    the last face landmarks and gaze are kept.
+
+    Drop-in for HandTracker inside LocalPipeline: process() returns the hands.
+    """
+
+    def __init__(self, hand_tracker, face_tracker, eye_tracker=None, face_interval: int = 1, profiler=None):
+        self.hand_tracker = hand_tracker
+        self.face_tracker = face_tracker
+        self.eye_tracker = eye_tracker
+        self.face_interval = max(1, face_interval)
+        # Optional StageProfiler: the face thread records "face" itself.
+        self.profiler = profiler
+        self.face_landmarks = None
+        self.gaze = None
+        self._frame_index = 0
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="face-mesh")
+
+    def _run_face(self, frame_bgr) -> None:
+        started = time.perf_counter()
+        landmarks = self.face_tracker.process(frame_bgr)
+        if self.eye_tracker is not None:
+            h, w = frame_bgr.shape[:2]
+            self.gaze = self.eye_tracker.estimate_gaze(landmarks, w, h)
+        self.face_landmarks = landmarks
+        if self.profiler is not None:
+            self.profiler.record("face", time.perf_counter() - started)
+
+    def process(self, frame_bgr):
+        face_job = None
+        if self._frame_index % self.face_interval == 0:
+            if isinstance(frame_bgr, Frame):
+                # Convert to RGB once, up front, so both graphs share it.
+                frame_bgr.rgb
+            face_job = self._pool.submit(self._run_face, frame_bgr)
+        self._frame_index += 1
+        try:
+            hands = self.hand_tracker.process(frame_bgr)
+        finally:
+            if face_job is not None:
+                face_job.result()
+        return hands
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=True)
+        self.hand_tracker.close()
+        self.face_tracker.close()
@@ -0,0 +1,634 @@
+"""Multi-process capture / inference pipeline over shared memory.
+
+Capture and hand inference each run in their own process; the main process
+keeps gesture logic, cursor output and the preview. Frames travel through a
+SharedFrameRing and landmarks through a SharedLandmarkChannel, both plain
+NumPy views over `multiprocessing.shared_memory`, so nothing is pickled per
+frame. Writers always overwrite the oldest slot and readers always take the
+newest one: when a consumer falls behind, old data is dropped, never queued.
+
+Slots are guarded by a sequence lock: the writer marks a slot odd while it
+writes and even when done; a reader that sees the mark change under it
+discards what it read.
+"""
+import logging
+import time
+from multiprocessing import shared_memory
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from modules.frame import Frame, FrameBufferPool
+from modules.landmark_store import HANDEDNESS_CODES, HANDEDNESS_LABELS, record_dtype
+from utils.profiler import LatencyHistogram
+
+
+log = logging.getLogger(__name__)
+
+# Inference stats: frames inferred, frames skipped, results discarded.
+STATS_FIELDS = 3
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    # Workers are spawned from the owning process and share its resource
+    # tracker, so attaching does not hand ownership (or unlinking) to them.
+    return shared_memory.SharedMemory(name=name)
+
+
+class SharedFrameRing:
+    """Fixed-slot ring of BGR frames in shared memory.
+
+    Per-slot metadata is (seqlock, frame sequence, height, width) plus a
+    capture timestamp; header[0] holds the newest published sequence.
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, slots: int, height: int, width: int, owner: bool):
+        self.shm = shm
+        self.slots = slots
+        self.height = height
+        self.width = width
+        self._owner = owner
+        buf = shm.buf
+        offset = 0
+        self.header = np.ndarray((1,), dtype=np.int64, buffer=buf, offset=offset)
+        offset += 8
+        self.meta = np.ndarray((slots, 4), dtype=np.int64, buffer=buf, offset=offset)
+        offset += self.meta.nbytes
+        self.timestamps = np.ndarray((slots,), dtype=np.float64, buffer=buf, offset=offset)
+        offset += self.timestamps.nbytes
+        self.frames = np.ndarray((slots, height, width, 3), dtype=np.uint8, buffer=buf, offset=offset)
+        self._written = 0
+
+    @staticmethod
+    def _size(slots: int, height: int, width: int) -> int:
+        return 8 + slots * 4 * 8 + slots * 8 + slots * height * width * 3
+
+    @classmethod
+    def create(cls, slots: int, height: int, width: int) -> "SharedFrameRing":
+        shm = shared_memory.SharedMemory(create=True, size=cls._size(slots, height, width))
+        ring = cls(shm, slots, height, width, owner=True)
+        ring.header[:] = 0
+        ring.meta[:] = 0
+        return ring
+
+    @classmethod
+    def attach(cls, name: str, slots: int, height: int, width: int) -> "SharedFrameRing":
+        return cls(_attach(name), slots, height, width, owner=False)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def write(self, frame: np.ndarray, timestamp: float) -> int:
+        """Publish a frame (single writer). Returns its sequence number."""
+        h, w = frame.shape[:2]
+        if h > self.height or w > self.width:
+            raise ValueError(f"Frame {w}x{h} does not fit the {self.width}x{self.height} ring.")
+        self._written += 1
+        seq = self._written
+        slot = seq % self.slots
+        meta = self.meta[slot]
+        meta[0] = 2 * seq + 1
+        np.copyto(self.frames[slot, :h, :w], frame)
+        self.timestamps[slot] = timestamp
+        meta[1] = seq
+        meta[2] = h
+        meta[3] = w
+        meta[0] = 2 * seq
+        self.header[0] = seq
+        return seq
+
+    def latest_sequence(self) -> int:
+        return int(self.header[0])
+
+    def view(self, seq: int) -> Optional[Tuple[np.ndarray, float]]:
+        """Zero-copy (frame view, timestamp) of `seq`, or None if it was overwritten.
+
+        The view stays valid only while is_current(seq) holds; check it again
+        after using the frame.
+        """
+        slot = seq % self.slots
+        meta = self.meta[slot]
+        if meta[0] != 2 * seq:
+            return None
+        h, w = int(meta[2]), int(meta[3])
+        frame = self.frames[slot, :h, :w]
+        timestamp = float(self.timestamps[slot])
+        if meta[0] != 2 * seq:
+            return None
+        return frame, timestamp
+
+    def is_current(self, seq: int) -> bool:
+        return self.meta[seq % self.slots, 0] == 2 * seq
+
+    def close(self) -> None:
+        self.header = self.meta = self.timestamps = self.frames = None
+        self.shm.close()
+        if self._owner:
+            self.shm.unlink()
+
+
+class SharedLandmarkChannel:
+    """Small fixed-layout ring of per-frame hand landmarks in shared memory.
+
+    Records use the same layout as the landmark session files
+    (landmark_store.record_dtype) plus the source frame sequence.
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, slots: int, max_hands: int, owner: bool):
+        self.shm = shm
+        self.slots = slots
+        self.max_hands = max_hands
+        self._owner = owner
+        dtype = record_dtype(max_hands)
+        buf = shm.buf
+        self.header = np.ndarray((1,), dtype=np.int64, buffer=buf, offset=0)
+        self.meta = np.ndarray((slots, 2), dtype=np.int64, buffer=buf, offset=8)
+        self.records = np.ndarray((slots,), dtype=dtype, buffer=buf, offset=8 + slots * 16)
+        self._written = 0
+
+    @classmethod
+    def create(cls, slots: int, max_hands: int) -> "SharedLandmarkChannel":
+        size = 8 + slots * 16 + slots * record_dtype(max_hands).itemsize
+        channel = cls(shared_memory.SharedMemory(create=True, size=size), slots, max_hands, owner=True)
+        channel.header[:] = 0
+        channel.meta[:] = 0
+        return channel
+
+    @classmethod
+    def attach(cls, name: str, slots: int, max_hands: int) -> "SharedLandmarkChannel":
+        return cls(_attach(name), slots, max_hands, owner=False)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def write(self, frame_seq: int, timestamp: float, hands) -> None:
+        self._written += 1
+        seq = self._written
+        slot = seq % self.slots
+        meta = self.meta[slot]
+        meta[0] = 2 * seq + 1
+        record = self.records[slot]
+        count = min(len(hands), self.max_hands)
+        record["timestamp"] = timestamp
+        record["hand_count"] = count
+        for idx in range(count):
+            points, handedness = hands[idx]
+            record["landmarks"][idx] = points
+            record["handedness"][idx] = HANDEDNESS_CODES.get(handedness, 0)
+        meta[1] = frame_seq
+        meta[0] = 2 * seq
+        self.header[0] = seq
+
+    def latest_sequence(self) -> int:
+        return int(self.header[0])
+
+    def read(self, seq: int) -> Optional[Tuple[int, float, List[Tuple[np.ndarray, Optional[str]]]]]:
+        """(frame_seq, timestamp, hands) for landmark record `seq`, or None if overwritten."""
+        slot = seq % self.slots
+        meta = self.meta[slot]
+        if meta[0] != 2 * seq:
+            return None
+        record = self.records[slot].copy()
+        frame_seq = int(meta[1])
+        if meta[0] != 2 * seq:
+            return None
+        hands = [
+            (record["landmarks"][idx], HANDEDNESS_LABELS.get(int(record["handedness"][idx])))
+            for idx in range(int(record["hand_count"]))
+        ]
+        return frame_seq, float(record["timestamp"]), hands
+
+    def close(self) -> None:
+        self.header = self.meta = self.records = None
+        self.shm.close()
+        if self._owner:
+            self.shm.unlink()
+
+
+def _store_histogram(block: np.ndarray, offset: int, hist: LatencyHistogram) -> None:
+    block[offset] = hist.count
+    block[offset + 1] = hist.total
+    block[offset + 2] = hist.max
+    block[offset + 3 : offset + 3 + len(hist.counts)] = hist.counts
+
+
+def _load_histogram(block: np.ndarray, offset: int, hist: LatencyHistogram) -> None:
+    hist.counts[:] = block[offset + 3 : offset + 3 + len(hist.counts)].astype(np.int64).tolist()
+    hist.count = int(block[offset])
+    hist.total = float(block[offset + 1])
+    hist.max = float(block[offset + 2])
+
+
+class SharedWorkerMetrics:
+    """Metrics of the inference process (HandTracker, IdleGate), mirrored to the main one.
+
+    One float64 block: hand frames by landmark source (mediapipe,
+    optical_flow), the MediaPipe time histogram, the idle gate's idle / active
+    seconds and wakes, and its waking-frame inference histogram (a histogram is stored
+    as count, total, max, bin counts). The worker publishes after every frame;
+    the main process copies the block into its own registry when that is
+    rendered.
+    """
+
+    HAND_SOURCES = ("mediapipe", "optical_flow")
+    _HISTOGRAM = 3 + len(LatencyHistogram().counts)
+    _HAND_TIME = len(HAND_SOURCES)
+    _IDLE = _HAND_TIME + _HISTOGRAM
+    _WAKE_INFERENCE = _IDLE + 3
+    SIZE = (_WAKE_INFERENCE + _HISTOGRAM) * 8
+
+    def __init__(self, shm: shared_memory.SharedMemory, owner: bool):
+        self.shm = shm
+        self._owner = owner
+        self.block = np.ndarray((self.SIZE // 8,), dtype=np.float64, buffer=shm.buf)
+
+    @classmethod
+    def create(cls) -> "SharedWorkerMetrics":
+        metrics = cls(shared_memory.SharedMemory(create=True, size=cls.SIZE), owner=True)
+        metrics.block[:] = 0
+        return metrics
+
+    @classmethod
+    def attach(cls, name: str) -> "SharedWorkerMetrics":
+        return cls(_attach(name), owner=False)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def publish(self, hand, idle=None) -> None:
+        """`hand` is hand_metrics(), `idle` idle_metrics() (or None without a gate)."""
+        block = self.block
+        frames, inference_time = hand
+        for idx, source in enumerate(self.HAND_SOURCES):
+            block[idx] = frames.values.get(source, 0)
+        _store_histogram(block, self._HAND_TIME, inference_time.histogram)
+        if idle is not None:
+            idle_seconds, active_seconds, wakes, wake_inference = idle
+            block[self._IDLE] = idle_seconds.value
+            block[self._IDLE + 1] = active_seconds.value
+            block[self._IDLE + 2] = wakes.value
+            _store_histogram(block, self._WAKE_INFERENCE, wake_inference.histogram)
+
+    def collect(self, hand, idle=None) -> None:
+        block = self.block.copy()
+        frames, inference_time = hand
+        for idx, source in enumerate(self.HAND_SOURCES):
+            if block[idx]:
+                frames.values[source] = int(block[idx])
+        _load_histogram(block, self._HAND_TIME, inference_time.histogram)
+        if idle is not None:
+            idle_seconds, active_seconds, wakes, wake_inference = idle
+            idle_seconds.value = float(block[self._IDLE])
+            active_seconds.value = float(block[self._IDLE + 1])
+            wakes.value = int(block[self._IDLE + 2])
+            _load_histogram(block, self._WAKE_INFERENCE, wake_inference.histogram)
+
+    def close(self) -> None:
+        self.block = None
+        self.shm.close()
+        if self._owner:
+            self.shm.unlink()
+
+
+def _init_worker() -> None:
+    # Ctrl+C reaches the whole process group; the main process owns shutdown
+    # and stops the workers through the shared stop event.
+    import signal
+
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(processName)s %(name)s: %(message)s")
+
+
+def idle_gate_from_config(cfg, metrics=None):
+    from modules.frame_source import paced_source
+    from modules.idle_gate import IdleGate
+
+    if not cfg.idle_mode:
+        return None
+    if not paced_source(cfg):
+        # The idle timer is wall-clock time, which says nothing about a source
+        # read as fast as possible; such runs process every frame.
+        log.info("Idle mode is off for an unpaced frame source.")
+        return None
+    return IdleGate(
+        idle_after_seconds=cfg.idle_after_seconds,
+        poll_seconds=cfg.idle_poll_seconds,
+        motion_threshold=cfg.idle_motion_threshold,
+        metrics=metrics,
+    )
+
+
+def _wait_for_newer(latest_sequence, last_seq: int, ready, stop, timeout: float) -> int:
+    """Block until `latest_sequence()` moves past `last_seq`; returns it (or last_seq on timeout/stop)."""
+    deadline = time.monotonic() + timeout
+    while not stop.is_set():
+        seq = latest_sequence()
+        if seq > last_seq:
+            return seq
+        ready.clear()
+        seq = latest_sequence()
+        if seq > last_seq:
+            return seq
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        ready.wait(min(remaining, 0.1))
+    return last_seq
+
+
+def capture_worker(cfg, ring_name: str, ring_shape, frame_ready, idle, stop, finished) -> None:
+    """Capture process: frame source -> SharedFrameRing (slowed down while `idle` is set).
+
+    Sets `finished` and returns once a finite source runs out.
+    """
+    from modules.camera import CameraStream
+    from modules.frame_source import open_frame_source
+
+    _init_worker()
+    slots, height, width = ring_shape
+    ring = SharedFrameRing.attach(ring_name, slots, height, width)
+    camera = CameraStream(cfg.camera_index, cfg.frame_width, cfg.frame_height, source=open_frame_source(cfg))
+    try:
+        while not stop.is_set():
+            # Only a paced source may skip frames while idle; an unpaced one
+            # (--fast) must deliver every frame.
+            camera.decode_interval = cfg.idle_poll_seconds if idle.is_set() and camera.cap.paced else 0.0
+            frame = camera.read()
+            if frame is None:
+                if camera.finished:
+                    finished.set()
+                    break
+                continue
+            image = frame.bgr
+            if image.shape[0] > height or image.shape[1] > width:
+                import cv2
+
+                image = cv2.resize(image, (width, height), interpolation=cv2.INTER_AREA)
+            ring.write(image, frame.timestamp)
+            frame.release()
+            frame_ready.set()
+    finally:
+        camera.release()
+        ring.close()
+
+
+def inference_worker(cfg, ring_name: str, ring_shape, channel_name: str, channel_slots: int, stats_name: str, metrics_name, frame_ready, landmarks_ready, idle, stop) -> None:
+    """Inference process: newest frame in the ring -> HandTracker -> SharedLandmarkChannel.
+
+    `stats_name` is a small shared int64 array: [frames inferred, frames
+    skipped because a newer one arrived, results discarded because the slot
+    was overwritten during inference]. With `metrics_name` set, the
+    HandTracker and IdleGate metrics are published to that SharedWorkerMetrics
+    block.
+    """
+    from modules.hand_tracker import HandTracker, hand_metrics
+    from modules.idle_gate import idle_metrics
+    from utils.metrics import MetricsRegistry
+    from modules.quality_controller import AdaptiveQualityController
+
+    _init_worker()
+    slots, height, width = ring_shape
+    stats_shm = _attach(stats_name)
+    stats = np.ndarray((STATS_FIELDS,), dtype=np.int64, buffer=stats_shm.buf)
+    ring = SharedFrameRing.attach(ring_name, slots, height, width)
+    channel = SharedLandmarkChannel.attach(channel_name, channel_slots, cfg.max_hands)
+    shared_metrics = registry = None
+    if metrics_name is not None:
+        shared_metrics = SharedWorkerMetrics.attach(metrics_name)
+        registry = MetricsRegistry()
+    hand_tracker = HandTracker.from_config(cfg, metrics=registry)
+    hand_tracker.warm_up(width, height)
+    quality = None
+    if cfg.adaptive_quality:
+        quality = AdaptiveQualityController(
+            hand_tracker,
+            target_frame_seconds=cfg.target_frame_ms / 1000.0,
+            levels=cfg.quality_levels,
+            single_hand_seconds=cfg.single_hand_downgrade_seconds,
+        )
+    gate = idle_gate_from_config(cfg, metrics=registry)
+    if shared_metrics is not None:
+        hand_targets = hand_metrics(registry)
+        idle_targets = idle_metrics(registry) if gate is not None else None
+    last_seq = 0
+    try:
+        while not stop.is_set():
+            seq = _wait_for_newer(ring.latest_sequence, last_seq, frame_ready, stop, timeout=0.5)
+            if seq == last_seq:
+                continue
+            stats[1] += max(0, seq - last_seq - 1)
+            last_seq = seq
+            view = ring.view(seq)
+            if view is None:
+                stats[2] += 1
+                continue
+            frame, timestamp = view
+            started = time.perf_counter()
+            if gate is not None:
+                hands = gate.process(frame, hand_tracker.process, timestamp)
+                if gate.idle and not idle.is_set():
+                    idle.set()
+                elif not gate.idle and idle.is_set():
+                    idle.clear()
+            else:
+                hands = hand_tracker.process(frame)
+            if not ring.is_current(seq):
+                # The capture process lapped the ring while we were reading.
+                stats[2] += 1
+                continue
+            channel.write(seq, timestamp, hands)
+            landmarks_ready.set()
+            stats[0] += 1
+            if shared_metrics is not None:
+                shared_metrics.publish(hand_targets, idle_targets)
+            if quality is not None:
+                quality.update(time.perf_counter() - started, len(hands), time.time())
+    finally:
+        if gate is not None:
+            gate.report()
+        hand_tracker.close()
+        if shared_metrics is not None:
+            shared_metrics.close()
+        channel.close()
+        ring.close()
+        del stats
+        stats_shm.close()
+
+
+class ProcessPipeline:
+    """Main-process side of the pipeline: starts the workers and reads results."""
+
+    def __init__(self, cfg, frame_slots: int = 4, landmark_slots: int = 8, profiler=None, metrics=None):
+        import multiprocessing as mp
+
+        # Optional StageProfiler: read() laps "landmarks" (waiting for a
+        # result) and "frame_copy"; the workers are not profiled.
+        self.profiler = profiler
+        # Optional MetricsRegistry: the inference process's HandTracker and
+        # IdleGate metrics are mirrored into it whenever it is rendered.
+        self.worker_metrics = None
+        if metrics is not None:
+            from modules.hand_tracker import hand_metrics
+            from modules.idle_gate import idle_metrics
+
+            self.worker_metrics = SharedWorkerMetrics.create()
+            self._metric_targets = (hand_metrics(metrics), idle_metrics(metrics) if cfg.idle_mode else None)
+            metrics.add_collector(self._collect_worker_metrics)
+        ctx = mp.get_context("spawn")
+        self.ring = SharedFrameRing.create(frame_slots, cfg.frame_height, cfg.frame_width)
+        self.channel = SharedLandmarkChannel.create(landmark_slots, cfg.max_hands)
+        self._stats_shm = shared_memory.SharedMemory(create=True, size=STATS_FIELDS * 8)
+        self.stats = np.ndarray((STATS_FIELDS,), dtype=np.int64, buffer=self._stats_shm.buf)
+        self.stats[:] = 0
+        self._stop = ctx.Event()
+        self._frame_ready = ctx.Event()
+        self._landmarks_ready = ctx.Event()
+        self._idle = ctx.Event()
+        self._source_finished = ctx.Event()
+        ring_shape = (frame_slots, cfg.frame_height, cfg.frame_width)
+        self._processes = [
+            ctx.Process(
+                target=capture_worker,
+                args=(cfg, self.ring.name, ring_shape, self._frame_ready, self._idle, self._stop, self._source_finished),
+                name="touchless-capture",
+                daemon=True,
+            ),
+            ctx.Process(
+                target=inference_worker,
+                args=(cfg, self.ring.name, ring_shape, self.channel.name, landmark_slots, self._stats_shm.name, self.worker_metrics.name if self.worker_metrics is not None else None, self._frame_ready, self._landmarks_ready, self._idle, self._stop),
+                name="touchless-inference",
+                daemon=True,
+            ),
+        ]
+        for process in self._processes:
+            process.start()
+        log.info("Pipeline started: capture pid %d, inference pid %d.", *(p.pid for p in self._processes))
+        self.pool = FrameBufferPool()
+        self._last_seq = 0
+        self._last_frame_seq = 0
+        self.dropped_landmarks = 0
+        self.frame_timestamp = 0.0
+
+    def _collect_worker_metrics(self) -> None:
+        if self.worker_metrics is not None and self.worker_metrics.block is not None:
+            self.worker_metrics.collect(*self._metric_targets)
+
+    @property
+    def dropped_frames(self) -> int:
+        """Frames the inference process skipped or lost to overwrite."""
+        return int(self.stats[1] + self.stats[2])
+
+    @property
+    def finished(self) -> bool:
+        """True once the frame source has run out and its last frame has been processed."""
+        if not self._source_finished.is_set():
+            return False
+        if not self._processes[1].is_alive():
+            return True
+        return self._last_frame_seq >= self.ring.latest_sequence() and self._last_seq >= self.channel.latest_sequence()
+
+    def read(self, timeout: float = 0.5, want_frame: bool = True):
+        """Newest (Frame or None, hands); (None, None) if nothing new arrived in time.
+
+        The Frame holds a pooled copy of the frame the landmarks came from (or
+        of the newest frame if that one was already overwritten).
+        """
+        seq = _wait_for_newer(self.channel.latest_sequence, self._last_seq, self._landmarks_ready, self._stop, timeout)
+        if seq == self._last_seq:
+            for process in self._processes:
+                if not process.is_alive() and not (process is self._processes[0] and self._source_finished.is_set()):
+                    raise RuntimeError(f"Pipeline worker {process.name} exited with code {process.exitcode}.")
+            return None, None
+        self.dropped_landmarks += max(0, seq - self._last_seq - 1)
+        self._last_seq = seq
+        item = self.channel.read(seq)
+        if item is None:
+            return None, None
+        frame_seq, timestamp, hands = item
+        self._last_frame_seq = frame_seq
+        self.frame_timestamp = timestamp
+        if self.profiler is not None:
+            self.profiler.lap("landmarks")
+
+        frame = None
+        if want_frame:
+            for candidate in (frame_seq, self.ring.latest_sequence()):
+                view = self.ring.view(candidate)
+                if view is not None:
+                    image = self.pool.acquire(view[0].shape)
+                    np.copyto(image, view[0])
+                    if self.ring.is_current(candidate):
+                        frame = Frame(image, view[1], candidate, self.pool)
+                        break
+                    self.pool.release(image)
+            if self.profiler is not None:
+                self.profiler.lap("frame_copy")
+        return frame, hands
+
+    def close(self) -> None:
+        self._stop.set()
+        for process in self._processes:
+            process.join(timeout=3.0)
+            if process.is_alive():
+                log.warning("Pipeline worker %s did not stop, terminating it.", process.name)
+                process.terminate()
+        self.stats = None
+        self._stats_shm.close()
+        self._stats_shm.unlink()
+        if self.worker_metrics is not None:
+            self.worker_metrics.close()
+        self.channel.close()
+        self.ring.close()
+
+
+class LocalPipeline:
+    """Single-process counterpart of ProcessPipeline: capture and inference inline.
+
+    `hand_tracker` is anything with HandTracker's process() / close(), e.g. a
+    PerceptionStage that also runs the face mesh.
+    """
+
+    def __init__(self, camera, hand_tracker, idle_gate=None):
+        self.camera = camera
+        self.hand_tracker = hand_tracker
+        self.idle_gate = idle_gate
+        # perf_counter() when the last frame arrived, i.e. after the capture
+        # wait and before inference (the start of the adaptive-quality budget).
+        self.work_started: float = 0.0
+
+    @property
+    def dropped_frames(self) -> int:
+        return self.camera.dropped_frames
+
+    @property
+    def pool(self):
+        return self.camera.pool
+
+    @property
+    def finished(self) -> bool:
+        return self.camera.finished
+
+    @property
+    def frame_timestamp(self) -> float:
+        return self.camera.frame_timestamp
+
+    def read(self, timeout: float = 0.5, want_frame: bool = True):
+        frame = self.camera.read(timeout)
+        if frame is None:
+            return None, None
+        self.work_started = time.perf_counter()
+        gate = self.idle_gate
+        if gate is None:
+            return frame, self.hand_tracker.process(frame)
+        hands = gate.process(frame, self.hand_tracker.process, self.camera.frame_timestamp)
+        self.camera.decode_interval = gate.poll_seconds if gate.idle else 0.0
+        return frame, hands
+
+    def close(self) -> None:
+        if self.idle_gate is not None:
+            self.idle_gate.report()
+        self.camera.release()
+        self.hand_tracker.close()
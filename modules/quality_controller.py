@@ -0,0 +1,117 @@
+import logging
+from typing import Optional, Sequence, Tuple
+
+
+log = logging.getLogger(__name__)
+
+
+class AdaptiveQualityController:
+    """Closed-loop controller that trades inference quality for frame time.
+
+    `levels` is ordered from best to cheapest quality; each level is an
+    (inference_scale, redetect_frames) pair applied to the HandTracker (the
+    redetect interval only matters with ROI tracking). The controller watches
+    a smoothed per-frame latency and steps one level down when it stays above
+    the target, or one level up when there is clear headroom. Independently it
+    runs the single-hand graph after only one hand has been seen for
+    `single_hand_seconds`, and restores the full graph as soon as a probe frame
+    sees more hands. Every transition is logged.
+    """
+
+    def __init__(
+        self,
+        hand_tracker,
+        target_frame_seconds: float,
+        levels: Sequence[Tuple[float, int]],
+        single_hand_seconds: float = 5.0,
+        smoothing: float = 0.1,
+        step_down_ratio: float = 1.1,
+        step_up_ratio: float = 0.7,
+        hold_seconds: float = 2.0,
+    ):
+        self.hand_tracker = hand_tracker
+        self.target_frame_seconds = target_frame_seconds
+        self.levels = list(levels) or [(1.0, hand_tracker.roi_redetect_interval)]
+        self.single_hand_seconds = single_hand_seconds
+        self.smoothing = smoothing
+        self.step_down_ratio = step_down_ratio
+        self.step_up_ratio = step_up_ratio
+        self.hold_seconds = hold_seconds
+
+        self.level = 0
+        self.frame_seconds: Optional[float] = None  # smoothed latency
+        self._last_change_at: Optional[float] = None
+        self._last_multi_hand_at: Optional[float] = None
+        self._apply_level(self.level)
+
+    def _apply_level(self, level: int) -> None:
+        scale, redetect_frames = self.levels[level]
+        self.hand_tracker.inference_scale = scale
+        self.hand_tracker.roi_redetect_interval = redetect_frames
+
+    def _change_level(self, level: int, now: float, reason: str) -> None:
+        old_scale, old_redetect = self.levels[self.level]
+        new_scale, new_redetect = self.levels[level]
+        log.info(
+            "Quality level %d -> %d (scale %.2f -> %.2f, redetect every %d -> %d frames): %s",
+            self.level,
+            level,
+            old_scale,
+            new_scale,
+            old_redetect,
+            new_redetect,
+            reason,
+        )
+        self.level = level
+        self._last_change_at = now
+        self._apply_level(level)
+
+    def update(self, frame_seconds: float, hands_seen: int, now: float) -> None:
+        """Feed one frame's processing time and hand count."""
+        if self.frame_seconds is None:
+            self.frame_seconds = frame_seconds
+        else:
+            self.frame_seconds += self.smoothing * (frame_seconds - self.frame_seconds)
+        if self._last_change_at is None:
+            self._last_change_at = now
+        if self._last_multi_hand_at is None:
+            self._last_multi_hand_at = now
+
+        self._update_max_hands(hands_seen, now)
+
+        # Hysteresis: wait `hold_seconds` after a change (twice that before
+        # stepping back up) so the smoothed latency reflects the new level.
+        since_change = now - self._last_change_at
+        latency_ms = self.frame_seconds * 1e3
+        target_ms = self.target_frame_seconds * 1e3
+        if (
+            self.frame_seconds > self.target_frame_seconds * self.step_down_ratio
+            and self.level + 1 < len(self.levels)
+            and since_change >= self.hold_seconds
+        ):
+            self._change_level(self.level + 1, now, f"frame {latency_ms:.1f} ms > target {target_ms:.1f} ms")
+        elif (
+            self.frame_seconds < self.target_frame_seconds * self.step_up_ratio
+            and self.level > 0
+            and since_change >= 2.0 * self.hold_seconds
+        ):
+            self._change_level(self.level - 1, now, f"frame {latency_ms:.1f} ms well under target {target_ms:.1f} ms")
+
+    def _update_max_hands(self, hands_seen: int, now: float) -> None:
+        tracker = self.hand_tracker
+        if hands_seen > 1:
+            self._last_multi_hand_at = now
+            if tracker.active_max_hands < tracker.max_hands:
+                log.info("max_num_hands 1 -> %d: second hand seen", tracker.max_hands)
+                tracker.set_active_max_hands(tracker.max_hands)
+        elif (
+            tracker.active_max_hands > 1
+            and hands_seen == 1
+            and now - self._last_multi_hand_at >= self.single_hand_seconds
+        ):
+            log.info(
+                "max_num_hands %d -> 1: only one hand seen for %.1f s",
+                tracker.active_max_hands,
+                now - self._last_multi_hand_at,
+            )
+            tracker.set_active_max_hands(1)
@@ -1,14 +1,46 @@
-﻿from utils.filters import ExponentialPointFilter, MovingAveragePointFilter
+﻿from typing import Optional
+
+from utils.filters import ExponentialPointFilter, MovingAveragePointFilter, OneEuroPointFilter
 
 
 class CursorSmoother:
-    def __init__(self, alpha: float, window_size: int):
+    """Cursor target smoothing.
+
+    mode "ema": exponential filter followed by a moving average (steady, but
+    lags by a few frames). mode "one_euro": speed-adaptive One Euro filter;
+    update() can extrapolate its output `lead` seconds ahead to hide the
+    capture-to-output latency.
+    """
+
+    def __init__(
+        self,
+        alpha: float,
+        window_size: int,
+        mode: str = "ema",
+        min_cutoff: float = 0.5,
+        beta: float = 0.01,
+        d_cutoff: float = 1.0,
+    ):
+        if mode not in ("ema", "one_euro"):
+            raise ValueError(f"Unknown cursor filter mode: {mode!r}")
+        self.mode = mode
         self.exp = ExponentialPointFilter(alpha=alpha)
         self.avg = MovingAveragePointFilter(window_size=window_size)
+        self.one_euro = OneEuroPointFilter(min_cutoff=min_cutoff, beta=beta, d_cutoff=d_cutoff)
 
     def reset(self) -> None:
         self.exp.reset()
         self.avg.reset()
+        self.one_euro.reset()
 
-    def update(self, point):
+    def update(self, point, timestamp: Optional[float] = None, lead: float = 0.0):
+        if self.mode == "one_euro":
+            self.one_euro.update(point, timestamp)
+            return self.one_euro.predict(lead)
         return self.avg.update(self.exp.update(point))
+
+    def filter_batch(self, points, timestamps=None):
+        """Smooth an (N, 2) trace in one call (no prediction); see the filters' filter_batch."""
+        if self.mode == "one_euro":
+            return self.one_euro.filter_batch(points, timestamps)
+        return self.avg.filter_batch(self.exp.filter_batch(points))
@@ -0,0 +1,70 @@
+"""Replay a recorded landmark session through the gesture path without a webcam.
+
+    python replay.py recordings/session_20260101_120000.tclm --loops 100
+"""
+import argparse
+import time
+from collections import Counter
+
+from config import CFG
+from modules.gesture_controller import GestureController
+from modules.gesture_events import EDGE_KEYS
+from modules.hand_roles import select_hands
+from modules.landmark_store import LandmarkReplay
+
+
+def replay(path: str, loops: int = 1, pointer_preference: str = CFG.pointer_hand):
+    """Run every recorded frame through select_hands + GestureController.update.
+
+    `now` comes from the recorded timestamps (shifted per loop so time keeps
+    moving forward), so hold and cooldown timings behave as they did live.
+    Returns (frames, seconds, action_counts, gesture_counts).
+    """
+    session = LandmarkReplay(path)
+    gestures = GestureController.from_config(CFG)
+    actions = Counter()
+    labels = Counter()
+    frames = 0
+    if len(session) == 0:
+        return frames, 0.0, actions, labels
+
+    timestamps = session.timestamps
+    loop_span = float(timestamps[-1] - timestamps[0]) + 1.0 / 30.0
+
+    started = time.perf_counter()
+    for loop in range(loops):
+        offset = loop * loop_span
+        for timestamp, hands in session:
+            pointer_hand, gesture_hand, gesture_handedness = select_hands(hands, pointer_preference)
+            state = gestures.update(
+                pointer_hand[0] if pointer_hand else None,
+                gesture_hand[0] if gesture_hand else None,
+                gesture_handedness=gesture_handedness,
+                now=timestamp + offset,
+                allow_single_hand=not CFG.require_two_hands_for_gestures,
+                allow_pointer_scroll=CFG.allow_pointer_scroll,
+                pointer_scroll_requires_gesture_rest=CFG.pointer_scroll_requires_gesture_rest,
+            )
+            labels[state.gesture] += 1
+            for event in state.events:
+                if event.key in EDGE_KEYS:
+                    actions[event.key] += 1
+            frames += 1
+    return frames, time.perf_counter() - started, actions, labels
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path", help="Recorded .tclm session file")
+    parser.add_argument("--loops", type=int, default=1, help="Replay the session this many times")
+    parser.add_argument("--pointer-hand", default=CFG.pointer_hand, help='"Right", "Left", or "Either"')
+    args = parser.parse_args()
+
+    frames, seconds, actions, labels = replay(args.path, loops=max(1, args.loops), pointer_preference=args.pointer_hand)
+    print(f"Frames: {frames}  Time: {seconds:.3f}s  Throughput: {frames / max(seconds, 1e-9):.0f} frames/s")
+    print("Gestures:", ", ".join(f"{name}={count}" for name, count in labels.most_common()) or "-")
+    print("Actions:", ", ".join(f"{name}={count}" for name, count in sorted(actions.items())) or "-")
+
+
+if __name__ == "__main__":
+    main()
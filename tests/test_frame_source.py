@@ -0,0 +1,60 @@
+import dataclasses
+
+from config import CFG
+from modules.camera import CameraStream
+from modules.frame_source import SyntheticSource, open_frame_source
+from modules.pipeline import LocalPipeline, idle_gate_from_config
+
+
+class _NoHands:
+    """HandTracker stand-in that never finds a hand."""
+
+    def process(self, frame):
+        return []
+
+    def close(self) -> None:
+        pass
+
+
+def _fast_config(frames: int):
+    return dataclasses.replace(
+        CFG,
+        frame_source="synthetic",
+        frame_source_realtime=False,
+        frame_source_frames=frames,
+        frame_width=64,
+        frame_height=36,
+        idle_mode=True,
+        idle_after_seconds=0.0,
+        idle_poll_seconds=10.0,
+    )
+
+
+def test_fast_source_yields_every_frame_past_idle_timeout():
+    cfg = _fast_config(200)
+    camera = CameraStream(cfg.camera_index, cfg.frame_width, cfg.frame_height, source=open_frame_source(cfg))
+    pipeline = LocalPipeline(camera, _NoHands(), idle_gate=idle_gate_from_config(cfg))
+    frames = 0
+    try:
+        while not pipeline.finished:
+            frame, hands = pipeline.read()
+            if frame is not None:
+                frames += 1
+                frame.release()
+    finally:
+        pipeline.close()
+    assert frames == 200
+
+
+def test_unpaced_source_ignores_decode_interval():
+    camera = CameraStream(0, 64, 36, source=SyntheticSource(64, 36, realtime=False, frames=50))
+    camera.decode_interval = 10.0
+    frames = 0
+    while True:
+        frame = camera.read()
+        if frame is None:
+            break
+        frames += 1
+        frame.release()
+    camera.release()
+    assert frames == 50
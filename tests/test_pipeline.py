@@ -0,0 +1,185 @@
+import dataclasses
+import multiprocessing as mp
+import threading
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+import pytest
+
+from config import CFG
+from modules.frame import FrameBufferPool
+from modules.pipeline import ProcessPipeline, SharedFrameRing, SharedLandmarkChannel, capture_worker
+
+
+def _spawn():
+    return mp.get_context("spawn")
+
+
+def _image(value: int, height: int = 6, width: int = 8) -> np.ndarray:
+    return np.full((height, width, 3), value, dtype=np.uint8)
+
+
+def _hand(value: float) -> np.ndarray:
+    return np.full((21, 3), value, dtype=np.float32)
+
+
+def _unlinked(name: str) -> bool:
+    try:
+        shm = shared_memory.SharedMemory(name=name)
+    except FileNotFoundError:
+        return True
+    shm.close()
+    return False
+
+
+def test_frame_ring_round_trip():
+    ring = SharedFrameRing.create(3, 6, 8)
+    reader = SharedFrameRing.attach(ring.name, 3, 6, 8)
+    try:
+        small = _image(7, height=4, width=5)
+        seq = ring.write(small, 12.5)
+        assert reader.latest_sequence() == seq == 1
+        frame, timestamp = reader.view(seq)
+        assert frame.shape == (4, 5, 3)
+        assert np.array_equal(frame, small)
+        assert timestamp == 12.5
+        assert reader.is_current(seq)
+    finally:
+        reader.close()
+        ring.close()
+
+
+def test_frame_ring_drops_overwritten_frames():
+    ring = SharedFrameRing.create(3, 6, 8)
+    try:
+        for value in range(1, 5):
+            ring.write(_image(value), float(value))
+        assert ring.view(1) is None
+        assert not ring.is_current(1)
+        frame, timestamp = ring.view(4)
+        assert frame[0, 0, 0] == 4 and timestamp == 4.0
+        with pytest.raises(ValueError):
+            ring.write(_image(0, height=7), 0.0)
+    finally:
+        ring.close()
+
+
+def test_frame_ring_rejects_a_slot_being_written():
+    ring = SharedFrameRing.create(3, 6, 8)
+    try:
+        seq = ring.write(_image(1), 1.0)
+        # An odd seqlock value marks a write in progress.
+        ring.meta[seq % ring.slots, 0] = 2 * seq + 1
+        assert ring.view(seq) is None
+        assert not ring.is_current(seq)
+    finally:
+        ring.close()
+
+
+def test_landmark_channel_round_trip():
+    channel = SharedLandmarkChannel.create(4, max_hands=2)
+    reader = SharedLandmarkChannel.attach(channel.name, 4, max_hands=2)
+    try:
+        channel.write(17, 3.25, [(_hand(0.1), "Right"), (_hand(0.2), "Left"), (_hand(0.3), "Left")])
+        channel.write(18, 3.5, [])
+        frame_seq, timestamp, hands = reader.read(1)
+        assert (frame_seq, timestamp) == (17, 3.25)
+        assert [handedness for _, handedness in hands] == ["Right", "Left"]
+        assert np.allclose(hands[0][0], 0.1) and np.allclose(hands[1][0], 0.2)
+        assert reader.read(2) == (18, 3.5, [])
+        assert reader.latest_sequence() == 2
+    finally:
+        reader.close()
+        channel.close()
+
+
+def test_landmark_channel_drops_overwritten_and_torn_records():
+    channel = SharedLandmarkChannel.create(2, max_hands=1)
+    try:
+        for frame_seq in range(1, 4):
+            channel.write(frame_seq, float(frame_seq), [(_hand(frame_seq), "Left")])
+        assert channel.read(1) is None
+        assert channel.read(3)[0] == 3
+        channel.meta[3 % channel.slots, 0] = 2 * 3 + 1
+        assert channel.read(3) is None
+    finally:
+        channel.close()
+
+
+def _reader_pipeline(ring, channel) -> ProcessPipeline:
+    """A ProcessPipeline over existing shared memory, without worker processes."""
+    pipeline = ProcessPipeline.__new__(ProcessPipeline)
+    pipeline.profiler = None
+    pipeline.ring = ring
+    pipeline.channel = channel
+    pipeline.pool = FrameBufferPool()
+    pipeline._processes = []
+    pipeline._stop = threading.Event()
+    pipeline._landmarks_ready = threading.Event()
+    pipeline._source_finished = threading.Event()
+    pipeline._last_seq = pipeline._last_frame_seq = pipeline.dropped_landmarks = 0
+    pipeline.frame_timestamp = 0.0
+    return pipeline
+
+
+def test_pipeline_read_falls_back_to_newest_frame_when_its_frame_is_gone():
+    ring = SharedFrameRing.create(2, 6, 8)
+    channel = SharedLandmarkChannel.create(4, max_hands=1)
+    try:
+        pipeline = _reader_pipeline(ring, channel)
+        for value in range(1, 4):
+            ring.write(_image(value), float(value))
+        # Landmarks of frame 1, which frames 2 and 3 have overwritten.
+        channel.write(1, 1.0, [(_hand(0.5), "Right")])
+        frame, hands = pipeline.read(timeout=0.1)
+        assert len(hands) == 1
+        assert frame.sequence == 3
+        assert frame.bgr[0, 0, 0] == 3
+        frame.release()
+        assert pipeline.read(timeout=0.05) == (None, None)
+    finally:
+        channel.close()
+        ring.close()
+
+
+def test_worker_exit_raises_and_close_unlinks_shared_memory():
+    cfg = dataclasses.replace(CFG, frame_source="video", frame_source_path="missing-video.mp4", frame_width=64, frame_height=36)
+    pipeline = ProcessPipeline(cfg)
+    names = [pipeline.ring.name, pipeline.channel.name, pipeline._stats_shm.name]
+    try:
+        deadline = time.monotonic() + 60.0
+        with pytest.raises(RuntimeError, match="touchless-capture exited with code 1"):
+            while time.monotonic() < deadline:
+                pipeline.read(timeout=0.2)
+    finally:
+        pipeline.close()
+    assert not any(process.is_alive() for process in pipeline._processes)
+    assert all(_unlinked(name) for name in names)
+
+
+def test_capture_worker_delivers_every_frame_of_fast_source_while_idle():
+    ctx = _spawn()
+    cfg = dataclasses.replace(
+        CFG,
+        frame_source="synthetic",
+        frame_source_realtime=False,
+        frame_source_frames=100,
+        frame_width=64,
+        frame_height=36,
+        idle_poll_seconds=10.0,
+    )
+    shape = (4, cfg.frame_height, cfg.frame_width)
+    ring = SharedFrameRing.create(*shape)
+    frame_ready, idle, stop, finished = (ctx.Event() for _ in range(4))
+    idle.set()
+    process = ctx.Process(target=capture_worker, args=(cfg, ring.name, shape, frame_ready, idle, stop, finished))
+    process.start()
+    try:
+        process.join(timeout=30.0)
+        assert finished.is_set()
+        assert ring.latest_sequence() == 100
+    finally:
+        stop.set()
+        process.join(timeout=5.0)
+        ring.close()
@@ -1,37 +1,193 @@
-﻿from collections import deque
-from typing import Deque, Optional, Tuple
+﻿import math
+from typing import List, Optional, Tuple
+
+import numpy as np
 
 
 class ExponentialPointFilter:
     def __init__(self, alpha: float = 0.3):
         self.alpha = alpha
-        self._value: Optional[Tuple[float, float]] = None
+        self._initialized = False
+        self._x = 0.0
+        self._y = 0.0
 
     def reset(self) -> None:
-        self._value = None
+        self._initialized = False
 
     def update(self, point: Tuple[float, float]) -> Tuple[float, float]:
-        if self._value is None:
-            self._value = point
+        if not self._initialized:
+            self._initialized = True
+            self._x, self._y = point[0], point[1]
             return point
 
-        x = self.alpha * point[0] + (1.0 - self.alpha) * self._value[0]
-        y = self.alpha * point[1] + (1.0 - self.alpha) * self._value[1]
-        self._value = (x, y)
-        return self._value
+        self._x += self.alpha * (point[0] - self._x)
+        self._y += self.alpha * (point[1] - self._y)
+        return (self._x, self._y)
+
+    def filter_batch(self, points) -> np.ndarray:
+        """Filter an (N, 2) trace in one vectorized pass; same output and end
+        state as calling update() on each row."""
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        out = np.empty_like(points)
+        if len(points) == 0:
+            return out
+        start = 0
+        if not self._initialized:
+            out[0] = points[0]
+            prev = points[0]
+            start = 1
+        else:
+            prev = np.array((self._x, self._y))
+
+        decay = 1.0 - self.alpha
+        if decay <= 0.0:
+            out[start:] = points[start:]
+        else:
+            # y[k] = d^(k+1) y[-1] + a * sum_j d^(k-j) x[j], evaluated with a
+            # cumulative sum in chunks short enough that d^-k stays well scaled.
+            chunk = len(points) if decay >= 1.0 else max(1, int(math.log(1e-8) / math.log(decay)))
+            for lo in range(start, len(points), chunk):
+                block = points[lo : lo + chunk]
+                powers = decay ** np.arange(1, len(block) + 1)[:, None]
+                acc = np.cumsum(block * (self.alpha / powers), axis=0)
+                out[lo : lo + len(block)] = powers * (prev + acc)
+                prev = out[lo + len(block) - 1]
+
+        self._initialized = True
+        self._x, self._y = float(out[-1, 0]), float(out[-1, 1])
+        return out
 
 
 class MovingAveragePointFilter:
+    """Mean of the last `window_size` points, kept as running sums over a
+    preallocated ring so each update is O(1)."""
+
     def __init__(self, window_size: int = 4):
         self.window_size = window_size
-        self._buffer: Deque[Tuple[float, float]] = deque(maxlen=window_size)
+        self._xs: List[float] = [0.0] * window_size
+        self._ys: List[float] = [0.0] * window_size
+        self._count = 0
+        self._index = 0
+        self._sum_x = 0.0
+        self._sum_y = 0.0
 
     def reset(self) -> None:
-        self._buffer.clear()
+        self._count = 0
+        self._index = 0
+        self._sum_x = 0.0
+        self._sum_y = 0.0
 
     def update(self, point: Tuple[float, float]) -> Tuple[float, float]:
-        self._buffer.append(point)
-        count = len(self._buffer)
-        sx = sum(p[0] for p in self._buffer)
-        sy = sum(p[1] for p in self._buffer)
-        return (sx / count, sy / count)
+        idx = self._index
+        if self._count == self.window_size:
+            self._sum_x -= self._xs[idx]
+            self._sum_y -= self._ys[idx]
+        else:
+            self._count += 1
+        x, y = point[0], point[1]
+        self._xs[idx] = x
+        self._ys[idx] = y
+        self._sum_x += x
+        self._sum_y += y
+
+        idx += 1
+        if idx == self.window_size:
+            idx = 0
+            # Re-add from scratch once per lap so rounding cannot accumulate.
+            self._sum_x = math.fsum(self._xs[: self._count])
+            self._sum_y = math.fsum(self._ys[: self._count])
+        self._index = idx
+        count = self._count
+        return (self._sum_x / count, self._sum_y / count)
+
+    def _history(self) -> np.ndarray:
+        """Buffered points, oldest first, as an (count, 2) array."""
+        order = [(self._index - self._count + k) % self.window_size for k in range(self._count)]
+        return np.array([(self._xs[k], self._ys[k]) for k in order], dtype=np.float64).reshape(-1, 2)
+
+    def filter_batch(self, points) -> np.ndarray:
+        """Filter an (N, 2) trace in one vectorized pass; same output and end
+        state as calling update() on each row."""
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        if len(points) == 0:
+            return np.empty_like(points)
+        history = self._history()
+        trace = np.concatenate((history, points))
+        sums = np.zeros((len(trace) + 1, 2))
+        np.cumsum(trace, axis=0, out=sums[1:])
+        ends = np.arange(len(history) + 1, len(trace) + 1)
+        starts = np.maximum(ends - self.window_size, 0)
+        out = (sums[ends] - sums[starts]) / (ends - starts)[:, None]
+
+        self.reset()
+        for x, y in trace[-self.window_size :].tolist():
+            self.update((x, y))
+        return out
+
+
+def _smoothing_factor(dt: float, cutoff: float) -> float:
+    tau = 1.0 / (2.0 * math.pi * cutoff)
+    return 1.0 / (1.0 + tau / dt)
+
+
+class OneEuroPointFilter:
+    """Speed-adaptive low-pass filter (Casiez et al., "1 Euro Filter").
+
+    At low speed the cutoff stays near `min_cutoff` (steady, low jitter); it
+    rises by `beta` x speed so fast motion is followed with little lag. The
+    filtered velocity is kept, so predict() can extrapolate the output forward
+    to cover known pipeline latency.
+    """
+
+    def __init__(self, min_cutoff: float = 1.0, beta: float = 0.005, d_cutoff: float = 1.0, default_dt: float = 1.0 / 30.0):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.default_dt = default_dt
+        self._value: Optional[Tuple[float, float]] = None
+        self._velocity: Tuple[float, float] = (0.0, 0.0)
+        self._timestamp: Optional[float] = None
+
+    def reset(self) -> None:
+        self._value = None
+        self._velocity = (0.0, 0.0)
+        self._timestamp = None
+
+    def update(self, point: Tuple[float, float], timestamp: Optional[float] = None) -> Tuple[float, float]:
+        if self._value is None:
+            self._value = (float(point[0]), float(point[1]))
+            self._timestamp = timestamp
+            return self._value
+
+        dt = self.default_dt
+        if timestamp is not None and self._timestamp is not None and timestamp > self._timestamp:
+            dt = timestamp - self._timestamp
+        self._timestamp = timestamp
+
+        x, y = self._value
+        a_d = _smoothing_factor(dt, self.d_cutoff)
+        vx = self._velocity[0] + a_d * ((point[0] - x) / dt - self._velocity[0])
+        vy = self._velocity[1] + a_d * ((point[1] - y) / dt - self._velocity[1])
+        self._velocity = (vx, vy)
+
+        a = _smoothing_factor(dt, self.min_cutoff + self.beta * math.hypot(vx, vy))
+        self._value = (x + a * (point[0] - x), y + a * (point[1] - y))
+        return self._value
+
+    def filter_batch(self, points, timestamps=None) -> np.ndarray:
+        """Filter an (N, 2) trace (optionally with N timestamps). The cutoff
+        depends on each step's speed, so this is a plain loop over update()."""
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        out = np.empty_like(points)
+        for idx, point in enumerate(points.tolist()):
+            out[idx] = self.update(point, None if timestamps is None else float(timestamps[idx]))
+        return out
+
+    def predict(self, lead_seconds: float) -> Tuple[float, float]:
+        """Filtered point extrapolated `lead_seconds` ahead along the filtered velocity."""
+        if self._value is None:
+            raise ValueError("predict() called before update().")
+        return (
+            self._value[0] + self._velocity[0] * lead_seconds,
+            self._value[1] + self._velocity[1] * lead_seconds,
+        )
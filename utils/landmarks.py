@@ -0,0 +1,36 @@
+from typing import Optional
+
+import numpy as np
+
+
+NUM_HAND_LANDMARKS = 21
+# Bones of the hand skeleton as landmark index pairs (MediaPipe's
+# HAND_CONNECTIONS), kept here so drawing does not need mediapipe imported.
+HAND_CONNECTIONS = (
+    (0, 1), (1, 2), (2, 3), (3, 4),
+    (0, 5), (5, 6), (6, 7), (7, 8),
+    (5, 9), (9, 10), (10, 11), (11, 12),
+    (9, 13), (13, 14), (14, 15), (15, 16),
+    (13, 17), (0, 17), (17, 18), (18, 19), (19, 20),
+)
+
+
+def landmarks_to_array(hand_landmarks, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Return hand landmarks as a (21, 3) float32 array of normalized x, y, z.
+
+    Accepts a MediaPipe NormalizedLandmarkList or anything already array-like
+    (arrays are passed through without copying when no `out` is given).
+    """
+    if isinstance(hand_landmarks, np.ndarray):
+        if out is None:
+            return hand_landmarks
+        out[:] = hand_landmarks
+        return out
+
+    if out is None:
+        out = np.empty((NUM_HAND_LANDMARKS, 3), dtype=np.float32)
+    for idx, lm in enumerate(hand_landmarks.landmark):
+        out[idx, 0] = lm.x
+        out[idx, 1] = lm.y
+        out[idx, 2] = lm.z
+    return out
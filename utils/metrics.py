@@ -0,0 +1,222 @@
+import logging
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List
+
+from utils.profiler import LatencyHistogram
+
+
+log = logging.getLogger(__name__)
+
+
+class Counter:
+    """Monotonic counter. inc() is a plain attribute add: no lock, well under
+    a microsecond. Each counter is meant to have a single writer thread;
+    exporters only read."""
+
+    __slots__ = ("name", "help", "value")
+
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self.value = 0
+
+    def inc(self, amount=1) -> None:
+        self.value += amount
+
+
+class LabeledCounter:
+    """Counter family keyed by the value of one label (e.g. gesture="pinch")."""
+
+    __slots__ = ("name", "help", "label", "values")
+
+    def __init__(self, name: str, help: str, label: str):
+        self.name = name
+        self.help = help
+        self.label = label
+        self.values: Dict[str, float] = {}
+
+    def inc(self, key: str, amount=1) -> None:
+        values = self.values
+        values[key] = values.get(key, 0) + amount
+
+
+class Summary:
+    """Durations in a LatencyHistogram, exported as p50/p95/p99 plus _sum and _count."""
+
+    __slots__ = ("name", "help", "histogram")
+
+    QUANTILES = (0.5, 0.95, 0.99)
+
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self.histogram = LatencyHistogram()
+
+    def observe(self, seconds: float) -> None:
+        self.histogram.add(seconds)
+
+
+class Gauge:
+    """Value computed by `fn` when the registry is rendered (nothing on the hot path)."""
+
+    __slots__ = ("name", "help", "fn")
+
+    def __init__(self, name: str, help: str, fn: Callable[[], float]):
+        self.name = name
+        self.help = help
+        self.fn = fn
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class MetricsRegistry:
+    """Named metrics of one process, rendered in the Prometheus text format.
+
+    Components ask for their metrics once at construction (the getters return
+    the existing metric for a known name) and then only touch the returned
+    objects. render() runs on the exporter's thread and just reads values.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+        self._collectors: List[Callable[[], None]] = []
+        self._lock = threading.Lock()  # registration only
+
+    def _get(self, cls, name: str, *args):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metric {name} is already registered as {type(metric).__name__}")
+            return metric
+
+    def counter(self, name: str, help: str) -> Counter:
+        return self._get(Counter, name, help)
+
+    def labeled_counter(self, name: str, help: str, label: str) -> LabeledCounter:
+        return self._get(LabeledCounter, name, help, label)
+
+    def summary(self, name: str, help: str) -> Summary:
+        return self._get(Summary, name, help)
+
+    def gauge(self, name: str, help: str, fn: Callable[[], float]) -> Gauge:
+        return self._get(Gauge, name, help, fn)
+
+    def add_collector(self, fn: Callable[[], None]) -> None:
+        """Call `fn` at the start of every render(), to refresh metrics mirrored
+        from elsewhere (e.g. a worker process) on the exporter's thread."""
+        with self._lock:
+            self._collectors.append(fn)
+
+    def render(self) -> str:
+        with self._lock:
+            collectors = list(self._collectors)
+        for collect in collectors:
+            try:
+                collect()
+            except Exception:
+                log.exception("Metrics collector %r failed", collect)
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: List[str] = []
+        for metric in metrics:
+            name = metric.name
+            lines.append(f"# HELP {name} {metric.help}")
+            if isinstance(metric, Counter):
+                lines.append(f"# TYPE {name} counter")
+                lines.append(f"{name} {metric.value}")
+            elif isinstance(metric, LabeledCounter):
+                lines.append(f"# TYPE {name} counter")
+                # dict() copies in one step, so a concurrent insert cannot break iteration.
+                for key, value in sorted(dict(metric.values).items()):
+                    lines.append(f'{name}{{{metric.label}="{_escape(key)}"}} {value}')
+            elif isinstance(metric, Summary):
+                hist = metric.histogram
+                lines.append(f"# TYPE {name} summary")
+                for q in Summary.QUANTILES:
+                    lines.append(f'{name}{{quantile="{q}"}} {hist.percentile(q * 100.0):.6f}')
+                lines.append(f"{name}_sum {hist.total:.6f}")
+                lines.append(f"{name}_count {hist.count}")
+            else:
+                lines.append(f"# TYPE {name} gauge")
+                try:
+                    value = float(metric.fn())
+                except Exception:
+                    log.exception("Gauge %s failed", name)
+                    continue
+                lines.append(f"{name} {value:.6f}")
+        lines.append("")
+        return "\n".join(lines)
+
+
+class PrometheusFileExporter:
+    """Rewrites `path` with the registry's text every `interval_seconds` (for
+    node_exporter's textfile collector or a log shipper). Writes go to a temp
+    file that is then renamed over `path`, so readers never see half a file."""
+
+    def __init__(self, registry: MetricsRegistry, path: str, interval_seconds: float = 10.0):
+        self.registry = registry
+        self.path = path
+        self.interval_seconds = interval_seconds
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="metrics-file", daemon=True)
+        self._thread.start()
+        log.info("Writing metrics to %s every %.0f s.", path, interval_seconds)
+
+    def write(self) -> None:
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(self.registry.render())
+        os.replace(tmp, self.path)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_seconds):
+            try:
+                self.write()
+            except OSError:
+                log.exception("Writing metrics to %s failed", self.path)
+
+    def close(self) -> None:
+        self._stop.set()
+        self._thread.join(timeout=2.0)
+        try:
+            self.write()
+        except OSError:
+            log.exception("Writing metrics to %s failed", self.path)
+
+
+class MetricsHTTPServer:
+    """Serves the registry at http://host:port/metrics from a daemon thread."""
+
+    def __init__(self, registry: MetricsRegistry, port: int, host: str = "127.0.0.1"):
+        self.registry = registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(handler):
+                if handler.path.split("?", 1)[0] not in ("/", "/metrics"):
+                    handler.send_error(404)
+                    return
+                body = registry.render().encode("utf-8")
+                handler.send_response(200)
+                handler.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                handler.send_header("Content-Length", str(len(body)))
+                handler.end_headers()
+                handler.wfile.write(body)
+
+            def log_message(handler, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name="metrics-http", daemon=True)
+        self._thread.start()
+        log.info("Serving metrics on http://%s:%d/metrics", host, self._server.server_address[1])
+
+    def close(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
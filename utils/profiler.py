@@ -0,0 +1,242 @@
+import math
+import time
+from typing import Dict, List, Optional, Tuple
+
+
+class LatencyHistogram:
+    """Fixed-memory histogram of durations with log-spaced bins.
+
+    Bins cover `min_seconds`..`max_seconds` with `bins_per_decade` bins per
+    factor of ten (about 12% resolution at the default 20), plus one
+    underflow and one overflow bin. Adding a sample is O(1) and allocation free.
+    """
+
+    def __init__(self, min_seconds: float = 1e-5, max_seconds: float = 2.0, bins_per_decade: int = 20):
+        self.min_seconds = min_seconds
+        self._log_min = math.log10(min_seconds)
+        self._bins_per_decade = bins_per_decade
+        self._last_bin = int(math.ceil(math.log10(max_seconds / min_seconds) * bins_per_decade)) + 1
+        self.counts: List[int] = [0] * (self._last_bin + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds: float) -> None:
+        if seconds <= self.min_seconds:
+            idx = 0
+        else:
+            idx = min(int((math.log10(seconds) - self._log_min) * self._bins_per_decade) + 1, self._last_bin)
+        self.counts[idx] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def _bin_upper(self, idx: int) -> float:
+        if idx == 0:
+            return self.min_seconds
+        if idx == self._last_bin:
+            return self.max
+        return 10.0 ** (self._log_min + idx / self._bins_per_decade)
+
+    def percentile(self, q: float) -> float:
+        """Upper edge of the bin holding the q-th percentile (0 < q <= 100)."""
+        if self.count == 0:
+            return 0.0
+        rank = max(1, int(math.ceil(self.count * q / 100.0)))
+        seen = 0
+        for idx, c in enumerate(self.counts):
+            seen += c
+            if seen >= rank:
+                return min(self._bin_upper(idx), self.max)
+        return self.max
+
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def reset(self) -> None:
+        for idx in range(len(self.counts)):
+            self.counts[idx] = 0
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+
+# (stage, p50, p95, p99) in seconds.
+StageSummary = Tuple[str, float, float, float]
+
+
+class StageProfiler:
+    """Per-stage latency histograms for the main loop.
+
+    Stages are timed as laps: start_frame() marks the loop start and every
+    lap(stage) records the time since the previous mark. Work that runs on
+    another thread reports its own duration with record(stage, seconds).
+
+    With `cpu_seconds` (a metrics LabeledCounter) every lap also adds the
+    process CPU time (time.process_time, all threads) spent since the
+    previous mark to that stage's counter.
+    """
+
+    FRAME_STAGE = "frame"
+
+    def __init__(self, cpu_seconds=None):
+        self.histograms: Dict[str, LatencyHistogram] = {}
+        self.cpu_seconds = cpu_seconds
+        self._frame_started = 0.0
+        self._last = 0.0
+        self._last_cpu = 0.0
+
+    def _histogram(self, stage: str) -> LatencyHistogram:
+        hist = self.histograms.get(stage)
+        if hist is None:
+            hist = self.histograms[stage] = LatencyHistogram()
+        return hist
+
+    def start_frame(self) -> None:
+        self._frame_started = self._last = time.perf_counter()
+        if self.cpu_seconds is not None:
+            self._last_cpu = time.process_time()
+
+    def lap(self, stage: str) -> None:
+        now = time.perf_counter()
+        self._histogram(stage).add(now - self._last)
+        self._last = now
+        if self.cpu_seconds is not None:
+            cpu = time.process_time()
+            self.cpu_seconds.inc(stage, cpu - self._last_cpu)
+            self._last_cpu = cpu
+
+    def record(self, stage: str, seconds: float) -> None:
+        self._histogram(stage).add(seconds)
+
+    def end_frame(self) -> None:
+        now = time.perf_counter()
+        self._histogram(self.FRAME_STAGE).add(now - self._frame_started)
+
+    def summary(self) -> List[StageSummary]:
+        # record() may add a stage from another thread; iterate a snapshot.
+        return [
+            (stage, hist.percentile(50), hist.percentile(95), hist.percentile(99))
+            for stage, hist in list(self.histograms.items())
+            if hist.count
+        ]
+
+    def reset(self) -> None:
+        for hist in list(self.histograms.values()):
+            hist.reset()
+
+
+def format_summary(summary: List[StageSummary]) -> str:
+    return " | ".join(f"{stage} {p50 * 1e3:.1f}/{p95 * 1e3:.1f}/{p99 * 1e3:.1f}" for stage, p50, p95, p99 in summary)
+
+
+class ProfileReporter:
+    """Turns a StageProfiler into periodic snapshots (for the overlay) and log lines."""
+
+    def __init__(self, profiler: StageProfiler, interval_seconds: float, logger=None):
+        self.profiler = profiler
+        self.interval_seconds = interval_seconds
+        self.logger = logger
+        self.latest: List[StageSummary] = []
+        self._next_report: Optional[float] = None
+
+    def maybe_report(self, now: float) -> None:
+        if self._next_report is None:
+            self._next_report = now + self.interval_seconds
+            return
+        if now < self._next_report:
+            return
+        self._next_report = now + self.interval_seconds
+        self.latest = self.profiler.summary()
+        if self.logger is not None and self.latest:
+            self.logger.info("Stage latency p50/p95/p99 ms: %s", format_summary(self.latest))
+        self.profiler.reset()
+
+
+class AllocationTracer:
+    """Per-frame heap allocation check built on tracemalloc.
+
+    start_frame() resets the traced peak; end_frame() records how many bytes
+    the frame allocated transiently (peak above the frame's starting point)
+    and how many it kept (net growth). Both are logged every
+    `interval_seconds`. NumPy reports its array buffers to tracemalloc, so
+    image buffers that are not recycled show up here. Tracing slows the loop
+    down noticeably; this is a diagnostic, not for normal runs.
+    """
+
+    def __init__(self, interval_seconds: float = 5.0, logger=None):
+        import tracemalloc
+
+        self._tracemalloc = tracemalloc
+        self.interval_seconds = interval_seconds
+        self.logger = logger
+        self.frames = 0
+        self.transient_total = 0
+        self.transient_max = 0
+        self.retained_total = 0
+        self._baseline = 0
+        self._next_report: Optional[float] = None
+        tracemalloc.start()
+
+    def start_frame(self) -> None:
+        self._tracemalloc.reset_peak()
+        self._baseline = self._tracemalloc.get_traced_memory()[0]
+
+    def end_frame(self, now: float) -> None:
+        current, peak = self._tracemalloc.get_traced_memory()
+        transient = peak - self._baseline
+        self.frames += 1
+        self.transient_total += transient
+        self.transient_max = max(self.transient_max, transient)
+        self.retained_total += current - self._baseline
+        if self._next_report is None:
+            self._next_report = now + self.interval_seconds
+        elif now >= self._next_report:
+            self._next_report = now + self.interval_seconds
+            self.report()
+            self.frames = self.transient_total = self.transient_max = self.retained_total = 0
+
+    def report(self) -> None:
+        if self.logger is None or not self.frames:
+            return
+        self.logger.info(
+            "Allocations per frame: %.1f KiB transient (max %.1f KiB), %+.1f KiB retained over %d frames",
+            self.transient_total / self.frames / 1024.0,
+            self.transient_max / 1024.0,
+            self.retained_total / 1024.0,
+            self.frames,
+        )
+
+    def stop(self) -> None:
+        self._tracemalloc.stop()
+
+
+class StartupTrace:
+    """Cold-start milestones (camera open, hand graph warm, first processed
+    frame, first cursor move) as seconds since the trace was created.
+
+    Each milestone is recorded and logged the first time it is marked;
+    mark() may be called from helper threads.
+    """
+
+    def __init__(self, logger=None):
+        self.logger = logger
+        self.started = time.perf_counter()
+        self.marks: Dict[str, float] = {}
+
+    def mark(self, name: str) -> None:
+        if name in self.marks:
+            return
+        elapsed = time.perf_counter() - self.started
+        self.marks[name] = elapsed
+        if self.logger is not None:
+            self.logger.info("Startup: %s after %.0f ms", name, elapsed * 1000.0)
+
+    def elapsed(self, name: str) -> float:
+        """Seconds to `name`, or NaN while it has not happened yet."""
+        return self.marks.get(name, math.nan)
+
+    def summary(self) -> str:
+        ordered = sorted(dict(self.marks).items(), key=lambda item: item[1])
+        return ", ".join(f"{name} {seconds * 1000.0:.0f} ms" for name, seconds in ordered)